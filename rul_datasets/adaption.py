@@ -2,13 +2,20 @@
 
 import warnings
 from copy import deepcopy
-from typing import List, Optional, Any, Tuple, Callable, Sequence, cast
+from typing import List, Optional, Any, Tuple, Callable, Sequence, Union, cast
 
 import numpy as np
 import pytorch_lightning as pl
 import torch
-from torch.utils.data import DataLoader, Dataset, ConcatDataset
-
+from torch.utils.data import (
+    DataLoader,
+    Dataset,
+    ConcatDataset,
+    TensorDataset,
+    get_worker_info,
+)
+
+from rul_datasets import utils
 from rul_datasets.core import PairedRulDataset, RulDataModule, RulDataset
 
 
@@ -130,6 +137,7 @@ class DomainAdaptionDataModule(pl.LightningDataModule):
 
         The data loader is configured to shuffle the data. The `pin_memory` option is
         activated to achieve maximum transfer speed to the GPU.
+        The worker processes are configured like the ones of the source data module.
 
         Args:
             *args: Ignored. Only for adhering to parent class interface.
@@ -143,6 +151,7 @@ class DomainAdaptionDataModule(pl.LightningDataModule):
             batch_size=self.batch_size,
             shuffle=True,
             pin_memory=True,
+            **self.source.dataloader_kwargs,
         )
 
     def val_dataloader(self, *args: Any, **kwargs: Any) -> List[DataLoader]:
@@ -171,6 +180,7 @@ class DomainAdaptionDataModule(pl.LightningDataModule):
                     self._get_paired_dataset(),
                     batch_size=self.batch_size,
                     pin_memory=True,
+                    **self.source.dataloader_kwargs,
                 )
             )
 
@@ -286,13 +296,14 @@ class LatentAlignDataModule(DomainAdaptionDataModule):
         self.split_by_steps = split_by_steps
 
     def _get_training_dataset(self) -> "AdaptionDataset":
+        # ragged splits are split into index views instead of copies of the runs
         source_healthy, source_degraded = split_healthy(
-            *self.source.data["dev"], by_max_rul=True
+            *self.source._data["dev"], by_max_rul=True
         )
         target_features, target_labels = (  # reload only if needed to save memory
-            self.target.data["dev"]
+            self.target._data["dev"]
             if not self.inductive
-            else self.target.load_split("test", alias="dev")
+            else self.target._load_split("test", alias="dev")
         )
         target_healthy, target_degraded = split_healthy(
             target_features, target_labels, self.split_by_max_rul, self.split_by_steps
@@ -333,13 +344,18 @@ def split_healthy(
     """
     if not by_max_rul and (by_steps is None):
         raise ValueError("Either 'by_max_rul' or 'by_steps' need to be set.")
+    if isinstance(features, utils.RaggedArray) and isinstance(
+        targets, utils.RaggedArray
+    ):
+        return _split_healthy_ragged(features, targets, by_max_rul, by_steps)
 
     healthy = []
     degraded = []
     for feature, target in zip(features, targets):
-        sections = _get_sections(by_max_rul, by_steps, target)
-        healthy_feat, degraded_feat = np.split(feature, sections)
-        healthy_target, degraded_target = np.split(target, sections)
+        split_idx = _get_split_idx(by_max_rul, by_steps, target)
+        # slicing instead of np.split keeps lazy windows lazy
+        healthy_feat, degraded_feat = feature[:split_idx], feature[split_idx:]
+        healthy_target, degraded_target = target[:split_idx], target[split_idx:]
         degradation_steps = np.arange(1, len(degraded_target) + 1)
         healthy.append((healthy_feat, healthy_target))
         degraded.append((degraded_feat, degradation_steps, degraded_target))
@@ -350,18 +366,38 @@ def split_healthy(
     return healthy_dataset, degraded_dataset
 
 
-def _get_sections(
+def _split_healthy_ragged(
+    features: utils.RaggedArray,
+    targets: utils.RaggedArray,
+    by_max_rul: bool,
+    by_steps: Optional[int],
+) -> Tuple[RulDataset, RulDataset]:
+    split_idx = np.array([_get_split_idx(by_max_rul, by_steps, t) for t in targets])
+    positions = targets.positions()
+    split_per_sample = np.repeat(split_idx, targets.lengths)
+    is_healthy = positions < split_per_sample
+    healthy = RulDataset(features.compress(is_healthy), targets.compress(is_healthy))
+    degraded_targets = targets.compress(~is_healthy)
+    degradation_steps = positions[~is_healthy] - split_per_sample[~is_healthy] + 1
+    degraded = RulDataset(
+        features.compress(~is_healthy),
+        utils.RaggedArray(degradation_steps, degraded_targets.offsets),
+        degraded_targets,
+    )
+
+    return healthy, degraded
+
+
+def _get_split_idx(
     by_max_rul: bool, by_steps: Optional[int], target: np.ndarray
-) -> List[int]:
+) -> int:
     # cast is needed for mypy and has no runtime effect
     if by_max_rul:
-        split_idx = cast(int, np.flip(target, axis=0).argmax())
-        sections = [len(target) - split_idx]
+        split_idx = len(target) - cast(int, np.flip(target, axis=0).argmax())
     else:
-        by_steps = min(cast(int, by_steps), len(target))
-        sections = [by_steps]
+        split_idx = min(cast(int, by_steps), len(target))
 
-    return sections
+    return split_idx
 
 
 def _to_dataset(data: Sequence[Tuple[np.ndarray, ...]]) -> RulDataset:
@@ -397,7 +433,11 @@ class AdaptionDataset(Dataset):
     _get_unlabeled_idx: Callable
 
     def __init__(
-        self, labeled: Dataset, *unlabeled: Dataset, deterministic: bool = False
+        self,
+        labeled: Dataset,
+        *unlabeled: Dataset,
+        deterministic: bool = False,
+        seed: Optional[int] = None,
     ) -> None:
         """
         Create a new adaption data set from a labeled source and one or multiple
@@ -408,29 +448,52 @@ class AdaptionDataset(Dataset):
         deactivate this behavior and fix the pairing of source and target samples,
         set `deterministic` to `True`. This is the recommended setting for evaluation.
 
+        Each worker process of a [data loader][torch.utils.data.DataLoader] draws
+        target samples from its own random stream, derived from the worker seed of
+        the data loader. If a `seed` is set, the target samples are reproducible in
+        the main process. In worker processes, they are reproducible if PyTorch is
+        seeded, too, e.g. with `seed_everything`.
+
         Args:
             labeled: The dataset from the labeled domain.
             *unlabeled: The dataset(s) from the unlabeled domain(s).
             deterministic: Return the same target sample for each source sample.
+            seed: The seed for drawing target samples. Defaults to 42 if
+                  `deterministic` is set.
         """
         self.labeled = labeled
         self.unlabeled = unlabeled
         self.deterministic = deterministic
+        self.seed = seed
         self._unlabeled_len = [len(ul) for ul in self.unlabeled]  # type: ignore
+        self._worker_seed: Optional[int] = None
 
         if self.deterministic:
-            self._rng = np.random.default_rng(seed=42)
+            self._rng = np.random.default_rng(seed=42 if seed is None else seed)
             size = (len(self), len(self._unlabeled_len))
             self._unlabeled_idx = self._rng.integers(0, self._unlabeled_len, size)
             self._get_unlabeled_idx = self._get_deterministic_unlabeled_idx
         else:
-            self._rng = np.random.default_rng()
+            self._rng = np.random.default_rng(seed=seed)
             self._get_unlabeled_idx = self._get_random_unlabeled_idx
 
-    def _get_random_unlabeled_idx(self, _: int) -> np.ndarray:
-        return self._rng.integers(0, self._unlabeled_len)
+    def _get_random_unlabeled_idx(self, idx: Union[int, np.ndarray]) -> np.ndarray:
+        self._update_worker_rng()
+        size = (len(idx), len(self._unlabeled_len)) if np.ndim(idx) else None
+
+        return self._rng.integers(0, self._unlabeled_len, size)
+
+    def _update_worker_rng(self) -> None:
+        worker_info = get_worker_info()
+        if worker_info is not None and worker_info.seed != self._worker_seed:
+            # forked workers inherit the same rng state, so each needs its own stream
+            entropy = [worker_info.seed] + ([] if self.seed is None else [self.seed])
+            self._rng = np.random.default_rng(np.random.SeedSequence(entropy))
+            self._worker_seed = worker_info.seed
 
-    def _get_deterministic_unlabeled_idx(self, idx: int) -> np.ndarray:
+    def _get_deterministic_unlabeled_idx(
+        self, idx: Union[int, np.ndarray]
+    ) -> np.ndarray:
         return self._unlabeled_idx[idx]
 
     def __getitem__(self, idx: int) -> Tuple[torch.Tensor, ...]:
@@ -440,10 +503,65 @@ class AdaptionDataset(Dataset):
 
         return item
 
+    def __getitems__(self, indices: Sequence[int]) -> List[Tuple[torch.Tensor, ...]]:
+        """
+        Fetch a batch of samples for a [data loader][torch.utils.data.DataLoader].
+
+        The target indices of the whole batch are drawn at once and each dataset is
+        accessed only once per batch. Datasets that support batched access, e.g.
+        [RulDataset][rul_datasets.core.RulDataset], are gathered as a stacked batch.
+
+        Args:
+            indices: The indices of the source samples.
+
+        Returns:
+            A list of samples in the order of `indices`.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        unlabeled_idx = self._get_unlabeled_idx(indices)
+        batch = _fetch_batch(self.labeled, indices)
+        for i, unlabeled in enumerate(self.unlabeled):
+            # drop label tensor in last position
+            batch += _fetch_batch(unlabeled, unlabeled_idx[:, i])[:-1]
+
+        return list(zip(*(torch.unbind(b) for b in batch)))
+
     def __len__(self) -> int:
         return len(self.labeled)  # type: ignore
 
 
+def _fetch_batch(dataset: Dataset, indices: np.ndarray) -> Tuple[torch.Tensor, ...]:
+    if isinstance(dataset, RulDataset):
+        batch = dataset._get_batch(indices)
+    elif isinstance(dataset, TensorDataset):
+        idx = torch.from_numpy(indices)
+        batch = tuple(t[idx] for t in dataset.tensors)
+    elif isinstance(dataset, ConcatDataset):
+        batch = _fetch_concat_batch(dataset, indices)
+    else:
+        samples = [dataset[i] for i in indices]
+        batch = tuple(torch.stack(field) for field in zip(*samples))
+
+    return batch
+
+
+def _fetch_concat_batch(
+    dataset: ConcatDataset, indices: np.ndarray
+) -> Tuple[torch.Tensor, ...]:
+    indices = np.where(indices < 0, indices + len(dataset), indices)
+    offsets = np.asarray([0] + dataset.cumulative_sizes)
+    dataset_idx = np.searchsorted(offsets, indices, side="right") - 1
+    parts, batch_pos = [], []
+    for i in np.unique(dataset_idx):
+        pos = np.flatnonzero(dataset_idx == i)
+        parts.append(_fetch_batch(dataset.datasets[i], indices[pos] - offsets[i]))
+        batch_pos.append(pos)
+    order = torch.from_numpy(np.argsort(np.concatenate(batch_pos)))
+    batch = tuple(torch.cat(field)[order] for field in zip(*parts))
+
+    return batch
+
+
 class PretrainingAdaptionDataModule(pl.LightningDataModule):
     def __init__(
         self,
@@ -452,6 +570,7 @@ class PretrainingAdaptionDataModule(pl.LightningDataModule):
         num_samples: int,
         min_distance: int = 1,
         distance_mode: str = "linear",
+        cache_val_pairs: bool = False,
     ):
         super().__init__()
 
@@ -461,6 +580,8 @@ class PretrainingAdaptionDataModule(pl.LightningDataModule):
         self.batch_size = source.batch_size
         self.min_distance = min_distance
         self.distance_mode = distance_mode
+        self.cache_val_pairs = cache_val_pairs
+        self._val_paired: Optional[PairedRulDataset] = None
 
         self._check_compatibility()
 
@@ -515,15 +636,22 @@ class PretrainingAdaptionDataModule(pl.LightningDataModule):
     def setup(self, stage: Optional[str] = None):
         self.source.setup(stage)
         self.target.setup(stage)
+        self._val_paired = None  # the runs may have changed
 
     def train_dataloader(self, *args, **kwargs) -> DataLoader:
         return DataLoader(
-            self._get_paired_dataset("dev"), batch_size=self.batch_size, pin_memory=True
+            self._get_paired_dataset("dev"),
+            batch_size=None,
+            pin_memory=True,
+            **self.source.dataloader_kwargs,
         )
 
     def val_dataloader(self, *args, **kwargs) -> List[DataLoader]:
         combined_loader = DataLoader(
-            self._get_paired_dataset("val"), batch_size=self.batch_size, pin_memory=True
+            self._get_paired_dataset("val"),
+            batch_size=None,
+            pin_memory=True,
+            **self.source.dataloader_kwargs,
         )
         source_loader = self.source.val_dataloader()
         target_loader = self.target.val_dataloader()
@@ -531,6 +659,8 @@ class PretrainingAdaptionDataModule(pl.LightningDataModule):
         return [combined_loader, source_loader, target_loader]
 
     def _get_paired_dataset(self, split: str) -> PairedRulDataset:
+        if split == "val" and self._val_paired is not None:
+            return self._val_paired  # reuse pair table of previous epochs
         deterministic = split == "val"
         min_distance = 1 if split == "val" else self.min_distance
         num_samples = 50000 if split == "val" else self.num_samples
@@ -541,6 +671,10 @@ class PretrainingAdaptionDataModule(pl.LightningDataModule):
             min_distance,
             deterministic,
             mode=self.distance_mode,
+            batch_size=self.batch_size,
+            cache_pair_table=deterministic and self.cache_val_pairs,
         )
+        if split == "val":
+            self._val_paired = paired
 
         return paired
@@ -66,7 +66,13 @@ class BaselineDataModule(pl.LightningDataModule):
             loader.fd = fd
             loader.percent_fail_runs = None
             loader.percent_broken = None
-            dm = RulDataModule(loader, self.data_module.batch_size)
+            dm = RulDataModule(
+                loader,
+                self.data_module.batch_size,
+                num_workers=self.data_module.num_workers,
+                persistent_workers=self.data_module.persistent_workers,
+                prefetch_factor=self.data_module.prefetch_factor,
+            )
 
         return dm
 
@@ -131,6 +137,7 @@ class PretrainingBaselineDataModule(pl.LightningDataModule):
         num_samples: int,
         min_distance: int = 1,
         distance_mode: str = "linear",
+        cache_val_pairs: bool = False,
     ):
         super().__init__()
 
@@ -140,6 +147,8 @@ class PretrainingBaselineDataModule(pl.LightningDataModule):
         self.batch_size = failed_data_module.batch_size
         self.min_distance = min_distance
         self.distance_mode = distance_mode
+        self.cache_val_pairs = cache_val_pairs
+        self._val_paired: Optional[PairedRulDataset] = None
         self.window_size = self.unfailed.reader.window_size
 
         self._check_loaders()
@@ -211,21 +220,30 @@ class PretrainingBaselineDataModule(pl.LightningDataModule):
     def setup(self, stage: Optional[str] = None):
         self.unfailed.setup(stage)
         self.failed.setup(stage)
+        self._val_paired = None  # the runs may have changed
 
     def train_dataloader(self, *args, **kwargs) -> DataLoader:
         return DataLoader(
-            self._get_paired_dataset("dev"), batch_size=self.batch_size, pin_memory=True
+            self._get_paired_dataset("dev"),
+            batch_size=None,
+            pin_memory=True,
+            **self.failed.dataloader_kwargs,
         )
 
     def val_dataloader(self, *args, **kwargs) -> List[DataLoader]:
         combined_loader = DataLoader(
-            self._get_paired_dataset("val"), batch_size=self.batch_size, pin_memory=True
+            self._get_paired_dataset("val"),
+            batch_size=None,
+            pin_memory=True,
+            **self.failed.dataloader_kwargs,
         )
         unfailed_loader = self.unfailed.val_dataloader()
 
         return [combined_loader, unfailed_loader]
 
     def _get_paired_dataset(self, split: str) -> PairedRulDataset:
+        if split == "val" and self._val_paired is not None:
+            return self._val_paired  # reuse pair table of previous epochs
         deterministic = split == "val"
         min_distance = 1 if split == "val" else self.min_distance
         num_samples = 25000 if split == "val" else self.num_samples
@@ -236,6 +254,10 @@ class PretrainingBaselineDataModule(pl.LightningDataModule):
             min_distance,
             deterministic,
             mode=self.distance_mode,
+            batch_size=self.batch_size,
+            cache_pair_table=deterministic and self.cache_val_pairs,
         )
+        if split == "val":
+            self._val_paired = paired
 
         return paired
@@ -1,7 +1,31 @@
 """Basic data modules for experiments involving only a single subset of any RUL
 dataset. """
 
-from typing import Dict, List, Optional, Tuple, Any, Callable, cast, Union, Literal
+import functools
+import hashlib
+import inspect
+import os
+import re
+import tempfile
+import weakref
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import (
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Any,
+    Callable,
+    cast,
+    Union,
+    Literal,
+    Sequence,
+    Iterator,
+    MutableMapping,
+)
 
 import numpy as np
 import pytorch_lightning as pl
@@ -11,10 +35,20 @@ from torch.utils.data import (
     IterableDataset,
     get_worker_info,
     Dataset,
+    Sampler,
 )
+from torch.utils.data.dataloader import default_collate
 
 from rul_datasets import utils
-from rul_datasets.reader import AbstractReader
+from rul_datasets.reader import AbstractReader, split_cache
+from rul_datasets.reader.data_root import get_data_root
+
+_EXTRACTOR_CACHE_DIR = "extracted"
+_EXTRACTOR_MEMMAP_DIR = "extracting"
+_PAIR_TABLE_CACHE_DIR = "pairs"
+_Runs = Union[List[np.ndarray], utils.RaggedArray]
+_MEMORY_ADDRESS = re.compile(r" at 0x[0-9a-fA-F]+")
+_PAIR_TABLE_KEYS = ["run_idx", "anchor_idx", "query_idx", "distance", "domain_label"]
 
 
 class RulDataModule(pl.LightningDataModule):
@@ -65,7 +99,7 @@ class RulDataModule(pl.LightningDataModule):
         >>> dm = rul_datasets.RulDataModule(cmapss, 32, degraded_only=["val", "test"])
     """
 
-    _data: Dict[str, Tuple[List[np.ndarray], List[np.ndarray]]]
+    _data: Dict[str, Tuple["_Runs", "_Runs"]]
 
     def __init__(
         self,
@@ -74,6 +108,18 @@ class RulDataModule(pl.LightningDataModule):
         feature_extractor: Optional[Callable] = None,
         window_size: Optional[int] = None,
         degraded_only: Optional[List[Literal["dev", "val", "test"]]] = None,
+        window_mode: Literal["memory", "view", "lazy"] = "memory",
+        extractor_workers: int = 0,
+        extractor_backend: Literal["thread", "process"] = "thread",
+        extractor_chunksize: int = 1,
+        extractor_batch_size: Optional[int] = None,
+        extractor_memmap: bool = False,
+        extractor_cache: bool = False,
+        extractor_version: Optional[str] = None,
+        num_workers: int = 0,
+        persistent_workers: bool = False,
+        prefetch_factor: Optional[int] = None,
+        resident: bool = False,
     ):
         """
         Create a new RUL data module from a reader.
@@ -94,7 +140,51 @@ class RulDataModule(pl.LightningDataModule):
         * `window_size is not None`: `[num_windows, features]`
 
         The expected input shape for the `feature_extractor` is always
-        `[num_windows, window_size, features]`.
+        `[num_windows, window_size, features]`. The `window_mode` controls how the
+        extracted features are re-windowed. See [extract_windows]
+        [rul_datasets.utils.extract_windows] for the available modes.
+
+        The feature extractor is applied to one run after another by default. Set
+        `extractor_workers` to apply it to several runs in parallel with a pool of
+        threads or processes, as selected by `extractor_backend`. Threads work best
+        for extractors that release the GIL, e.g. most numpy functions. Processes
+        need a picklable feature extractor, i.e. no lambda. The runs are passed to
+        the processes through shared memory instead of pickling them. The extracted
+        runs keep their original order in both cases.
+
+        Large runs can be fed to the feature extractor in batches of
+        `extractor_batch_size` windows to bound the peak memory consumption. The
+        results are written into a preallocated array which is memory mapped to a
+        file in the `extracting` folder of the data root if `extractor_memmap` is set.
+        The file is removed once the array is garbage collected. In this mode, the
+        feature extractor has to return one feature vector and target per window.
+        With the process backend, the results are sent back to the main process in
+        memory.
+
+        If `extractor_cache` is set, the extracted features of each split are saved
+        to the `extracted` folder of the data root and opened as read-only memory maps
+        the next time. The cache entries are identified by the processed split of
+        the reader, as in the [split cache][rul_datasets.reader.split_cache], and a
+        fingerprint of the feature extractor. By default, the fingerprint is the name
+        and source code hash of the feature extractor function or the class and
+        `repr` of a callable object. A `functools.partial` is identified by the
+        wrapped function and its bound arguments. The `repr` must not contain memory
+        addresses, because they change in each process. Set `extractor_version` to
+        identify the feature extractor by name and version instead, e.g. if its
+        source code is not available or its behavior depends on external state.
+
+        The data loaders create their batches in the main process by default. Set
+        `num_workers` to create them in worker processes instead. If workers are
+        used, splits held in a [RaggedArray][rul_datasets.utils.RaggedArray] are
+        moved to shared memory during `setup`, so that the workers access them
+        without copying, even if they are spawned instead of forked.
+
+        For small datasets, e.g. CMAPSS, set `resident` to materialize each split
+        as contiguous, channel-first tensors during `setup` (see [to_resident]
+        [rul_datasets.core.RulDataset.to_resident]). The data loaders then slice or
+        select whole batches from these tensors in the main process instead of
+        creating, collating and pinning each sample. The tensors are pinned if CUDA
+        is available. Resident splits cannot be combined with workers.
 
         Args:
             reader: The dataset reader for the desired dataset, e.g., CmapssLoader.
@@ -104,6 +194,22 @@ class RulDataModule(pl.LightningDataModule):
             window_size: The new window size to apply after the feature extractor.
             degraded_only: Whether to load only degraded samples for the `dev`, 'val'
                            or 'test' split.
+            window_mode: How to re-window the extracted features.
+            extractor_workers: Number of workers to apply the feature extractor
+                               with. Zero applies it in the main thread.
+            extractor_backend: Whether the workers are `thread`s or `process`es.
+            extractor_chunksize: Number of runs sent to a worker process at once.
+            extractor_batch_size: Number of windows fed to the feature extractor at
+                                  once. `None` feeds whole runs.
+            extractor_memmap: Write the extracted features to a memory-mapped file.
+                              Needs `extractor_batch_size` to be set.
+            extractor_cache: Cache the extracted features on disk.
+            extractor_version: A version key identifying the feature extractor in
+                               the cache.
+            num_workers: Number of worker processes of the data loaders.
+            persistent_workers: Keep the worker processes alive between epochs.
+            prefetch_factor: Number of batches loaded in advance by each worker.
+            resident: Materialize the splits as tensors for fast batching.
         """
         super().__init__()
 
@@ -112,12 +218,41 @@ class RulDataModule(pl.LightningDataModule):
         self.feature_extractor = feature_extractor
         self.window_size = window_size
         self.degraded_only = degraded_only
+        self.window_mode = window_mode
+        self.extractor_workers = extractor_workers
+        self.extractor_backend = extractor_backend
+        self.extractor_chunksize = extractor_chunksize
+        self.extractor_batch_size = extractor_batch_size
+        self.extractor_memmap = extractor_memmap
+        self.extractor_cache = extractor_cache
+        self.extractor_version = extractor_version
+        self.num_workers = num_workers
+        self.persistent_workers = persistent_workers
+        self.prefetch_factor = prefetch_factor
+        self.resident = resident
+        self._resident_datasets: Dict[str, RulDataset] = {}
 
         if (self.feature_extractor is None) and (self.window_size is not None):
             raise ValueError(
                 "A feature extractor has to be supplied "
                 "to set a window size for re-windowing."
             )
+        if self.extractor_memmap and self.extractor_batch_size is None:
+            raise ValueError(
+                "Memory-mapping the extracted features needs 'extractor_batch_size'."
+            )
+        if self.extractor_backend not in ["thread", "process"]:
+            raise ValueError(f"Unknown extractor backend {self.extractor_backend}.")
+        if self.num_workers < 0:
+            raise ValueError("The number of workers needs to be non-negative.")
+        if self.num_workers == 0 and (
+            self.persistent_workers or self.prefetch_factor is not None
+        ):
+            raise ValueError(
+                "Persistent workers and prefetching need 'num_workers' > 0."
+            )
+        if self.resident and self.num_workers > 0:
+            raise ValueError("Resident splits are batched in the main process only.")
 
         hparams = {
             "reader": self.reader.hparams,
@@ -131,21 +266,49 @@ class RulDataModule(pl.LightningDataModule):
         self.save_hyperparameters(hparams)
 
     @property
-    def data(self) -> Dict[str, Tuple[List[np.ndarray], List[np.ndarray]]]:
+    def data(self) -> MutableMapping[str, Tuple[List[np.ndarray], List[np.ndarray]]]:
         """
         A dictionary of the training, validation and test splits.
 
         Each split is a tuple of feature and target tensors.
         The keys are `dev` (training split), `val` (validation split) and `test`
         (test split).
+
+        Each split is returned as lists of runs. If the runs of a split are plain,
+        in-memory arrays and `window_mode` is `memory`, they are held internally in
+        a [RaggedArray][rul_datasets.utils.RaggedArray]. Windowing, filtering
+        degraded samples and indexing are then vectorized across all runs. The lists
+        are created on each access, and their runs are views of its buffer. Only
+        samples filtered by `degraded_only` are gathered into new arrays. Memory
+        maps and windows in `view` or `lazy` mode are kept as they are to avoid
+        loading them. Runs shared by the [registry][rul_datasets.reader.registry]
+        are kept as well to avoid duplicating them in each data module.
+
+        Assigning a split to the dictionary replaces the split used by the data
+        loaders.
         """
-        return self._data
+        return _SplitLists(self._data)
 
     @property
     def reader(self) -> AbstractReader:
         """The underlying dataset reader."""
         return self._reader
 
+    @property
+    def dataloader_kwargs(self) -> Dict[str, Any]:
+        """
+        The worker configuration passed to each [data loader]
+        [torch.utils.data.DataLoader]. Higher-order data modules use it to configure
+        their own data loaders.
+        """
+        kwargs: Dict[str, Any] = {"num_workers": self.num_workers}
+        if self.num_workers > 0:
+            kwargs["persistent_workers"] = self.persistent_workers
+        if self.prefetch_factor is not None:  # torch < 2.0 rejects None
+            kwargs["prefetch_factor"] = self.prefetch_factor
+
+        return kwargs
+
     @property
     def fds(self):
         """Index list of the available subsets of the underlying dataset, i.e.
@@ -228,10 +391,17 @@ class RulDataModule(pl.LightningDataModule):
             stage: Ignored. Only for adhering to parent class interface.
         """
         self._data = {
-            "dev": self.load_split("dev"),
-            "val": self.load_split("val"),
-            "test": self.load_split("test"),
+            "dev": self._load_split("dev"),
+            "val": self._load_split("val"),
+            "test": self._load_split("test"),
         }
+        if self.num_workers > 0:
+            for features, targets in self._data.values():
+                _share_memory([features, targets])
+        self._resident_datasets = {}
+        if self.resident:
+            for split in self._data:
+                self._resident_datasets[split] = self.to_dataset(split).to_resident()
 
     def load_split(
         self,
@@ -259,38 +429,127 @@ class RulDataModule(pl.LightningDataModule):
         Returns:
             The feature and target tensors of the split's runs.
         """
-        features, targets = self.reader.load_split(split, alias)
-        features, targets = self._apply_feature_extractor_per_run(features, targets)
+        features, targets = self._load_split(split, alias, degraded_only)
+
+        return _to_list(features), _to_list(targets)
+
+    def _load_split(
+        self,
+        split: str,
+        alias: Optional[str] = None,
+        degraded_only: Optional[bool] = None,
+    ) -> Tuple["_Runs", "_Runs"]:
+        """Load a split like `load_split` but keep ragged arrays."""
+        features, targets = self._load_extracted_split(split, alias)
+        if self.window_mode == "memory" and _is_packable(features, targets):
+            features = utils.RaggedArray.from_list(features)
+            targets = utils.RaggedArray.from_list(targets)
+            features, targets = self._window_ragged(features, targets)
+        else:
+            windowed = [self._window(f, t) for f, t in zip(features, targets)]
+            features, targets = zip(*windowed) if windowed else ((), ())
+            features, targets = list(features), list(targets)
         if degraded_only is None:
             degraded_only = (
                 self.degraded_only is not None
                 and (alias or split) in self.degraded_only
             )
         if degraded_only:
-            self._filter_out_healthy(features, targets)
+            features, targets = self._filter_out_healthy(features, targets)
 
         return features, targets
 
-    def _apply_feature_extractor_per_run(
+    def _load_extracted_split(
+        self, split: str, alias: Optional[str]
+    ) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        if self.feature_extractor is None:
+            return self.reader.load_split(split, alias)
+        if not self.extractor_cache:
+            features, targets = self.reader.load_split(split, alias)
+            return self._extract_features(features, targets)
+
+        cache_path = self._get_extractor_cache_path(split, alias or split)
+        cached = split_cache.load_runs(cache_path)
+        if cached is None:
+            features, targets = self.reader.load_split(split, alias)
+            cached = self._extract_features(features, targets)
+            split_cache.save_runs(cache_path, *cached)
+
+        return cached
+
+    def _get_extractor_cache_path(self, split: str, alias: str) -> str:
+        split_key = split_cache.get_cache_key(self.reader, split, alias)
+        extractor_key = _get_extractor_fingerprint(
+            cast(Callable, self.feature_extractor), self.extractor_version
+        )
+        key = hashlib.sha256(f"{split_key}{extractor_key}".encode()).hexdigest()
+        cache_path = os.path.join(get_data_root(), _EXTRACTOR_CACHE_DIR, key)
+
+        return cache_path
+
+    def _extract_features(
         self, features: List[np.ndarray], targets: List[np.ndarray]
     ) -> Tuple[List[np.ndarray], List[np.ndarray]]:
-        extracted = [self._extract_and_window(f, t) for f, t in zip(features, targets)]
+        extract = functools.partial(
+            _extract_run,
+            cast(Callable, self.feature_extractor),
+            batch_size=self.extractor_batch_size,
+            memmap=self.extractor_memmap,
+        )
+        if self.extractor_workers <= 0 or len(features) <= 1:
+            extracted = list(map(extract, features, targets))
+        elif self.extractor_backend == "thread":
+            with ThreadPoolExecutor(self.extractor_workers) as executor:
+                extracted = list(executor.map(extract, features, targets))
+        else:
+            extracted = _extract_in_processes(
+                extract,
+                features,
+                targets,
+                self.extractor_workers,
+                self.extractor_chunksize,
+            )
         features, targets = zip(*extracted) if extracted else ((), ())
 
         return list(features), list(targets)
 
-    def _extract_and_window(
+    def _window(
         self, features: np.ndarray, targets: np.ndarray
     ) -> Tuple[np.ndarray, np.ndarray]:
-        if self.feature_extractor is not None:
-            features, targets = self.feature_extractor(features, targets)
         if self.window_size is not None:
             cutoff = self.window_size - 1
-            features = utils.extract_windows(features, self.window_size)
+            features = utils.extract_windows(
+                features, self.window_size, mode=self.window_mode
+            )
             targets = targets[cutoff:]
 
         return features, targets
 
+    def _window_ragged(
+        self, features: utils.RaggedArray, targets: utils.RaggedArray
+    ) -> Tuple[utils.RaggedArray, utils.RaggedArray]:
+        if self.window_size is None:
+            return features, targets
+        cutoff = self.window_size - 1
+        num_windows = features.lengths - cutoff
+        if np.any(num_windows < 1):
+            raise ValueError(
+                f"Cannot extract windows of size {self.window_size} from a sequence "
+                f"of length {features.lengths.min()}."
+            )
+        window_offsets = np.zeros(len(num_windows) + 1, dtype=np.int64)
+        np.cumsum(num_windows, out=window_offsets[1:])
+        # start of each window in the buffer of all runs
+        run_starts = np.repeat(features.offsets[:-1] - window_offsets[:-1], num_windows)
+        window_starts = run_starts + np.arange(window_offsets[-1])
+        window_idx = window_starts[:, None] + np.arange(self.window_size)
+        features = utils.RaggedArray(features.take(window_idx), window_offsets)
+        targets = utils.RaggedArray(
+            targets.take(window_starts + cutoff), window_offsets
+        )
+
+        return features, targets
+
     def _filter_out_healthy(self, features, targets):
         if self.reader.max_rul is not None:
             thresh = self.reader.max_rul
@@ -301,11 +560,16 @@ class RulDataModule(pl.LightningDataModule):
                 "Cannot filter degraded samples if no max_rul is set and "
                 "norm_rul is False."
             )
+        if isinstance(targets, utils.RaggedArray):
+            degraded = targets.compact().values < thresh
+            return features.compress(degraded), targets.compress(degraded)
         for i in range(len(targets)):
             degraded = targets[i] < thresh
             features[i] = features[i][degraded]
             targets[i] = targets[i][degraded]
 
+        return features, targets
+
     def train_dataloader(self, *args: Any, **kwargs: Any) -> DataLoader:
         """
         Create a [data loader][torch.utils.data.DataLoader] for the training split.
@@ -315,8 +579,11 @@ class RulDataModule(pl.LightningDataModule):
         configured to drop the last batch of the data if it would only contain one
         sample.
 
-        The whole split is held in memory. Therefore, the `num_workers` are set to
-        zero which uses the main process for creating batches.
+        The worker processes are configured by the `num_workers`,
+        `persistent_workers` and `prefetch_factor` of the data module.
+        Whole batches are gathered by the dataset and passed on by [collate_stacked]
+        [rul_datasets.core.collate_stacked] instead of collating single samples. If
+        the data module is `resident`, they are taken from the materialized split.
 
         Args:
             *args: Ignored. Only for adhering to parent class interface.
@@ -325,17 +592,7 @@ class RulDataModule(pl.LightningDataModule):
         Returns:
             The training data loader
         """
-        dataset = self.to_dataset("dev")
-        drop_last = len(dataset) % self.batch_size == 1
-        loader = DataLoader(
-            dataset,
-            batch_size=self.batch_size,
-            shuffle=True,
-            drop_last=drop_last,
-            pin_memory=True,
-        )
-
-        return loader
+        return self._get_dataloader("dev", shuffle=True)
 
     def val_dataloader(self, *args: Any, **kwargs: Any) -> DataLoader:
         """
@@ -344,8 +601,11 @@ class RulDataModule(pl.LightningDataModule):
         The data loader is configured to leave the data unshuffled. The `pin_memory`
         option is activated to achieve maximum transfer speed to the GPU.
 
-        The whole split is held in memory. Therefore, the `num_workers` are set to
-        zero which uses the main process for creating batches.
+        The worker processes are configured by the `num_workers`,
+        `persistent_workers` and `prefetch_factor` of the data module.
+        Whole batches are gathered by the dataset and passed on by [collate_stacked]
+        [rul_datasets.core.collate_stacked] instead of collating single samples. If
+        the data module is `resident`, they are taken from the materialized split.
 
         Args:
             *args: Ignored. Only for adhering to parent class interface.
@@ -354,12 +614,7 @@ class RulDataModule(pl.LightningDataModule):
         Returns:
             The validation data loader
         """
-        return DataLoader(
-            self.to_dataset("val"),
-            batch_size=self.batch_size,
-            shuffle=False,
-            pin_memory=True,
-        )
+        return self._get_dataloader("val", shuffle=False)
 
     def test_dataloader(self, *args: Any, **kwargs: Any) -> DataLoader:
         """
@@ -368,8 +623,11 @@ class RulDataModule(pl.LightningDataModule):
         The data loader is configured to leave the data unshuffled. The `pin_memory`
         option is activated to achieve maximum transfer speed to the GPU.
 
-        The whole split is held in memory. Therefore, the `num_workers` are set to
-        zero which uses the main process for creating batches.
+        The worker processes are configured by the `num_workers`,
+        `persistent_workers` and `prefetch_factor` of the data module.
+        Whole batches are gathered by the dataset and passed on by [collate_stacked]
+        [rul_datasets.core.collate_stacked] instead of collating single samples. If
+        the data module is `resident`, they are taken from the materialized split.
 
         Args:
             *args: Ignored. Only for adhering to parent class interface.
@@ -378,13 +636,33 @@ class RulDataModule(pl.LightningDataModule):
         Returns:
             The test data loader
         """
-        return DataLoader(
-            self.to_dataset("test"),
+        return self._get_dataloader("test", shuffle=False)
+
+    def _get_dataloader(self, split: str, shuffle: bool) -> DataLoader:
+        """Create a data loader that fetches whole batches from the dataset.
+
+        The loader keeps the default samplers, so that Lightning can replace them,
+        e.g. with a distributed sampler. The dataset gathers each batch of indices
+        with `__getitems__` and `collate_stacked` passes the stacked batch on."""
+        if self.resident:
+            dataset = self._resident_datasets[split]
+            # batches are pinned by the dataset, so the loader does not pin them again
+            loader_kwargs: Dict[str, Any] = {}
+        else:
+            dataset = self.to_dataset(split)
+            loader_kwargs = {"pin_memory": True, **self.dataloader_kwargs}
+        drop_last = shuffle and len(dataset) % self.batch_size == 1
+        loader = DataLoader(
+            dataset,
             batch_size=self.batch_size,
-            shuffle=False,
-            pin_memory=True,
+            shuffle=shuffle,
+            drop_last=drop_last,
+            collate_fn=collate_stacked,
+            **loader_kwargs,
         )
 
+        return loader
+
     def to_dataset(self, split: str, alias: Optional[str] = None) -> "RulDataset":
         """
         Create a dataset of a split.
@@ -407,18 +685,321 @@ class RulDataModule(pl.LightningDataModule):
         if (alias is None) or (split == alias):
             features, targets = self._data[split]
         else:
-            features, targets = self.load_split(split, alias)
+            features, targets = self._load_split(split, alias)
         split_dataset = RulDataset(features, targets)
 
         return split_dataset
 
 
+class _SplitLists(MutableMapping):
+    """The splits of a data module as lists of runs that read and write through."""
+
+    def __init__(self, data: Dict[str, Tuple["_Runs", "_Runs"]]) -> None:
+        self._data = data
+
+    def __getitem__(self, split: str) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        features, targets = self._data[split]
+
+        return _to_list(features), _to_list(targets)
+
+    def __setitem__(self, split: str, runs: Tuple["_Runs", "_Runs"]) -> None:
+        self._data[split] = runs
+
+    def __delitem__(self, split: str) -> None:
+        del self._data[split]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def _to_list(runs: "_Runs") -> List[np.ndarray]:
+    if isinstance(runs, utils.RaggedArray):
+        return runs.tolist()  # views of the buffer unless samples were filtered
+
+    return runs
+
+
+def _share_memory(runs: List["_Runs"]) -> None:
+    for r in runs:
+        if isinstance(r, utils.RaggedArray):
+            r.share_memory()
+
+
+def _is_packable(features: List[np.ndarray], targets: List[np.ndarray]) -> bool:
+    """Check if runs can be concatenated into a ragged array without a detour.
+
+    Memory maps, lazy windows and overlapping views, e.g. windows in `view` mode,
+    are kept as they are, because concatenating them would load all of their data
+    into memory. Read-only runs are kept as well, because they are shared with other
+    readers by the registry and concatenating them would duplicate them for each
+    data module."""
+    all_runs = list(features) + list(targets)
+    is_plain = all(
+        type(r) is np.ndarray and r.flags.writeable and not _is_overlapping_view(r)
+        for r in all_runs
+    )
+    same_shape = all(
+        len({r.shape[1:] for r in runs}) == 1 for runs in [features, targets]
+    )
+
+    return bool(features) and is_plain and same_shape
+
+
+def _is_overlapping_view(array: np.ndarray) -> bool:
+    if array.size == 0:
+        return False
+    extent = sum((n - 1) * abs(stride) for n, stride in zip(array.shape, array.strides))
+
+    return (extent + array.itemsize) < array.nbytes
+
+
+def _get_extractor_fingerprint(extractor: Callable, version: Optional[str]) -> str:
+    if isinstance(extractor, functools.partial):  # identify the wrapped function
+        func_key = _get_extractor_fingerprint(extractor.func, version)
+        if version is not None:
+            return f"partial({func_key})"
+        bound = _get_stable_repr((extractor.args, sorted(extractor.keywords.items())))
+        return f"partial({func_key}):{bound}"
+    if inspect.isroutine(extractor):
+        name = f"{extractor.__module__}.{extractor.__qualname__}"
+    else:  # callable object whose state is part of the fingerprint via repr
+        extractor_cls = type(extractor)
+        name = f"{extractor_cls.__module__}.{extractor_cls.__qualname__}"
+        if version is None:
+            name = f"{name}:{_get_stable_repr(extractor)}"
+    if version is None:
+        try:
+            source = inspect.getsource(
+                extractor if inspect.isroutine(extractor) else type(extractor)
+            )
+        except (OSError, TypeError) as e:
+            raise ValueError(
+                f"Cannot read the source code of the feature extractor {extractor} "
+                "to cache its output. Please set an 'extractor_version'."
+            ) from e
+        version = hashlib.sha256(source.encode()).hexdigest()
+
+    return f"{name}:{version}"
+
+
+def _get_stable_repr(obj: Any) -> str:
+    """Return the repr of an object if it is the same in each process."""
+    obj_repr = repr(obj)
+    if _MEMORY_ADDRESS.search(obj_repr):
+        raise ValueError(
+            f"The representation of {obj_repr} contains a memory address and cannot "
+            "identify the feature extractor across processes to cache its output. "
+            "Please implement '__repr__' or set an 'extractor_version'."
+        )
+
+    return obj_repr
+
+
+def _extract_in_processes(
+    extractor: Callable,
+    features: List[np.ndarray],
+    targets: List[np.ndarray],
+    num_workers: int,
+    chunksize: int,
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Extract features from chunks of runs in a pool of worker processes.
+
+    Each chunk is copied into shared memory just before dispatching it and released
+    as soon as its result is collected. At most one chunk more than there are
+    workers is held in shared memory at any time to bound the peak memory."""
+    extracted: List[Tuple[np.ndarray, np.ndarray]] = []
+    pending: Deque[Tuple[Future, List[shared_memory.SharedMemory]]] = deque()
+    try:
+        with ProcessPoolExecutor(num_workers) as executor:
+            for start in range(0, len(features), chunksize):
+                if len(pending) > num_workers:
+                    extracted.extend(_collect_chunk(*pending.popleft()))
+                chunk = slice(start, start + chunksize)
+                pending.append(
+                    _submit_chunk(executor, extractor, features[chunk], targets[chunk])
+                )
+            while pending:
+                extracted.extend(_collect_chunk(*pending.popleft()))
+    finally:
+        for _, shared_runs in pending:
+            _release_shared_memory(shared_runs)
+
+    return extracted
+
+
+def _submit_chunk(
+    executor: ProcessPoolExecutor,
+    extractor: Callable,
+    features: List[np.ndarray],
+    targets: List[np.ndarray],
+) -> Tuple[Future, List[shared_memory.SharedMemory]]:
+    shared_runs: List[shared_memory.SharedMemory] = []
+    try:
+        for f in features:
+            shared_runs.append(_to_shared_memory(f))
+        specs = [(shm.name, f.shape, f.dtype) for shm, f in zip(shared_runs, features)]
+        future = executor.submit(_extract_chunk, extractor, specs, targets)
+    except BaseException:
+        _release_shared_memory(shared_runs)
+        raise
+
+    return future, shared_runs
+
+
+def _collect_chunk(
+    future: Future, shared_runs: List[shared_memory.SharedMemory]
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    try:
+        extracted = future.result()
+    finally:
+        _release_shared_memory(shared_runs)
+
+    return extracted
+
+
+def _release_shared_memory(shared_runs: List[shared_memory.SharedMemory]) -> None:
+    for shm in shared_runs:
+        shm.close()
+        shm.unlink()
+
+
+def _extract_run(
+    extractor: Callable,
+    features: np.ndarray,
+    targets: np.ndarray,
+    batch_size: Optional[int] = None,
+    memmap: bool = False,
+) -> Tuple[np.ndarray, np.ndarray]:
+    if batch_size is None:
+        features = np.asarray(features)  # materialize lazy windows
+        return extractor(features, targets)
+
+    num_windows = len(features)
+    extracted_features = extracted_targets = None
+    for start in range(0, num_windows, batch_size):
+        stop = min(start + batch_size, num_windows)
+        batch = np.asarray(features[start:stop])
+        batch_features, batch_targets = extractor(batch, targets[start:stop])
+        if not len(batch_features) == len(batch_targets) == stop - start:
+            raise ValueError(
+                "The feature extractor needs to return one feature vector and "
+                "target per window when extracting in batches."
+            )
+        if extracted_features is None:
+            extracted_features = _allocate(num_windows, batch_features, memmap)
+            extracted_targets = _allocate(num_windows, batch_targets, False)
+        extracted_features[start:stop] = batch_features
+        extracted_targets[start:stop] = batch_targets
+    if extracted_features is None:  # empty run
+        extracted_features, extracted_targets = extractor(features, targets)
+
+    return extracted_features, extracted_targets
+
+
+def _allocate(num_samples: int, template: np.ndarray, memmap: bool) -> np.ndarray:
+    shape = (num_samples, *template.shape[1:])
+    if memmap:
+        array = _allocate_memmap(shape, template.dtype)
+    else:
+        array = np.empty(shape, template.dtype)
+
+    return array
+
+
+def _allocate_memmap(shape: Tuple[int, ...], dtype: np.dtype) -> np.memmap:
+    """Allocate a memory map backed by a file that lives as long as the array.
+
+    The file is created in the data root and closed before mapping it, so that it
+    can be reopened on all platforms. It is removed when the array is garbage
+    collected or the interpreter exits."""
+    memmap_dir = os.path.join(get_data_root(), _EXTRACTOR_MEMMAP_DIR)
+    os.makedirs(memmap_dir, exist_ok=True)
+    tmp_fd, tmp_path = tempfile.mkstemp(suffix=".npy", dir=memmap_dir)
+    os.close(tmp_fd)
+    try:
+        array = np.lib.format.open_memmap(tmp_path, "w+", dtype, shape)
+    except BaseException:
+        _remove_file(tmp_path)
+        raise
+    weakref.finalize(array, _remove_file, tmp_path)
+
+    return array
+
+
+def _remove_file(file_path: str) -> None:
+    try:
+        os.remove(file_path)
+    except OSError:
+        pass  # still mapped by another view or already removed
+
+
+def _to_shared_memory(array: np.ndarray) -> shared_memory.SharedMemory:
+    num_bytes = int(np.prod(array.shape)) * array.dtype.itemsize
+    shm = shared_memory.SharedMemory(create=True, size=max(1, num_bytes))
+    np.ndarray(array.shape, array.dtype, buffer=shm.buf)[
+        ...
+    ] = array  # materializes lazy windows
+
+    return shm
+
+
+def _extract_chunk(
+    extractor: Callable,
+    specs: List[Tuple[str, Tuple[int, ...], np.dtype]],
+    targets: List[np.ndarray],
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    return [
+        _extract_from_shared_memory(extractor, spec, targ)
+        for spec, targ in zip(specs, targets)
+    ]
+
+
+def _extract_from_shared_memory(
+    extractor: Callable,
+    spec: Tuple[str, Tuple[int, ...], np.dtype],
+    targets: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        features = np.ndarray(shape, dtype, buffer=shm.buf)
+        extracted, targets = extractor(features, targets)
+        if np.shares_memory(extracted, features):
+            extracted = np.copy(extracted)  # detach from shared memory before closing
+        del features
+    finally:
+        shm.close()
+
+    return extracted, targets
+
+
 class RulDataset(Dataset):
     """Internal dataset to hold multiple runs.
 
-    Its length is the sum of all runs' lengths.
+    Its length is the sum of all runs' lengths. The start index of each run is
+    cached as cumulative offsets so that a sample can be located with a binary
+    search instead of a walk over all runs. The offsets are built on first access
+    and rebuilt whenever the lengths of the runs changed, e.g. because the
+    `features` were re-assigned or runs were added to their list in-place.
+
+    Besides single integers, the dataset can be indexed with a sequence of indices.
+    In this case, the samples are gathered with one vectorized call per run and
+    returned as already stacked tensors. If the runs are held by a [RaggedArray]
+    [rul_datasets.utils.RaggedArray], its offsets are used as run offsets and the
+    samples are gathered from its buffer with a single call.
+
+    After calling [to_resident][rul_datasets.core.RulDataset.to_resident], all
+    samples are held as contiguous tensors and batches are sliced or selected from
+    them directly.
     """
 
+    _run_offsets: Optional[np.ndarray]
+    _run_lengths: Optional[List[int]]
+    _resident: Optional[Tuple[torch.Tensor, ...]]
+
     def __init__(
         self,
         features: List[np.ndarray],
@@ -443,30 +1024,326 @@ class RulDataset(Dataset):
         self.targets = targets
         self.copy_tensors = copy_tensors
 
-    def __getitem__(self, index: int) -> Tuple[torch.Tensor, ...]:
+    @property
+    def features(self) -> List[np.ndarray]:
+        """The features of each run. Re-assigning them rebuilds the run offsets."""
+        return self._features
+
+    @features.setter
+    def features(self, features: List[np.ndarray]) -> None:
+        self._features = features
+        self._run_offsets = None  # invalidate cached offsets
+        self._resident = None
+
+    @property
+    def targets(self) -> Tuple[List[np.ndarray], ...]:
+        """The targets of each run. Re-assigning them rebuilds the run offsets."""
+        return self._targets
+
+    @targets.setter
+    def targets(self, targets: Tuple[List[np.ndarray], ...]) -> None:
+        self._targets = targets
+        self._run_offsets = None  # invalidate cached offsets
+        self._resident = None
+
+    @property
+    def run_offsets(self) -> np.ndarray:
+        """The global index of each run's first sample with the total length last."""
+        if isinstance(self.features, utils.RaggedArray):
+            return self.features.offsets
+        run_lengths = [len(f) for f in self.features]
+        if self._run_offsets is None or not run_lengths == self._run_lengths:
+            run_offsets = np.zeros(len(run_lengths) + 1, dtype=np.int64)
+            np.cumsum(run_lengths, out=run_offsets[1:])
+            self._run_offsets = run_offsets
+            self._run_lengths = run_lengths
+
+        return self._run_offsets
+
+    def __getitem__(
+        self, index: Union[int, Sequence[int], np.ndarray]
+    ) -> Tuple[torch.Tensor, ...]:
         if isinstance(index, slice):
             raise NotImplementedError("Slicing is not supported by this dataset.")
-        for i in range(len(self.features)):
-            if index < len(self.features[i]):
-                tensor_feat = utils.feature_to_tensor(
-                    self.features[i][index], copy=self.copy_tensors
-                )
-                tensor_tar = tuple(torch.as_tensor(t[i][index]) for t in self.targets)
-                return tensor_feat, *tensor_tar
-            else:
-                index -= len(self.features[i])
+        if isinstance(index, (Sequence, np.ndarray, torch.Tensor)):
+            return self._get_batch(index)
+        run_idx, sample_idx = self._locate(index)
+        if self._resident is not None:
+            return tuple(t[index] for t in self._resident)
+        if self._is_ragged:  # avoid gathering the whole run of an index view
+            feat = self.features.take(index)
+            tar = [t.take(index) for t in self.targets]
+        else:
+            feat = self.features[run_idx][sample_idx]
+            tar = [t[run_idx][sample_idx] for t in self.targets]
+        tensor_feat = utils.feature_to_tensor(feat, copy=self.copy_tensors)
+        tensor_tar = tuple(torch.as_tensor(t) for t in tar)
+
+        return tensor_feat, *tensor_tar
+
+    def to_resident(self, pin_memory: bool = True) -> "RulDataset":
+        """
+        Materialize all samples as contiguous tensors in-place.
+
+        The features are converted to `float32` in the channel-first layout of the
+        batches once. Afterward, batches of consecutive indices are views of these
+        tensors and all other batches are selected with `index_select`. If
+        `pin_memory` is set and CUDA is available, the tensors and selected
+        batches are placed in pinned memory for fast transfers to the GPU.
+
+        Args:
+            pin_memory: Whether to pin the materialized tensors.
+
+        Returns:
+            The dataset itself.
+        """
+        self._resident = None  # gather from the runs
+        batch = self._get_batch(np.arange(len(self)))
+        batch = tuple(t.contiguous() for t in batch)
+        if pin_memory and torch.cuda.is_available():
+            batch = tuple(t.pin_memory() for t in batch)
+        self._resident = batch
+
+        return self
+
+    @property
+    def is_resident(self) -> bool:
+        """Whether all samples are materialized as tensors."""
+        return self._resident is not None
+
+    @property
+    def _is_ragged(self) -> bool:
+        runs = [self.features, *self.targets]
+
+        return all(isinstance(r, utils.RaggedArray) for r in runs)
+
+    def _locate(self, index: int) -> Tuple[int, int]:
+        """Find the run of a global index and the index of the sample inside it."""
+        if not 0 <= index < len(self):
+            raise IndexError(f"Index {index} out of range.")
+        run_idx = int(np.searchsorted(self.run_offsets, index, side="right")) - 1
+        sample_idx = index - int(self.run_offsets[run_idx])
+
+        return run_idx, sample_idx
+
+    def __getitems__(self, indices: Sequence[int]) -> "StackedBatch":
+        """
+        Fetch a batch of samples for a [data loader][torch.utils.data.DataLoader].
+
+        The samples are gathered as a stacked batch and split up into views
+        afterward, as the data loader expects a list of samples to collate. The
+        stacked batch is kept, so that [collate_stacked]
+        [rul_datasets.core.collate_stacked] can return it without stacking the
+        samples again.
+
+        Args:
+            indices: The global indices of the samples.
 
-        raise IndexError(f"Index {index} out of range.")
+        Returns:
+            A list of samples in the order of `indices`.
+        """
+        return StackedBatch(self._get_batch(indices))
+
+    def _get_batch(
+        self, indices: Union[Sequence[int], np.ndarray, torch.Tensor]
+    ) -> Tuple[torch.Tensor, ...]:
+        indices = np.asarray(indices, dtype=np.int64)
+        if not np.all((0 <= indices) & (indices < len(self))):
+            raise IndexError(f"Indices {indices} out of range.")
+        if self._resident is not None:
+            return self._select_resident(indices)
+        if self._is_ragged:
+            features = self.features.take(indices).astype(np.float32, copy=False)
+            targets = [t.take(indices) for t in self.targets]
+        else:
+            run_idx = np.searchsorted(self.run_offsets, indices, side="right") - 1
+            sample_idx = indices - self.run_offsets[run_idx]
+            runs = np.unique(run_idx)
+            batch_pos = [np.flatnonzero(run_idx == run) for run in runs]
+            features = self._gather(
+                self.features, runs, batch_pos, sample_idx, np.float32
+            )
+            targets = [
+                self._gather(t, runs, batch_pos, sample_idx) for t in self.targets
+            ]
+
+        tensor_feat = utils.feature_to_tensor(features)
+        tensor_tar = tuple(torch.from_numpy(t) for t in targets)
+
+        return tensor_feat, *tensor_tar
+
+    def _select_resident(self, indices: np.ndarray) -> Tuple[torch.Tensor, ...]:
+        assert self._resident is not None
+        if len(indices) and np.all(np.diff(indices) == 1):
+            consecutive = slice(indices[0], indices[-1] + 1)
+            return tuple(t[consecutive] for t in self._resident)
+        idx = torch.from_numpy(indices)
+        batch = []
+        for t in self._resident:
+            out = torch.empty(
+                (len(idx), *t.shape[1:]), dtype=t.dtype, pin_memory=t.is_pinned()
+            )
+            batch.append(torch.index_select(t, 0, idx, out=out))
+
+        return tuple(batch)
+
+    @staticmethod
+    def _gather(
+        data: List[np.ndarray],
+        runs: np.ndarray,
+        batch_pos: List[np.ndarray],
+        sample_idx: np.ndarray,
+        dtype: Optional[np.dtype] = None,
+    ) -> np.ndarray:
+        """Gather samples from multiple runs with one fancy-index call per run."""
+        if len(runs):
+            template = data[runs[0]]
+        else:  # only the trailing shape of an empty batch is needed
+            template = data[0] if len(data) else np.empty((0, 0))
+        shape = (len(sample_idx), *template.shape[1:])
+        gathered = np.empty(shape, dtype=dtype or template.dtype)
+        for run, pos in zip(runs, batch_pos):
+            gathered[pos] = data[run][sample_idx[pos]]
+
+        return gathered
 
     def __len__(self) -> int:
-        return sum(len(f) for f in self.features)
+        return int(self.run_offsets[-1])
+
+
+class StackedBatch(list):
+    """
+    A list of samples that also holds them as stacked tensors.
+
+    It is returned by the `__getitems__` function of a [RulDataset]
+    [rul_datasets.core.RulDataset]. The samples are views of the stacked tensors.
+    The default collate function stacks them again, while [collate_stacked]
+    [rul_datasets.core.collate_stacked] returns the stacked tensors directly.
+    """
+
+    def __init__(self, stacked: Tuple[torch.Tensor, ...]) -> None:
+        """
+        Create a new list of samples from stacked tensors.
+
+        Args:
+            stacked: The stacked features and targets of the samples.
+        """
+        super().__init__(zip(*(torch.unbind(t) for t in stacked)))
+        self.stacked = stacked
+
+
+def collate_stacked(batch: List[Tuple[torch.Tensor, ...]]) -> List[torch.Tensor]:
+    """
+    Collate a batch of samples for a [data loader][torch.utils.data.DataLoader].
+
+    A [StackedBatch][rul_datasets.core.StackedBatch] is returned as its stacked
+    tensors without copying them. Other batches, e.g. of datasets without a
+    `__getitems__` function, are collated with the default collate function.
+
+    Args:
+        batch: The samples of the batch.
+
+    Returns:
+        The stacked features and targets of the batch.
+    """
+    if isinstance(batch, StackedBatch):
+        return list(batch.stacked)
+
+    return default_collate(batch)
+
+
+class RulBatchSampler(Sampler):
+    """
+    A batch sampler for [RulDatasets][rul_datasets.core.RulDataset] that yields
+    whole batches of indices as numpy arrays.
+
+    The indices of each batch are sorted so that samples from the same run are
+    adjacent. This way, the dataset can gather them with a single vectorized call
+    per run. Use it as the `sampler` of a [data loader][torch.utils.data.DataLoader]
+    with `batch_size=None` to receive stacked batches without collating.
+
+    Examples:
+        >>> import rul_datasets
+        >>> from torch.utils.data import DataLoader
+        >>> cmapss = rul_datasets.reader.CmapssReader(fd=1)
+        >>> dm = rul_datasets.RulDataModule(cmapss, batch_size=32)
+        >>> dm.prepare_data()
+        >>> dm.setup()
+        >>> dataset = dm.to_dataset("dev")
+        >>> sampler = rul_datasets.core.RulBatchSampler(dataset, 32, shuffle=True)
+        >>> loader = DataLoader(dataset, batch_size=None, sampler=sampler)
+        >>> features, targets = next(iter(loader))
+        >>> features.shape
+        torch.Size([32, 14, 30])
+    """
+
+    def __init__(
+        self,
+        dataset: Dataset,
+        batch_size: int,
+        shuffle: bool = False,
+        drop_last: bool = False,
+        generator: Optional[torch.Generator] = None,
+    ) -> None:
+        """
+        Create a new batch sampler for a dataset.
+
+        Args:
+            dataset: The dataset to sample from.
+            batch_size: The number of indices per batch.
+            shuffle: Whether to draw the indices in random order.
+            drop_last: Whether to drop the last batch if it is incomplete.
+            generator: The random generator used for shuffling.
+        """
+        super().__init__(None)
+
+        self.num_samples = len(dataset)  # type: ignore[arg-type]
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.generator = generator
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        if self.shuffle:
+            order = torch.randperm(self.num_samples, generator=self.generator).numpy()
+        else:
+            order = np.arange(self.num_samples)
+        for start in range(0, len(self) * self.batch_size, self.batch_size):
+            yield np.sort(order[start : start + self.batch_size])
+
+    def __len__(self) -> int:
+        if self.drop_last:
+            return self.num_samples // self.batch_size
+        else:
+            return -(-self.num_samples // self.batch_size)  # ceil division
 
 
 class PairedRulDataset(IterableDataset):
     """A dataset of sample pairs drawn from the same time series.
 
     The dataset uses the runs exactly as loaded by the passed data modules. Options
-    like `degraded_only` need to be set there."""
+    like `degraded_only` need to be set there.
+
+    By default, the dataset yields one pair at a time. If `batch_size` is set,
+    it yields whole batches of stacked pairs instead. The indices of all pairs in a
+    batch are drawn at once and the anchors and queries are gathered with one
+    fancy-index call per run. Use it with `DataLoader(dataset, batch_size=None)` to
+    avoid collating the batches again. In this mode, the length of the dataset is
+    the number of batches.
+
+    A deterministic dataset draws its pairs from a counter-based random number
+    generator, i.e. the i-th pair is a function of a fixed seed and i alone. This
+    has three consequences: multiple data loader workers each produce a disjoint
+    shard of the same pairs, the dataset can be indexed like a map-style dataset,
+    e.g. to resume at an offset with a [Subset][torch.utils.data.Subset], and the
+    batched mode yields the same pairs as the single-pair mode.
+
+    The indices of all pairs of a deterministic dataset are drawn once, on first
+    access, and kept in a pair table (see [get_pair_table]
+    [rul_datasets.core.PairedRulDataset.get_pair_table]). Each epoch only gathers the
+    pairs from this table. If `cache_pair_table` is set, the table is additionally
+    saved to the `pairs` folder of the data root and reused by any deterministic
+    dataset with the same runs and settings."""
 
     def __init__(
         self,
@@ -476,6 +1353,8 @@ class PairedRulDataset(IterableDataset):
         min_distance: int,
         deterministic: bool = False,
         mode: str = "linear",
+        batch_size: Optional[int] = None,
+        cache_pair_table: bool = False,
     ):
         super().__init__()
 
@@ -485,6 +1364,8 @@ class PairedRulDataset(IterableDataset):
         self.num_samples = num_samples
         self.deterministic = deterministic
         self.mode = mode
+        self.batch_size = batch_size
+        self.cache_pair_table = cache_pair_table
 
         for dm in self.dms:
             dm.check_compatibility(self.dms[0])
@@ -496,13 +1377,18 @@ class PairedRulDataset(IterableDataset):
 
         self._max_rul = self._get_max_rul()
         self._curr_iter = 0
-        self._rng = self._reset_rng()
+        self._iter_stride = self._pairs_per_step
+        self._pair_table: Optional[Tuple[np.ndarray, ...]] = None
+        self._rng: Union[np.random.Generator, "_CounterRng"] = self._reset_rng()
         if mode == "linear":
             self._get_pair_func = self._get_pair_idx
+            self._get_pair_batch_func = self._get_pair_idx_batch
         elif mode == "piecewise":
             self._get_pair_func = self._get_pair_idx_piecewise
+            self._get_pair_batch_func = self._get_pair_idx_piecewise_batch
         elif mode == "labeled":
             self._get_pair_func = self._get_labeled_pair_idx
+            self._get_pair_batch_func = self._get_labeled_pair_idx_batch
 
     def _get_max_rul(self) -> Optional[int]:
         max_ruls = [dm.reader.max_rul for dm in self.dms]
@@ -531,37 +1417,145 @@ class PairedRulDataset(IterableDataset):
                     labels.append(lab)
 
         self._run_domain_idx = np.array(run_domain_idx)
+        self._run_lengths = np.array([len(f) for f in features], dtype=np.int64)
         self._features = features
         self._labels = labels
 
-    def _reset_rng(self, seed=42) -> np.random.Generator:
-        return np.random.default_rng(seed=seed)
+    def _reset_rng(self, seed=42) -> Union[np.random.Generator, "_CounterRng"]:
+        if self.deterministic:
+            return _CounterRng(seed)
+        else:
+            return np.random.default_rng(seed=seed)
+
+    @property
+    def _pairs_per_step(self) -> int:
+        return 1 if self.batch_size is None else self.batch_size
 
     def __len__(self) -> int:
-        return self.num_samples
+        if self.batch_size is None:
+            return self.num_samples
+        else:
+            return -(-self.num_samples // self.batch_size)  # ceil division
+
+    def __getitem__(
+        self, index: int
+    ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+        if not self.deterministic:
+            raise RuntimeError("Only a deterministic PairedRulDataset can be indexed.")
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Index {index} out of range for {len(self)} samples.")
+
+        return self._get_sample(index * self._pairs_per_step)
 
     def __iter__(self):
-        self._curr_iter = 0
         worker_info = get_worker_info()
-        if self.deterministic and worker_info is not None:
-            raise RuntimeError(
-                "PairedDataset cannot run deterministic in multiprocessing"
-            )
-        elif self.deterministic:
-            self._rng = self._reset_rng()
-        elif worker_info is not None:
+        if worker_info is not None:
+            # each worker produces every num_workers-th step of the same sequence
+            self._curr_iter = worker_info.id * self._pairs_per_step
+            self._iter_stride = worker_info.num_workers * self._pairs_per_step
+        else:
+            self._curr_iter = 0
+            self._iter_stride = self._pairs_per_step
+        if worker_info is not None and not self.deterministic:
             self._rng = self._reset_rng(worker_info.seed)
 
         return self
 
     def __next__(self) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
-        if self._curr_iter < self.num_samples:
-            run_idx, anchor_idx, query_idx, dist, domain_label = self._get_pair_func()
-            self._curr_iter += 1
+        if self._curr_iter >= self.num_samples:
+            raise StopIteration
+        sample = self._get_sample(self._curr_iter)
+        self._curr_iter += self._iter_stride
+
+        return sample
+
+    def _get_sample(
+        self, first_pair: int
+    ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+        num_pairs = min(self._pairs_per_step, self.num_samples - first_pair)
+        if self.batch_size is None:
+            if self.deterministic:
+                pair_idx = [idx[first_pair] for idx in self.get_pair_table()]
+            else:
+                pair_idx = self._get_pair_func()
+            run_idx, anchor_idx, query_idx, dist, domain_label = pair_idx
             run = self._features[run_idx]
-            return self._build_pair(run, anchor_idx, query_idx, dist, domain_label)
+            sample = self._build_pair(run, anchor_idx, query_idx, dist, domain_label)
         else:
-            raise StopIteration
+            if self.deterministic:
+                pairs = slice(first_pair, first_pair + num_pairs)
+                pair_idx = [idx[pairs] for idx in self.get_pair_table()]
+            else:
+                pair_idx = self._get_pair_batch_func(num_pairs)
+            sample = self._build_pair_batch(*pair_idx)
+
+        return sample
+
+    def get_pair_table(self) -> Tuple[np.ndarray, ...]:
+        """
+        Return the indices of all pairs of a deterministic dataset.
+
+        The table is drawn on the first call and kept afterward. If
+        `cache_pair_table` is set, it is loaded from or saved to the data root.
+
+        Returns:
+            The run index, anchor index, query index, unnormalized distance and
+            domain label of each pair.
+        """
+        if not self.deterministic:
+            raise RuntimeError(
+                "Only a deterministic PairedRulDataset has a fixed pair table."
+            )
+        if self._pair_table is None:
+            if self.cache_pair_table:
+                self._pair_table = self._load_cached_pair_table()
+            else:
+                self._pair_table = self._draw_pair_table()
+
+        return self._pair_table
+
+    def _draw_pair_table(self) -> Tuple[np.ndarray, ...]:
+        cast(_CounterRng, self._rng).seek(0, self.num_samples)
+        pair_table = self._get_pair_batch_func(self.num_samples)
+
+        return tuple(np.asarray(idx) for idx in pair_table)
+
+    def _load_cached_pair_table(self) -> Tuple[np.ndarray, ...]:
+        cache_path = self._get_pair_table_path()
+        if os.path.exists(cache_path):
+            with np.load(cache_path) as cached:
+                return tuple(cached[key] for key in _PAIR_TABLE_KEYS)
+        pair_table = self._draw_pair_table()
+        cache_dir = os.path.dirname(cache_path)
+        os.makedirs(cache_dir, exist_ok=True)
+        # write to a temporary file first so that no process reads a partial table
+        tmp_fd, tmp_path = tempfile.mkstemp(suffix=".npz", dir=cache_dir)
+        try:
+            with os.fdopen(tmp_fd, mode="wb") as f:
+                np.savez(f, **dict(zip(_PAIR_TABLE_KEYS, pair_table)))
+            os.replace(tmp_path, cache_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        return pair_table
+
+    def _get_pair_table_path(self) -> str:
+        fingerprint = hashlib.sha256()
+        seed = cast(_CounterRng, self._rng).seed
+        settings = [self.mode, self.num_samples, self.min_distance, self._max_rul, seed]
+        fingerprint.update(repr(settings).encode())
+        fingerprint.update(self._run_domain_idx.tobytes())
+        fingerprint.update(self._run_lengths.tobytes())
+        if self.mode == "labeled":  # distances are taken from the labels
+            for labels in self._labels:
+                fingerprint.update(np.ascontiguousarray(labels).tobytes())
+        cache_dir = os.path.join(get_data_root(), _PAIR_TABLE_CACHE_DIR)
+        cache_path = os.path.join(cache_dir, f"{fingerprint.hexdigest()}.npz")
+
+        return cache_path
 
     def _get_pair_idx(self) -> Tuple[int, int, int, Union[int, float], int]:
         chosen_run_idx = self._rng.integers(0, len(self._features))
@@ -624,6 +1618,78 @@ class PairedRulDataset(IterableDataset):
 
         return chosen_run_idx, anchor_idx, query_idx, distance, domain_label
 
+    def _get_pair_idx_batch(self, num_pairs: int) -> Tuple[np.ndarray, ...]:
+        run_idx, run_lengths, anchor_idx = self._get_anchor_idx_batch(num_pairs)
+        end_idx = np.minimum(run_lengths, anchor_idx + (self._max_rul or 999999))
+        query_idx = self._rng.integers(anchor_idx + self.min_distance, end_idx)
+        distance = query_idx - anchor_idx
+        domain_label = self._run_domain_idx[run_idx]
+
+        return run_idx, anchor_idx, query_idx, distance, domain_label
+
+    def _get_pair_idx_piecewise_batch(self, num_pairs: int) -> Tuple[np.ndarray, ...]:
+        run_idx, run_lengths, anchor_idx = self._get_anchor_idx_batch(num_pairs)
+        middle_idx = run_lengths // 2
+        end_idx = np.where(
+            anchor_idx < (middle_idx - self.min_distance), middle_idx, run_lengths
+        )
+        query_idx = self._rng.integers(anchor_idx + self.min_distance, end_idx)
+        distance = np.where(anchor_idx > middle_idx, query_idx - anchor_idx, 0)
+        domain_label = self._run_domain_idx[run_idx]
+
+        return run_idx, anchor_idx, query_idx, distance, domain_label
+
+    def _get_labeled_pair_idx_batch(self, num_pairs: int) -> Tuple[np.ndarray, ...]:
+        run_idx, run_lengths, anchor_idx = self._get_anchor_idx_batch(num_pairs)
+        query_idx = self._rng.integers(anchor_idx + self.min_distance, run_lengths)
+        runs, batch_pos = self._group_by_run(run_idx)
+        anchor_labels = RulDataset._gather(self._labels, runs, batch_pos, anchor_idx)
+        query_labels = RulDataset._gather(self._labels, runs, batch_pos, query_idx)
+        # RUL label difference is negative time step difference
+        distance = anchor_labels - query_labels
+        domain_label = self._run_domain_idx[run_idx]
+
+        return run_idx, anchor_idx, query_idx, distance, domain_label
+
+    def _get_anchor_idx_batch(self, num_pairs: int) -> Tuple[np.ndarray, ...]:
+        run_idx = self._rng.integers(0, len(self._features), num_pairs)
+        run_lengths = self._run_lengths[run_idx]
+        anchor_idx = self._rng.integers(0, run_lengths - self.min_distance)
+
+        return run_idx, run_lengths, anchor_idx
+
+    @staticmethod
+    def _group_by_run(run_idx: np.ndarray) -> Tuple[np.ndarray, List[np.ndarray]]:
+        runs = np.unique(run_idx)
+        batch_pos = [np.flatnonzero(run_idx == run) for run in runs]
+
+        return runs, batch_pos
+
+    def _build_pair_batch(
+        self,
+        run_idx: np.ndarray,
+        anchor_idx: np.ndarray,
+        query_idx: np.ndarray,
+        distance: np.ndarray,
+        domain_label: np.ndarray,
+    ) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+        runs, batch_pos = self._group_by_run(run_idx)
+        anchors = RulDataset._gather(
+            self._features, runs, batch_pos, anchor_idx, np.float32
+        )
+        queries = RulDataset._gather(
+            self._features, runs, batch_pos, query_idx, np.float32
+        )
+        anchors = utils.feature_to_tensor(anchors)
+        queries = utils.feature_to_tensor(queries)
+        domain_tensor = torch.as_tensor(domain_label, dtype=torch.float)
+        distances = torch.as_tensor(distance, dtype=torch.float)
+        if self._max_rul is not None:  # normalize only if max_rul is set
+            distances /= self._max_rul
+            distances = torch.clamp_max(distances, max=1)
+
+        return anchors, queries, distances, domain_tensor
+
     def _build_pair(
         self,
         run: np.ndarray,
@@ -641,3 +1707,77 @@ class PairedRulDataset(IterableDataset):
             distances = torch.clamp_max(distances, max=1)
 
         return anchors, queries, distances, domain_tensor
+
+
+class _CounterRng:
+    """
+    A counter-based random number generator for the pairs of a [PairedRulDataset]
+    [rul_datasets.core.PairedRulDataset].
+
+    The j-th random number of pair i is a hash of the seed, i and j. Calling `seek`
+    selects the pairs for which the following calls to `integers` draw numbers.
+    Each call to `integers` draws the next random number of each selected pair.
+    """
+
+    def __init__(self, seed: int) -> None:
+        self.seed = seed
+        self._pair_idx = np.zeros(1, dtype=np.uint64)
+        self._scalar = True
+        self._num_draws = 0
+
+    def seek(self, first_pair: int, num_pairs: Optional[int] = None) -> None:
+        """
+        Select the pairs to draw random numbers for.
+
+        Args:
+            first_pair: Index of the first selected pair.
+            num_pairs: Number of selected pairs or `None` to draw scalars for a
+                       single pair.
+        """
+        self._scalar = num_pairs is None
+        num_pairs = 1 if num_pairs is None else num_pairs
+        self._pair_idx = np.arange(first_pair, first_pair + num_pairs, dtype=np.uint64)
+        self._num_draws = 0
+
+    def integers(self, low, high, size=None):
+        """
+        Draw a random integer in `[low, high)` for each selected pair.
+
+        If a single pair is selected, `size` draws this many consecutive numbers of
+        it instead. Otherwise, `size` has to match the number of selected pairs.
+
+        Raises:
+            ValueError: If `high` is not greater than `low` for any selected pair or
+                        `size` does not match the selected pairs.
+        """
+        low, high = np.asarray(low), np.asarray(high)
+        if np.any(high <= low):
+            raise ValueError("high <= low")
+        if self._scalar and size is not None:
+            num_draws = int(np.prod(size))
+        elif size is None or np.atleast_1d(size).tolist() == [len(self._pair_idx)]:
+            num_draws = 1
+        else:
+            raise ValueError(f"Size {size} does not match the selected pairs.")
+        draws = np.arange(self._num_draws, self._num_draws + num_draws, dtype=np.uint64)
+        self._num_draws += num_draws
+        counter = (self._pair_idx << np.uint64(8)) + draws  # one per pair or draw
+        uniform = _hash_to_uniform(counter, self.seed)
+        drawn = low + np.floor(uniform * (high - low)).astype(np.int64)
+        drawn = np.minimum(drawn, high - 1)  # guard against rounding up
+        if self._scalar:
+            drawn = drawn[0] if size is None else drawn.reshape(size)
+
+        return drawn
+
+
+def _hash_to_uniform(counter: np.ndarray, seed: int) -> np.ndarray:
+    """Map counters to uniform floats in [0, 1) with the SplitMix64 finalizer."""
+    with np.errstate(over="ignore"):
+        z = counter ^ np.uint64((seed * 0x9E3779B97F4A7C15) % 2**64)
+        z = z + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = z ^ (z >> np.uint64(31))
+
+    return (z >> np.uint64(11)).astype(np.float64) * 2.0**-53
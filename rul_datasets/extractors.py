@@ -0,0 +1,287 @@
+"""Feature extractors for vibration data, e.g. the FEMTO and XJTU-SY bearing
+datasets. The extractors can be passed as the `feature_extractor` of a
+[RulDataModule][rul_datasets.core.RulDataModule]. They receive a batch of windows
+with the shape `[num_windows, window_size, num_channels]` and compute all requested
+features in a single, batched pass with PyTorch. The result has the shape
+`[num_windows, num_features * num_channels]` and can be re-windowed by setting the
+`window_size` of the data module.
+
+Examples:
+    >>> import rul_datasets
+    >>> from rul_datasets.extractors import VibrationFeatureExtractor
+    >>> fe = VibrationFeatureExtractor(["rms", "kurtosis"], num_bands=4)
+    >>> fd1 = rul_datasets.reader.XjtuSyReader(fd=1)
+    >>> dm = rul_datasets.RulDataModule(fd1, 32, feature_extractor=fe, window_size=10)
+    >>> dm.setup()
+    >>> features, _ = dm.to_dataset("dev")[0]
+    >>> features.shape
+    torch.Size([12, 10])
+"""
+
+import hashlib
+import inspect
+import types
+from functools import cached_property
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import torch
+
+DEFAULT_FEATURES = [
+    "mean",
+    "std",
+    "rms",
+    "peak",
+    "peak_to_peak",
+    "skewness",
+    "kurtosis",
+    "crest_factor",
+    "shape_factor",
+    "impulse_factor",
+    "clearance_factor",
+]
+
+FeatureFunction = Callable[[torch.Tensor], torch.Tensor]
+
+
+class VibrationFeatureExtractor:
+    """
+    Extract time and frequency domain features from windows of vibration data.
+
+    The features are selected by name from the list below. All selected features
+    share intermediate results, e.g. the mean or the RMS, so that each is computed
+    only once per batch. Additionally, custom features can be supplied as functions
+    that take the windows as a tensor of shape `[num_windows, window_size,
+    num_channels]` and return a tensor of shape `[num_windows, num_channels]`. They
+    are identified in the `repr` of the extractor by their name and a hash of their
+    byte code and bound values, so that the extractor cache of a data module tells
+    them apart.
+
+    Available features:
+
+    * `mean`, `std` (biased), `rms`, `peak` (maximum absolute value), `peak_to_peak`
+    * `skewness` and `kurtosis` (excess) as calculated by `scipy.stats`
+    * `crest_factor` (peak / RMS), `shape_factor` (RMS / mean absolute value)
+    * `impulse_factor` (peak / mean absolute value)
+    * `clearance_factor` (peak / squared mean of the square root of absolute values)
+
+    If `num_bands` is greater than zero, the power spectrum of each window is
+    calculated with `torch.fft.rfft`, split into `num_bands` bands of equal width and
+    the mean power of each band is appended to the features.
+
+    The output features are ordered by feature first and channel second, i.e.
+    `[f0_c0, f0_c1, f1_c0, f1_c1, ...]`.
+
+    Examples:
+        >>> import numpy as np
+        >>> from rul_datasets.extractors import VibrationFeatureExtractor
+        >>> fe = VibrationFeatureExtractor(["rms", "kurtosis"], num_bands=2)
+        >>> windows = np.random.randn(100, 2560, 2)
+        >>> features, targets = fe(windows, np.arange(100))
+        >>> features.shape
+        (100, 8)
+    """
+
+    def __init__(
+        self,
+        features: Optional[Sequence[Union[str, FeatureFunction]]] = None,
+        num_bands: int = 0,
+        dtype: torch.dtype = torch.float32,
+        device: Union[str, torch.device] = "cpu",
+    ) -> None:
+        """
+        Create a new vibration feature extractor.
+
+        Args:
+            features: Names of built-in features or feature functions to extract.
+                      Defaults to all built-in features.
+            num_bands: Number of spectral bands to extract.
+            dtype: The dtype to calculate the features in.
+            device: The device to calculate the features on.
+        """
+        self.features = list(DEFAULT_FEATURES if features is None else features)
+        self.num_bands = num_bands
+        self.dtype = dtype
+        self.device = device
+
+        unknown = [
+            f for f in self.features if isinstance(f, str) and f not in _FEATURES
+        ]
+        if unknown:
+            raise ValueError(f"Unknown features {unknown}.")
+        if self.num_bands < 0:
+            raise ValueError("The number of spectral bands needs to be non-negative.")
+
+    @property
+    def num_features(self) -> int:
+        """Number of features extracted per channel."""
+        return len(self.features) + self.num_bands
+
+    def __call__(
+        self, features: np.ndarray, targets: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Extract features from a batch of windows.
+
+        Args:
+            features: Windows of shape `[num_windows, window_size, num_channels]`.
+            targets: Targets of each window which are returned unchanged.
+
+        Returns:
+            features: Features of shape `[num_windows, num_features * num_channels]`.
+            targets: The unchanged targets.
+        """
+        with torch.no_grad():
+            windows = torch.as_tensor(
+                np.asarray(features), dtype=self.dtype, device=self.device
+            )
+            extracted = self.extract(windows)
+        extracted = extracted.flatten(start_dim=1).cpu().numpy()
+
+        return extracted, targets
+
+    def extract(self, windows: torch.Tensor) -> torch.Tensor:
+        """
+        Extract features from a batch of windows as tensors.
+
+        Args:
+            windows: Windows of shape `[num_windows, window_size, num_channels]`.
+
+        Returns:
+            Features of shape `[num_windows, num_features, num_channels]`.
+        """
+        stats = _WindowStatistics(windows)
+        extracted = [
+            _FEATURES[f](stats) if isinstance(f, str) else f(windows)
+            for f in self.features
+        ]
+        if self.num_bands > 0:
+            extracted.extend(stats.spectral_bands(self.num_bands))
+        if not extracted:
+            return windows.new_empty((windows.shape[0], 0, windows.shape[2]))
+
+        return torch.stack(extracted, dim=1)
+
+    def __repr__(self) -> str:
+        features = [f if isinstance(f, str) else _get_name(f) for f in self.features]
+
+        return (
+            f"{type(self).__name__}(features={features}, num_bands={self.num_bands}, "
+            f"dtype={self.dtype}, device={self.device})"
+        )
+
+
+class _WindowStatistics:
+    """Lazily computed statistics of windows shared by all features."""
+
+    def __init__(self, windows: torch.Tensor) -> None:
+        self.windows = windows
+        self.tiny = torch.finfo(windows.dtype).tiny
+
+    @cached_property
+    def mean(self) -> torch.Tensor:
+        return self.windows.mean(dim=1)
+
+    @cached_property
+    def centered(self) -> torch.Tensor:
+        return self.windows - self.mean[:, None]
+
+    @cached_property
+    def var(self) -> torch.Tensor:
+        return self.centered.square().mean(dim=1)
+
+    @cached_property
+    def std(self) -> torch.Tensor:
+        return self.var.sqrt()
+
+    @cached_property
+    def abs(self) -> torch.Tensor:
+        return self.windows.abs()
+
+    @cached_property
+    def abs_mean(self) -> torch.Tensor:
+        return self.abs.mean(dim=1)
+
+    @cached_property
+    def rms(self) -> torch.Tensor:
+        return self.windows.square().mean(dim=1).sqrt()
+
+    @cached_property
+    def peak(self) -> torch.Tensor:
+        return self.abs.amax(dim=1)
+
+    @cached_property
+    def peak_to_peak(self) -> torch.Tensor:
+        return self.windows.amax(dim=1) - self.windows.amin(dim=1)
+
+    @cached_property
+    def skewness(self) -> torch.Tensor:
+        third_moment = self.centered.pow(3).mean(dim=1)
+
+        return third_moment / self._safe(self.var.pow(1.5))
+
+    @cached_property
+    def kurtosis(self) -> torch.Tensor:
+        fourth_moment = self.centered.pow(4).mean(dim=1)
+
+        return fourth_moment / self._safe(self.var.square()) - 3
+
+    @cached_property
+    def crest_factor(self) -> torch.Tensor:
+        return self.peak / self._safe(self.rms)
+
+    @cached_property
+    def shape_factor(self) -> torch.Tensor:
+        return self.rms / self._safe(self.abs_mean)
+
+    @cached_property
+    def impulse_factor(self) -> torch.Tensor:
+        return self.peak / self._safe(self.abs_mean)
+
+    @cached_property
+    def clearance_factor(self) -> torch.Tensor:
+        sqrt_abs_mean = self.abs.sqrt().mean(dim=1)
+
+        return self.peak / self._safe(sqrt_abs_mean.square())
+
+    @cached_property
+    def power_spectrum(self) -> torch.Tensor:
+        spectrum = torch.fft.rfft(self.windows, dim=1)
+
+        return spectrum.abs().square() / self.windows.shape[1]
+
+    def spectral_bands(self, num_bands: int) -> List[torch.Tensor]:
+        bands = torch.tensor_split(self.power_spectrum, num_bands, dim=1)
+
+        return [band.mean(dim=1) for band in bands]
+
+    def _safe(self, denominator: torch.Tensor) -> torch.Tensor:
+        return denominator.clamp_min(self.tiny)
+
+
+_FEATURES = {name: getattr(_WindowStatistics, name).func for name in DEFAULT_FEATURES}
+
+
+def _get_name(func: Callable) -> str:
+    """Name of a custom feature function with a hash of its code and bound state."""
+    if not inspect.isroutine(func):  # callable object identified by its state
+        return repr(func)
+    name = getattr(func, "__qualname__", type(func).__qualname__)
+    code = getattr(func, "__code__", None)
+    if code is None:  # built-in functions are identified by their name only
+        return name
+    digest = hashlib.sha256(_hash_code(code).encode())
+    closure = [c.cell_contents for c in func.__closure__ or []]
+    digest.update(repr((func.__defaults__, func.__kwdefaults__, closure)).encode())
+
+    return f"{name}@{digest.hexdigest()[:16]}"
+
+
+def _hash_code(code: types.CodeType) -> str:
+    digest = hashlib.sha256(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        const_key = _hash_code(const) if isinstance(const, types.CodeType) else const
+        digest.update(repr(const_key).encode())
+
+    return digest.hexdigest()
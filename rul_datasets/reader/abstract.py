@@ -6,7 +6,7 @@ from typing import Optional, Union, List, Dict, Any, Iterable, Tuple, Literal
 
 import numpy as np
 
-from rul_datasets.reader import truncating
+from rul_datasets.reader import truncating, split_cache, registry
 
 
 class AbstractReader(metaclass=abc.ABCMeta):
@@ -193,6 +193,12 @@ class AbstractReader(metaclass=abc.ABCMeta):
         e.g. load the test split and treat it as the dev split. The data of `split`
         is loaded but all pre-processing steps of `alias` are carried out.
 
+        If the [split cache][rul_datasets.reader.split_cache] is enabled, the
+        processed split is saved to disk and opened as read-only memory maps on
+        subsequent calls. If the [registry][rul_datasets.reader.registry] is
+        enabled, the complete split is shared with other readers that differ only in
+        their truncation settings.
+
         Args:
             split: The desired split to load.
             alias: The split as which the loaded data should be treated.
@@ -202,7 +208,12 @@ class AbstractReader(metaclass=abc.ABCMeta):
             targets: The truncated targets of the desired split.
         """
         alias = alias or split
-        features, targets = self.load_complete_split(split, alias)
+        use_cache = split_cache.is_split_cache_enabled()
+        if use_cache:
+            cached = split_cache.load_split(self, split, alias)
+            if cached is not None:
+                return cached
+        features, targets = registry.load_complete_split(self, split, alias)
         if alias == "dev":
             features, targets = truncating.truncate_runs(
                 features,
@@ -218,9 +229,28 @@ class AbstractReader(metaclass=abc.ABCMeta):
                 self.percent_broken,
                 degraded_only=self.truncate_degraded_only,
             )
+        if use_cache:
+            split_cache.save_split(self, split, alias, features, targets)
 
         return features, targets
 
+    def _get_artifact_paths(self, split: str) -> List[str]:
+        """
+        The prepared files a split is loaded from.
+
+        The size and modification time of these files are part of the key of the
+        [split cache][rul_datasets.reader.split_cache]. Override this function if
+        your reader loads prepared files so that re-preparing them invalidates the
+        cache.
+
+        Args:
+            split: The split to be loaded.
+
+        Returns:
+            The paths of the files the split is loaded from.
+        """
+        return []
+
     def get_compatible(
         self,
         fd: Optional[int] = None,
@@ -318,7 +348,7 @@ class AbstractReader(metaclass=abc.ABCMeta):
         return other
 
     def _get_complement_idx(self) -> List[int]:
-        num_runs = self._NUM_TRAIN_RUNS[self.fd]
+        num_runs = self._get_num_train_runs()
         run_idx = list(range(num_runs))
         if isinstance(self.percent_fail_runs, float):
             split_idx = int(self.percent_fail_runs * num_runs)
@@ -330,6 +360,10 @@ class AbstractReader(metaclass=abc.ABCMeta):
 
         return complement_idx
 
+    def _get_num_train_runs(self) -> int:
+        """Number of development runs that `percent_fail_runs` refers to."""
+        return self._NUM_TRAIN_RUNS[self.fd]
+
     def is_mutually_exclusive(self, other: "AbstractReader") -> bool:
         """
         Check if this reader is mutually exclusive to another reader.
@@ -2,11 +2,13 @@
 degradation experiments on jet engines. It contains four sub-datasets named FD1, FD2,
 FD3 and FD4 which differ in operation conditions and possible failure types."""
 
+import hashlib
+import json
 import os
 import tempfile
 import warnings
 import zipfile
-from typing import Union, List, Tuple, Dict, Optional
+from typing import Any, Union, List, Tuple, Dict, Optional, Literal, Callable
 
 import numpy as np
 from sklearn import preprocessing as scalers  # type: ignore
@@ -18,6 +20,7 @@ from rul_datasets import utils
 
 
 CMAPSS_URL = "https://kr0k0tsch.de/rul-datasets/CMAPSSData.zip"
+_BINARY_DIR = "binary"
 
 
 class CmapssReader(AbstractReader):
@@ -25,7 +28,8 @@ class CmapssReader(AbstractReader):
     This reader represents the NASA CMAPSS Turbofan Degradation dataset. Each of its
     four sub-datasets contains a training and a test split. Upon first usage,
     the training split will be further divided into a development and a validation
-    split. 20% of the original training split is reserved for validation.
+    split. 20% of the original training split is reserved for validation. This run to
+    split assignment can be overridden by setting `run_split_dist`.
 
     The features are provided as sliding windows over each time series in the
     dataset. The label of a window is the label of its last time step. The RUL labels
@@ -37,6 +41,15 @@ class CmapssReader(AbstractReader):
     The features are min-max scaled between -1 and 1. The scaler is fitted on the
     development data only.
 
+    Parsing the text files of the dataset is slow. Therefore, each text file is
+    converted once to a binary .npy file in the `binary` folder of the dataset,
+    together with the index of the first line of each run. Later loads open the
+    binary file as a read-only memory map. A binary file is converted again if the
+    size or modification time of its text file changed. The development and
+    validation split are not written to files of their own. Instead, they select
+    their runs from the binary file of the training split, so that custom run
+    assignments are available without processing any files.
+
     Examples:
         Default channels
         >>> import rul_datasets
@@ -55,14 +68,11 @@ class CmapssReader(AbstractReader):
         (163, 30, 3)
     """
 
-    _FMT: str = (
-        "%d %d %.4f %.4f %.1f %.2f %.2f %.2f %.2f %.2f %.2f %.2f %.2f "
-        "%.2f %.2f %.2f %.2f %.2f %.2f %.4f %.2f %d %d %.2f %.2f %.4f"
-    )
     _TRAIN_PERCENTAGE: float = 0.8
     _WINDOW_SIZES: Dict[int, int] = {1: 30, 2: 20, 3: 30, 4: 15}
     _DEFAULT_CHANNELS: List[int] = [4, 5, 6, 9, 10, 11, 13, 14, 15, 16, 17, 19, 22, 23]
     _NUM_TRAIN_RUNS: Dict[int, int] = {1: 80, 2: 208, 3: 80, 4: 199}
+    _NUM_ORIGINAL_TRAIN_RUNS: Dict[int, int] = {1: 100, 2: 260, 3: 100, 4: 249}
     _CONDITION_BOUNDARIES: List[Tuple[float, float]] = [
         (-0.009, 0.009),  # Different from paper to include FD001 and FD003
         (9.998, 10.008),
@@ -85,6 +95,8 @@ class CmapssReader(AbstractReader):
         truncate_val: bool = False,
         operation_condition_aware_scaling: bool = False,
         truncate_degraded_only: bool = False,
+        window_mode: Literal["memory", "view", "lazy"] = "memory",
+        run_split_dist: Optional[Dict[str, List[int]]] = None,
     ) -> None:
         """
         Create a new CMAPSS reader for one of the sub-datasets. The maximum RUL value
@@ -97,6 +109,19 @@ class CmapssReader(AbstractReader):
         Ragab et al. This only affects FD002 and FD004 due to them having multiple
         operation conditions.
 
+        By default, all sliding windows are extracted into memory. Setting
+        `window_mode` to `view` or `lazy` keeps only the time series and creates the
+        windows when they are accessed, which reduces memory consumption by roughly a
+        factor of `window_size`. See [extract_windows]
+        [rul_datasets.utils.extract_windows] for details.
+
+        The runs of the original training split are assigned to the development and
+        validation split by `run_split_dist`, e.g. `{"dev": [0, 1], "val": [2]}`. By
+        default, the first 80% of runs are used for development and the rest for
+        validation. Each index has to refer to a training run of the sub-dataset and
+        may be assigned only once. A separate scaler is fit for each custom set of
+        development runs when `prepare_data` is called.
+
         For more information about using readers, refer to the [reader]
         [rul_datasets.reader] module page.
 
@@ -112,6 +137,10 @@ class CmapssReader(AbstractReader):
                                                operation condition.
             truncate_degraded_only: Only truncate the degraded part of the data
                                     (< max RUL).
+            window_mode: Extract windows into `memory`, as a read-only `view` of the
+                         time series or cut them `lazy` on access.
+            run_split_dist: Dictionary that assigns the training run indices to the
+                            `dev` and `val` split.
         """
         super().__init__(
             fd,
@@ -127,6 +156,38 @@ class CmapssReader(AbstractReader):
             feature_select = self._DEFAULT_CHANNELS
         self.feature_select = feature_select
         self.operation_condition_aware_scaling = operation_condition_aware_scaling
+        self.window_mode = window_mode
+        self.run_split_dist = run_split_dist
+
+        if self.run_split_dist is not None:
+            self._check_run_split_dist(self.run_split_dist)
+
+    def _check_run_split_dist(self, run_split_dist: Dict[str, List[int]]) -> None:
+        if not set(run_split_dist) == {"dev", "val"}:
+            raise ValueError(
+                "The run split distribution needs exactly the keys "
+                f"'dev' and 'val' but has {list(run_split_dist)}."
+            )
+        num_runs = self._NUM_ORIGINAL_TRAIN_RUNS[self.fd]
+        all_runs = [*run_split_dist["dev"], *run_split_dist["val"]]
+        out_of_range = [i for i in all_runs if not 0 <= i < num_runs]
+        if out_of_range:
+            raise ValueError(
+                f"The training split of FD{self.fd:03d} has {num_runs} runs, "
+                f"but the run split distribution contains {out_of_range}."
+            )
+        if not len(set(all_runs)) == len(all_runs):
+            raise ValueError(
+                "The runs of the run split distribution need to be unique and the "
+                "'dev' and 'val' split disjoint."
+            )
+
+    @property
+    def hparams(self) -> Dict[str, Any]:
+        hparams = super().hparams
+        hparams.update({"run_split_dist": self.run_split_dist})
+
+        return hparams
 
     @property
     def dataset_name(self) -> str:
@@ -140,30 +201,35 @@ class CmapssReader(AbstractReader):
     def default_window_size(self, fd: int) -> int:
         return self._WINDOW_SIZES[fd]
 
+    def _get_num_train_runs(self) -> int:
+        if self.run_split_dist is None:
+            return super()._get_num_train_runs()
+
+        return len(self.run_split_dist["dev"])  # complements of the custom dev runs
+
     def prepare_data(self) -> None:
         """
         Prepare the CMAPSS dataset. This function needs to be called before using the
         dataset for the first time.
 
         The dataset is downloaded from a custom mirror and extracted into the data
-        root directory. The training data is then split into development and
-        validation set. Afterwards, a scaler is fit on the development features.
-        Previously completed steps are skipped.
+        root directory. The text files of the sub-dataset are converted to binary
+        files and the default assignment of training runs to the development and
+        validation split is saved. Afterwards, a scaler is fit on the development
+        features. Previously completed steps are skipped.
         """
         if not os.path.exists(self._CMAPSS_ROOT):
             _download_cmapss(get_data_root())
-        # Check if training data was already split
-        if not os.path.exists(self._get_feature_path("dev")):
-            warnings.warn(
-                f"Training data for FD{self.fd:03d} not "
-                f"yet split into dev and val. Splitting now."
-            )
-            self._split_fd_train(self._get_feature_path("train"))
+        for split in ["train", "test"]:
+            self._load_parsed(self._get_feature_path(split))
+        self._load_parsed(self._get_target_path())
+        if not os.path.exists(self._get_split_path()):
+            self._split_fd_train()
         if not os.path.exists(self._get_scaler_path()):
             self._prepare_scaler()
 
     def _prepare_scaler(self) -> None:
-        dev_features, ops_cond = self._load_features(self._get_feature_path("dev"))
+        dev_features, ops_cond = self._load_features("dev")
         dev_features, _ = self._split_time_steps_from_features(dev_features)
         scaler = self._fit_scaler(dev_features, ops_cond)
         scaling.save_scaler(scaler, self._get_scaler_path())
@@ -183,46 +249,75 @@ class CmapssReader(AbstractReader):
 
         return scaler
 
-    def _split_fd_train(self, train_path: str) -> None:
-        train_data = np.loadtxt(train_path)
+    def _split_fd_train(self) -> None:
+        """Save the default assignment of training runs to dev and val."""
+        _, run_offsets = self._load_parsed(self._get_feature_path("train"))
+        num_runs = len(run_offsets) - 1
+        split_idx = int(num_runs * self._TRAIN_PERCENTAGE)
+        run_split_dist = {
+            "dev": list(range(split_idx)),
+            "val": list(range(split_idx, num_runs)),
+        }
+        split_path = self._get_split_path()
+        _write_atomic(split_path, lambda f: json.dump(run_split_dist, f), "wt")
+
+    def _get_run_split_dist(self) -> Dict[str, List[int]]:
+        if self.run_split_dist is not None:
+            return self.run_split_dist
+        split_path = self._get_split_path()
+        if not os.path.exists(split_path):
+            raise RuntimeError(
+                f"Training data for FD{self.fd:03d} is not yet split "
+                "into dev and val. Did you call prepare_data yet?"
+            )
+        with open(split_path, mode="rt") as f:
+            run_split_dist = json.load(f)
+
+        return run_split_dist
 
-        # Split into runs
-        _, samples_per_run = np.unique(train_data[:, 0], return_counts=True)
-        split_indices = np.cumsum(samples_per_run)[:-1]
-        split_train_data = np.split(train_data, split_indices, axis=0)
-
-        split_idx = int(len(split_train_data) * self._TRAIN_PERCENTAGE)
-        dev_data = np.concatenate(split_train_data[:split_idx])
-        val_data = np.concatenate(split_train_data[split_idx:])
-
-        data_root, train_file = os.path.split(train_path)
-        dev_file = train_file.replace("train_", "dev_")
-        dev_file = os.path.join(data_root, dev_file)
-        np.savetxt(dev_file, dev_data, fmt=self._FMT)  # type: ignore
-        val_file = train_file.replace("train_", "val_")
-        val_file = os.path.join(data_root, val_file)
-        np.savetxt(val_file, val_data, fmt=self._FMT)  # type: ignore
+    def _get_artifact_paths(self, split: str) -> List[str]:
+        if split in ["dev", "val"]:
+            paths = [self._get_feature_path("train"), self._get_split_path()]
+        else:
+            paths = [self._get_feature_path(split)]
+        paths.append(self._get_scaler_path())
+        if split == "test":
+            paths.append(self._get_target_path())
+
+        return paths
+
+    def _get_split_path(self) -> str:
+        file_name = f"dev_val_FD{self.fd:03d}.json"
+
+        return os.path.join(self._CMAPSS_ROOT, _BINARY_DIR, file_name)
 
     def _get_scaler_path(self) -> str:
         return os.path.join(self._CMAPSS_ROOT, self._get_scaler_name())
 
     def _get_scaler_name(self) -> str:
         ops_aware = "_ops_aware" if self.operation_condition_aware_scaling else ""
-        name = f"FD{self.fd:03d}_scaler_{self.feature_select}{ops_aware}.pkl"
+        if self.run_split_dist is None:
+            dev_runs = ""
+        else:  # the list of runs may be too long for a file name
+            dev_runs_json = json.dumps(self.run_split_dist["dev"]).encode()
+            dev_runs = f"_dev_{hashlib.sha256(dev_runs_json).hexdigest()[:16]}"
+        name = f"FD{self.fd:03d}_scaler_{self.feature_select}{ops_aware}{dev_runs}.pkl"
 
         return name
 
     def _get_feature_path(self, split: str) -> str:
         return os.path.join(self._CMAPSS_ROOT, self._get_feature_name(split))
 
+    def _get_target_path(self) -> str:
+        return os.path.join(self._CMAPSS_ROOT, f"RUL_FD{self.fd:03d}.txt")
+
     def _get_feature_name(self, split: str) -> str:
         return f"{split}_FD{self.fd:03d}.txt"
 
     def load_complete_split(
         self, split: str, alias: str
     ) -> Tuple[List[np.ndarray], List[np.ndarray]]:
-        file_path = self._get_feature_path(split)
-        features, operation_conditions = self._load_features(file_path)
+        features, operation_conditions = self._load_features(split)
         features, time_steps = self._split_time_steps_from_features(features)
         features = self._scale_features(features, operation_conditions)
 
@@ -244,23 +339,47 @@ class CmapssReader(AbstractReader):
 
         return features, targets
 
-    def _load_features(
-        self, file_path: str
-    ) -> Tuple[List[np.ndarray], List[np.ndarray]]:
-        raw_features = np.loadtxt(file_path)
+    def _load_features(self, split: str) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        if split in ["dev", "val"]:
+            file_path = self._get_feature_path("train")
+        elif split == "test":
+            file_path = self._get_feature_path(split)
+        else:
+            raise ValueError(f"Unknown split {split}.")
+        raw_features, run_offsets = self._load_parsed(file_path)
 
         feature_idx = [0, 1] + [idx + 2 for idx in self.feature_select]
         operation_conditions = raw_features[:, [2, 3, 4]]
         raw_features = raw_features[:, feature_idx]
 
         # Split into runs
-        _, samples_per_run = np.unique(raw_features[:, 0], return_counts=True)
-        split_idx = np.cumsum(samples_per_run)[:-1]
+        split_idx = run_offsets[1:-1]
         features = np.split(raw_features, split_idx, axis=0)
         cond_per_run = np.split(operation_conditions, split_idx, axis=0)
+        if split in ["dev", "val"]:
+            run_idx = self._get_run_split_dist()[split]
+            features = [features[i] for i in run_idx]
+            cond_per_run = [cond_per_run[i] for i in run_idx]
 
         return features, cond_per_run
 
+    def _load_parsed(self, text_path: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Load a text file of the dataset through its binary copy.
+
+        The binary copy is created or re-created if the text file changed. The run
+        offsets hold the first line of each run followed by the number of lines. Each
+        line of a one-dimensional file, e.g. the RUL targets, is a run of its own. The
+        data is a read-only view of the memory-mapped binary copy."""
+        binary_path = _get_binary_path(text_path)
+        if not _is_binary_current(text_path, binary_path):
+            data = np.loadtxt(text_path)
+            run_offsets = _get_run_offsets(data)
+            _save_binary(text_path, binary_path, data, run_offsets)
+        data = np.asarray(np.load(f"{binary_path}.npy", mmap_mode="r"))
+        run_offsets = np.load(f"{binary_path}_runs.npy")
+
+        return data, run_offsets
+
     def _scale_features(
         self, features: List[np.ndarray], operation_conditions: List[np.ndarray]
     ) -> List[np.ndarray]:
@@ -303,9 +422,7 @@ class CmapssReader(AbstractReader):
 
     def _load_targets(self, features: List[np.ndarray]) -> List[np.ndarray]:
         """Load target file."""
-        file_name = f"RUL_FD{self.fd:03d}.txt"
-        file_path = os.path.join(self._CMAPSS_ROOT, file_name)
-        raw_targets = np.loadtxt(file_path)
+        raw_targets, _ = self._load_parsed(self._get_target_path())
 
         targets = np.split(raw_targets, len(raw_targets))
         targets = [np.arange(len(f), 0, -1) + t - 1 for f, t in zip(features, targets)]
@@ -340,7 +457,9 @@ class CmapssReader(AbstractReader):
         windowed_features = []
         windowed_targets = []
         for seq, target in zip(features, targets):
-            windows = utils.extract_windows(seq, self.window_size)
+            windows = utils.extract_windows(
+                seq, self.window_size, mode=self.window_mode
+            )
             target = target[self.window_size - 1 :]
             windowed_features.append(windows)
             windowed_targets.append(target)
@@ -360,6 +479,63 @@ class CmapssReader(AbstractReader):
         return cropped_features, cropped_targets
 
 
+def _get_binary_path(text_path: str) -> str:
+    data_root, text_file = os.path.split(text_path)
+    binary_file = os.path.splitext(text_file)[0]
+
+    return os.path.join(data_root, _BINARY_DIR, binary_file)
+
+
+def _get_run_offsets(data: np.ndarray) -> np.ndarray:
+    if data.ndim == 1:
+        return np.arange(len(data) + 1)
+    _, samples_per_run = np.unique(data[:, 0], return_counts=True)
+    run_offsets = np.zeros(len(samples_per_run) + 1, dtype=np.int64)
+    np.cumsum(samples_per_run, out=run_offsets[1:])
+
+    return run_offsets
+
+
+def _get_text_fingerprint(text_path: str) -> Dict[str, int]:
+    stat = os.stat(text_path)
+
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _is_binary_current(text_path: str, binary_path: str) -> bool:
+    meta_path = f"{binary_path}.json"
+    if not os.path.exists(meta_path):
+        return False
+    with open(meta_path, mode="rt") as f:
+        fingerprint = json.load(f)
+
+    return fingerprint == _get_text_fingerprint(text_path)
+
+
+def _save_binary(
+    text_path: str, binary_path: str, data: np.ndarray, run_offsets: np.ndarray
+) -> None:
+    """Save the arrays first and the fingerprint of the text file last. Each file
+    is written to a temporary file first, so that no other process reads partially
+    written files."""
+    os.makedirs(os.path.dirname(binary_path), exist_ok=True)
+    _write_atomic(f"{binary_path}.npy", lambda f: np.save(f, data))
+    _write_atomic(f"{binary_path}_runs.npy", lambda f: np.save(f, run_offsets))
+    fingerprint = _get_text_fingerprint(text_path)
+    _write_atomic(f"{binary_path}.json", lambda f: json.dump(fingerprint, f), "wt")
+
+
+def _write_atomic(file_path: str, write: Callable, mode: str = "wb") -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path))
+    try:
+        with os.fdopen(fd, mode) as f:
+            write(f)
+        os.replace(tmp_path, file_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
 def _download_cmapss(data_root: str) -> None:
     with tempfile.TemporaryDirectory() as tmp_path:
         print("Download CMAPSS dataset")
@@ -2,7 +2,7 @@
 benchmarking. If your approach can fit this dataset it means that it is able to learn
 how to estimate RUL. It does not mean it is good at it. """
 
-from typing import Tuple, List, Optional, Union
+from typing import Tuple, List, Optional, Union, Literal
 
 import numpy as np
 from sklearn import preprocessing  # type: ignore
@@ -61,6 +61,7 @@ class DummyReader(AbstractReader):
         percent_fail_runs: Optional[Union[float, List[int]]] = None,
         truncate_val: bool = False,
         truncate_degraded_only: bool = False,
+        window_mode: Literal["memory", "view", "lazy"] = "memory",
     ):
         """
         Create a new dummy reader for one of the two sub-datasets. The maximum RUL
@@ -68,6 +69,9 @@ class DummyReader(AbstractReader):
         lead to different features, too, as they are calculated based on the RUL
         values.
 
+        Setting `window_mode` to `view` or `lazy` creates the sliding windows from the
+        time series on access instead of extracting them into memory.
+
         For more information about using readers, refer to the [reader]
         [rul_datasets.reader] module page.
 
@@ -80,6 +84,8 @@ class DummyReader(AbstractReader):
             truncate_val: Truncate the validation data with `percent_broken`, too.
             truncate_degraded_only: Only truncate the degraded part of the data
                                     (< max RUL).
+            window_mode: Extract windows into `memory`, as a read-only `view` of the
+                         time series or cut them `lazy` on access.
         """
         super(DummyReader, self).__init__(
             fd,
@@ -91,6 +97,8 @@ class DummyReader(AbstractReader):
             truncate_degraded_only,
         )
 
+        self.window_mode = window_mode
+
         features, _ = self._generate_split("dev")
         scaler = preprocessing.MinMaxScaler(feature_range=(-1, 1))
         self.scaler = scaling.fit_scaler(features, scaler)
@@ -114,27 +122,40 @@ class DummyReader(AbstractReader):
     def load_complete_split(
         self, split: str, alias: str
     ) -> Tuple[List[np.ndarray], List[np.ndarray]]:
-        features, targets = self._generate_split(split, alias)
-        features = scaling.scale_features(features, self.scaler)
+        rng = np.random.default_rng(self._SPLIT_SEED[split])
+        features, targets = self._generate_split(split, rng)
+        # scaling the time series before windowing is equal to scaling the windows
+        features = scaling.scale_features(features, self.scaler, inplace=True)
+        features, targets = self._window_data(features, targets)
+        if alias == "test":
+            features, targets = self._truncate_test_split(rng, features, targets)
 
         return features, targets
 
     def _generate_split(
-        self, split: str, alias: Optional[str] = None
+        self, split: str, rng: Optional[np.random.Generator] = None
     ) -> Tuple[List[np.ndarray], List[np.ndarray]]:
-        alias = split if alias is None else alias
+        """Generate the raw time series of a split."""
+        if rng is None:
+            rng = np.random.default_rng(self._SPLIT_SEED[split])
         features = []
         targets = []
-        rng = np.random.default_rng(self._SPLIT_SEED[split])
         for i in range(10):
             t = self._generate_targets(rng)
             f = self._generate_features(rng, t)
-            f = utils.extract_windows(f, self.window_size)
-            t = t[: -(self.window_size - 1)]
             features.append(f)
             targets.append(t)
-        if alias == "test":
-            features, targets = self._truncate_test_split(rng, features, targets)
+
+        return features, targets
+
+    def _window_data(
+        self, features: List[np.ndarray], targets: List[np.ndarray]
+    ) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        features = [
+            utils.extract_windows(f, self.window_size, mode=self.window_mode)
+            for f in features
+        ]
+        targets = [t[: -(self.window_size - 1)] for t in targets]
 
         return features, targets
 
@@ -157,7 +178,7 @@ class DummyReader(AbstractReader):
         for i in range(len(features)):
             run_len = len(features[i])
             cutoff = rng.integers(run_len // 2, run_len - 1)
-            features[i] = features[i][None, cutoff]
+            features[i] = features[i][cutoff][None]
             targets[i] = targets[i][None, cutoff]
 
         return features, targets
@@ -81,6 +81,7 @@ class FemtoReader(AbstractReader):
         first_time_to_predict: Optional[List[int]] = None,
         norm_rul: bool = False,
         truncate_degraded_only: bool = False,
+        dtype: Optional[str] = None,
     ) -> None:
         """
         Create a new FEMTO reader for one of the sub-datasets. By default, the RUL
@@ -92,6 +93,10 @@ class FemtoReader(AbstractReader):
         constant. The `norm_rul` argument can then be used to scale the RUL of each
         run between zero and one.
 
+        The features are scaled in-place after loading them. Set `dtype` to
+        `"float32"` to halve the memory of the features compared to the default
+        `float64`.
+
         For more information about using readers refer to the [reader]
         [rul_datasets.reader] module page.
 
@@ -108,6 +113,7 @@ class FemtoReader(AbstractReader):
             norm_rul: Normalize RUL between zero and one.
             truncate_degraded_only: Only truncate the degraded part of the data
                                     (< max RUL).
+            dtype: Data type of the features. Defaults to the one of the raw data.
         """
         super().__init__(
             fd,
@@ -128,6 +134,7 @@ class FemtoReader(AbstractReader):
         self.run_split_dist = run_split_dist
         self.first_time_to_predict = first_time_to_predict
         self.norm_rul = norm_rul
+        self.dtype = dtype
 
         self._preparator = FemtoPreparator(
             self.fd, self._FEMTO_ROOT, self.run_split_dist
@@ -141,6 +148,7 @@ class FemtoReader(AbstractReader):
                 "first_time_to_predict": self.first_time_to_predict,
                 "norm_rul": self.norm_rul,
                 "run_split_dist": self.run_split_dist,
+                "dtype": self.dtype,
             }
         )
 
@@ -164,6 +172,9 @@ class FemtoReader(AbstractReader):
         root directory. The whole dataset is converted from CSV files to NPY files to
         speed up loading it from disk. Afterwards, a scaler is fit on the development
         features. Previously completed steps are skipped.
+
+        The scaler is assembled from statistics that are computed once for each run.
+        Preparing a custom split therefore does not load the features again.
         """
         if not os.path.exists(self._FEMTO_ROOT):
             _download_femto(get_data_root())
@@ -176,7 +187,12 @@ class FemtoReader(AbstractReader):
     ) -> Tuple[List[np.ndarray], List[np.ndarray]]:
         features, targets = self._preparator.load_runs(split)
         features = [f[:, -self.window_size :, :] for f in features]  # crop to window
-        features = scaling.scale_features(features, self._preparator.load_scaler())
+        if self.dtype is not None:
+            features = [f.astype(self.dtype, copy=False) for f in features]
+        # the loaded runs are owned by this reader, so they are not copied for scaling
+        features = scaling.scale_features(
+            features, self._preparator.load_scaler(), inplace=True
+        )
         if self.max_rul is not None:
             targets = [np.minimum(t, self.max_rul) for t in targets]
         elif self.first_time_to_predict is not None:
@@ -187,6 +203,9 @@ class FemtoReader(AbstractReader):
 
         return features, targets
 
+    def _get_artifact_paths(self, split: str) -> List[str]:
+        return self._preparator.get_artifact_paths(split)
+
     def _clip_first_time_to_predict(self, targets, split):
         fttp = [
             self.first_time_to_predict[i - 1]
@@ -229,8 +248,8 @@ class FemtoPreparator:
             runs = self._load_raw_runs(split)
             self._save_efficient(split, runs)
         if split == "dev" and not os.path.exists(self._get_scaler_path()):
-            features, _ = self.load_runs(split)
-            scaler = scaling.fit_scaler(features)
+            statistics = self.load_statistics(split)
+            scaler = scaling.fit_scaler_from_statistics(statistics)
             scaling.save_scaler(scaler, self._get_scaler_path())
 
     def _split_already_prepared(self, split: str) -> bool:
@@ -248,6 +267,26 @@ class FemtoPreparator:
 
         return features, targets
 
+    def load_statistics(self, split: str) -> List[scaling.RunStatistics]:
+        self._validate_split(split)
+        statistics = []
+        for run_idx in self.run_split_dist[split]:
+            stats_path = self._get_stats_path(run_idx)
+            if not os.path.exists(stats_path):  # runs prepared by older versions
+                features, _ = saving.load(self._get_run_file_path(split, run_idx), True)
+                self._save_statistics(run_idx, features)
+            statistics.extend(scaling.load_statistics(stats_path))
+
+        return statistics
+
+    def get_artifact_paths(self, split: str) -> List[str]:
+        self._validate_split(split)
+        paths = [self._get_scaler_path()]
+        for run_idx in self.run_split_dist[split]:
+            paths.extend(saving.get_file_paths(self._get_run_file_path(split, run_idx)))
+
+        return paths
+
     def load_scaler(self) -> scalers.StandardScaler:
         return scaling.load_scaler(self._get_scaler_path())
 
@@ -286,6 +325,11 @@ class FemtoPreparator:
     ) -> None:
         for run_idx, (features, targets) in runs.items():
             saving.save(self._get_run_file_path(split, run_idx), features, targets)
+            self._save_statistics(run_idx, features)
+
+    def _save_statistics(self, run_idx: int, features: np.ndarray) -> None:
+        statistics = [scaling.RunStatistics.from_run(features)]
+        scaling.save_statistics(statistics, self._get_stats_path(run_idx))
 
     def _validate_split(self, split: str) -> None:
         if split not in self._SPLIT_FOLDERS:
@@ -310,6 +354,9 @@ class FemtoPreparator:
     def _get_run_file_path(self, split: str, run_idx: int) -> str:
         return os.path.join(self._data_root, f"run_{self.fd}_{run_idx}.npy")
 
+    def _get_stats_path(self, run_idx: int) -> str:
+        return os.path.join(self._data_root, f"run_{self.fd}_{run_idx}_stats.npz")
+
     def _get_split_folder(self, split: str) -> str:
         return os.path.join(self._data_root, self._SPLIT_FOLDERS[split])
 
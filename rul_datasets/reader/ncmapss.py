@@ -214,14 +214,31 @@ class NCmapssReader(AbstractReader):
         The dataset is assumed to be present in the data root directory. The training
         data is then split into development and validation set. Afterward, a scaler
         is fit on the development features if it was not already done previously.
+        The scaler is assembled from statistics that are computed once for each unit,
+        so that preparing a custom split does not load the data again.
         """
         if not os.path.exists(self._NCMAPSS_ROOT):
             _download_ncmapss(self._NCMAPSS_ROOT)
         if not os.path.exists(self._get_scaler_path()):
-            features, _, _ = self._load_data("dev")
-            scaler = scaling.fit_scaler(features, MinMaxScaler(self.scaling_range))
+            statistics = self._load_unit_statistics()
+            dev_statistics = self._select_units(statistics, "dev")
+            scaler = MinMaxScaler(self.scaling_range)
+            scaler = scaling.fit_scaler_from_statistics(dev_statistics, scaler)
             scaling.save_scaler(scaler, self._get_scaler_path())
 
+    def _load_unit_statistics(self) -> List[scaling.RunStatistics]:
+        stats_path = self._get_stats_path()
+        if not os.path.exists(stats_path):
+            features, targets, auxiliary = self._load_raw_data()
+            features, _, _ = self._split_by_unit(features, targets, auxiliary)
+            statistics = scaling.compute_statistics(features)
+            scaling.save_statistics(statistics, stats_path)
+
+        return scaling.load_statistics(stats_path)
+
+    def _get_artifact_paths(self, split: str) -> List[str]:
+        return [self._get_data_path(), self._get_scaler_path()]
+
     def _get_scaler_path(self):
         file_name = (
             f"scaler_{self.fd}_{self.run_split_dist['dev']}_{self.scaling_range}.pkl"
@@ -230,6 +247,12 @@ class NCmapssReader(AbstractReader):
 
         return file_path
 
+    def _get_stats_path(self) -> str:
+        return os.path.join(self._NCMAPSS_ROOT, f"unit_stats_{self.fd}.npz")
+
+    def _get_data_path(self) -> str:
+        return os.path.join(self._NCMAPSS_ROOT, self._FILE_NAMES[self.fd])
+
     def default_window_size(self, fd: int) -> int:
         return self._WINDOW_SIZES[fd]
 
@@ -250,7 +273,8 @@ class NCmapssReader(AbstractReader):
         self, split: str, alias: str
     ) -> Tuple[List[np.ndarray], List[np.ndarray]]:
         features, targets, auxiliary = self._load_data(split)
-        features = scaling.scale_features(features, self._load_scaler())
+        # the loaded units are owned by this reader, so they are scaled in-place
+        features = scaling.scale_features(features, self._load_scaler(), inplace=True)
         features = [f[:, self.feature_select] for f in features]
         windowed = [
             self._window_by_cycle(*unit) for unit in zip(features, targets, auxiliary)
@@ -271,8 +295,7 @@ class NCmapssReader(AbstractReader):
         return features, targets, auxiliary
 
     def _load_raw_data(self):
-        file_path = os.path.join(self._NCMAPSS_ROOT, self._FILE_NAMES[self.fd])
-        with h5py.File(file_path, mode="r") as hdf:
+        with h5py.File(self._get_data_path(), mode="r") as hdf:
             work_cond = self._load_series(hdf, "W")
             sensor_phys = self._load_series(hdf, "X_s")
             sensor_virt = self._load_series(hdf, "X_v")
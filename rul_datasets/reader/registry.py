@@ -0,0 +1,186 @@
+"""A module for sharing loaded splits between readers in the same process.
+
+Many data modules create several readers for the same sub-dataset, e.g. the
+[BaselineDataModule][rul_datasets.baseline.BaselineDataModule] or readers created by
+[get_compatible][rul_datasets.reader.abstract.AbstractReader.get_compatible]. Each of
+them would load and pre-process the same files on its own. The registry keeps the
+complete, untruncated splits in memory instead, so that readers that differ only in
+their truncation settings (`percent_broken`, `percent_fail_runs`, `truncate_val` and
+`truncate_degraded_only`) share one copy. Truncation is then applied as views on top
+of the shared copy.
+
+The registry is disabled by default. It is enabled by setting a memory budget in
+bytes with [set_memory_budget][rul_datasets.reader.registry.set_memory_budget] or
+the environment variable `RUL_DATASETS_MEMORY_BUDGET`. If the budget is exceeded,
+the least recently used splits are evicted. Splits larger than the budget are not
+registered at all.
+
+Shared arrays are marked as read-only to avoid that one reader modifies the data of
+another one.
+
+Examples:
+    >>> import rul_datasets
+    >>> from rul_datasets.reader import registry
+    >>> registry.set_memory_budget(2 * 1024**3)  # 2 GiB
+    >>> fd1 = rul_datasets.reader.CmapssReader(fd=1)
+    >>> fd1_truncated = fd1.get_compatible(percent_broken=0.5)
+    >>> features, targets = fd1.load_split("dev")  # loaded from disk
+    >>> features, targets = fd1_truncated.load_split("dev")  # shared
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Tuple
+
+import numpy as np
+
+from rul_datasets import utils
+from rul_datasets.reader import split_cache
+
+if TYPE_CHECKING:
+    from rul_datasets.reader.abstract import AbstractReader
+
+_TRUNCATION_PARAMS = [
+    "percent_broken",
+    "percent_fail_runs",
+    "truncate_val",
+    "truncate_degraded_only",
+]
+
+_MEMORY_BUDGET = int(os.environ.get("RUL_DATASETS_MEMORY_BUDGET", "0"))
+_REGISTRY: "OrderedDict[str, Tuple[List[np.ndarray], List[np.ndarray], int]]"
+_REGISTRY = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def set_memory_budget(num_bytes: int) -> None:
+    """
+    Set the maximum number of bytes the registry may hold.
+
+    A budget of zero disables the registry. Splits are evicted immediately if they
+    exceed a lowered budget.
+
+    Args:
+        num_bytes: The new memory budget in bytes.
+    """
+    global _MEMORY_BUDGET
+    if num_bytes < 0:
+        raise ValueError(f"Memory budget needs to be non-negative but is {num_bytes}.")
+    with _LOCK:
+        _MEMORY_BUDGET = num_bytes
+        _evict()
+
+
+def get_memory_budget() -> int:
+    """
+    Return the maximum number of bytes the registry may hold.
+
+    Returns:
+        The memory budget in bytes.
+    """
+    return _MEMORY_BUDGET
+
+
+def get_memory_usage() -> int:
+    """
+    Return the number of bytes currently held by the registry.
+
+    Returns:
+        The memory usage in bytes.
+    """
+    with _LOCK:
+        return _get_memory_usage()
+
+
+def clear_registry() -> None:
+    """Remove all splits from the registry."""
+    with _LOCK:
+        _REGISTRY.clear()
+
+
+def load_complete_split(
+    reader: "AbstractReader", split: str, alias: str
+) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+    """
+    Load a complete split through the registry.
+
+    If the registry is enabled and holds the split, the shared copy is returned.
+    Otherwise, the split is loaded with the `load_complete_split` function of the
+    reader and registered if it fits into the memory budget.
+
+    Args:
+        reader: The reader to load the split with.
+        split: The split to load.
+        alias: The split as which the loaded data should be treated.
+
+    Returns:
+        features: The complete features of the split.
+        targets: The complete targets of the split.
+    """
+    if _MEMORY_BUDGET <= 0:
+        return reader.load_complete_split(split, alias)
+
+    key = split_cache.get_cache_key(reader, split, alias, exclude=_TRUNCATION_PARAMS)
+    with _LOCK:
+        if key in _REGISTRY:
+            _REGISTRY.move_to_end(key)
+            features, targets, _ = _REGISTRY[key]
+            return list(features), list(targets)  # callers may modify the lists
+
+    features, targets = reader.load_complete_split(split, alias)
+    num_bytes = _get_num_bytes(features + targets)
+    if num_bytes <= _MEMORY_BUDGET:
+        _set_read_only(features)
+        _set_read_only(targets)
+        with _LOCK:
+            _REGISTRY[key] = (features, targets, num_bytes)
+            _evict()
+
+    return list(features), list(targets)
+
+
+def _evict() -> None:
+    while _REGISTRY and _get_memory_usage() > _MEMORY_BUDGET:
+        _REGISTRY.popitem(last=False)
+
+
+def _get_memory_usage() -> int:
+    return sum(num_bytes for *_, num_bytes in _REGISTRY.values())
+
+
+def _get_num_bytes(arrays: list) -> int:
+    buffers = {}
+    for array in arrays:
+        if isinstance(array, utils.LazyWindows):
+            parts = [array.seq, array.start_idx]
+        else:
+            parts = [array]
+        for part in parts:
+            buffer = _get_owning_buffer(part)
+            buffers[id(buffer)] = buffer
+    # memmaps are backed by disk, not held in memory
+    num_bytes = sum(b.nbytes for b in buffers.values() if not isinstance(b, np.memmap))
+
+    return num_bytes
+
+
+def _get_owning_buffer(array: np.ndarray) -> np.ndarray:
+    """Follow the bases of a view, e.g. strided windows, to the array owning it."""
+    owner = array
+    base = array.base
+    while base is not None:
+        if isinstance(base, np.ndarray):
+            owner = base
+        base = getattr(base, "base", None)
+
+    return owner
+
+
+def _set_read_only(arrays: List[np.ndarray]) -> None:
+    for array in arrays:
+        if isinstance(array, utils.LazyWindows):
+            array.seq.flags.writeable = False
+            array.start_idx.flags.writeable = False
+        elif isinstance(array, np.ndarray):
+            array.flags.writeable = False
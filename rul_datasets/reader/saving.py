@@ -96,6 +96,21 @@ def exists(save_path: str) -> bool:
     return os.path.exists(feature_path) and os.path.exists(target_path)
 
 
+def get_file_paths(save_path: str) -> Tuple[str, str]:
+    """
+    Return the paths of the files resulting from a `save` call with `save_path`.
+
+    Args:
+        save_path: the `save_path` the [save][rul_datasets.reader.saving.save]
+                   function was called with
+
+    Returns:
+        feature_path: The path of the feature file
+        target_path: The path of the target file
+    """
+    return _get_feature_path(save_path), _get_target_path(save_path)
+
+
 def _get_feature_path(save_path):
     if save_path.endswith(".npy"):
         save_path = save_path[:-4]
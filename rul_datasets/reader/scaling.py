@@ -1,11 +1,16 @@
 """A module with functions for scaling RUL features."""
 import copy
 import pickle
-from typing import List, Optional, Union, Tuple
+from typing import Callable, Dict, List, Optional, Union, Tuple
 
 import numpy as np
 from sklearn import preprocessing as scalers  # type: ignore
 from sklearn.base import BaseEstimator, TransformerMixin  # type: ignore
+from sklearn.exceptions import NotFittedError  # type: ignore
+from sklearn.utils import assert_all_finite  # type: ignore
+from sklearn.utils.validation import check_is_fitted  # type: ignore
+
+from rul_datasets import utils
 
 _Scaler = (
     scalers.StandardScaler,
@@ -71,75 +76,129 @@ class OperationConditionAwareScaler(BaseEstimator, TransformerMixin):
     @property
     def n_features_in_(self):
         """Number of expected input features."""
-        return self.base_scalers[0].n_features_in_
+        fitted = [s for s in self.base_scalers if _is_fitted(s)]
+
+        return (fitted or self.base_scalers)[0].n_features_in_
+
+    def get_condition_ids(self, operation_conditions: np.ndarray) -> np.ndarray:
+        """
+        Return the index of the boundaries each operation condition falls into.
+
+        The ids are computed with a single binary search over the sorted
+        boundaries. Conditions that do not fall into any boundaries get an id of
+        -1. The ids can be passed to `partial_fit` and `transform` to avoid
+        computing them again for the same conditions.
+
+        Args:
+            operation_conditions: The condition values compared against the boundaries.
+
+        Returns:
+            The condition id of each sample.
+        """
+        order = np.argsort([lower for lower, _ in self.boundaries], kind="stable")
+        lowers = np.array([self.boundaries[i][0] for i in order])
+        uppers = np.array([self.boundaries[i][1] for i in order])
+        pos = np.searchsorted(lowers, operation_conditions, side="right") - 1
+        clipped_pos = np.maximum(pos, 0)
+        known = (pos >= 0) & (operation_conditions <= uppers[clipped_pos])
+        condition_ids = np.where(known, order[clipped_pos], -1)
+
+        return condition_ids
 
     def partial_fit(
-        self, features: np.ndarray, operation_conditions: np.ndarray
+        self,
+        features: np.ndarray,
+        operation_conditions: Optional[np.ndarray] = None,
+        condition_ids: Optional[np.ndarray] = None,
     ) -> "OperationConditionAwareScaler":
         """
         Fit the base scalers partially.
 
-        This function calls `partial_fit` on each of the base scalers with the
-        samples that fall into the corresponding condition boundaries. If any sample
-        does not fall into one of the boundaries, an exception is raised.
+        The samples are grouped by their condition in a single pass. Afterward,
+        `partial_fit` is called on each of the base scalers with the samples that
+        fall into the corresponding condition boundaries. If any sample does not fall
+        into one of the boundaries, an exception is raised.
 
         Args:
             features: The feature array to be scaled.
             operation_conditions: The condition values compared against the boundaries.
+            condition_ids: Precomputed ids from `get_condition_ids` that are used
+                           instead of the operation conditions.
 
         Returns:
             The partially fitted scaler.
         """
-        total = 0
-        for i, (lower, upper) in enumerate(self.boundaries):
-            idx = self._between(operation_conditions, lower, upper)
-            if num_elem := np.sum(idx):  # guard against empty array
-                self.base_scalers[i].partial_fit(features[idx])
-                total += num_elem
-        self._check_all_transformed(features, total, "fitted")
+        condition_ids = self._get_checked_ids(
+            features, operation_conditions, condition_ids, "fitted"
+        )
+        order = np.argsort(condition_ids, kind="stable")
+        counts = np.bincount(condition_ids, minlength=len(self.base_scalers))
+        groups = np.split(order, np.cumsum(counts)[:-1])
+        for base_scaler, group in zip(self.base_scalers, groups):
+            if len(group):  # guard against empty array
+                base_scaler.partial_fit(features[group])
 
         return self
 
     def transform(
-        self, features: np.ndarray, operation_conditions: np.ndarray
+        self,
+        features: np.ndarray,
+        operation_conditions: Optional[np.ndarray] = None,
+        condition_ids: Optional[np.ndarray] = None,
     ) -> np.ndarray:
         """
         Scale the features with the appropriate condition aware scaler.
 
-        This function calls `transform` on each of the base scalers for the
-        samples that fall into the corresponding condition boundaries. If any sample
-        does not fall into one of the boundaries, an exception is raised.
+        If the base scalers are supported [Scalers][rul_datasets.reader.scaling.Scaler],
+        their fitted parameters are stacked and gathered by the condition of each
+        sample, so that all samples are scaled in a single pass. Otherwise,
+        `transform` is called on each of the base scalers for the samples that fall
+        into the corresponding condition boundaries. If any sample does not fall into
+        one of the boundaries, an exception is raised. Base scalers that were not
+        fitted are ignored unless a sample falls into their condition.
 
         Args:
             features: The features to be scaled.
             operation_conditions: The condition values compared against the boundaries.
+            condition_ids: Precomputed ids from `get_condition_ids` that are used
+                           instead of the operation conditions.
 
         Returns:
             The scaled features.
         """
-        scaled = np.empty_like(features)
-        total = 0
-        for i, (lower, upper) in enumerate(self.boundaries):
-            idx = self._between(operation_conditions, lower, upper)
-            if num_elem := np.sum(idx):  # guard against empty array
-                scaled[idx] = self.base_scalers[i].transform(features[idx])
-                total += num_elem
-        self._check_all_transformed(features, total, "scaled")
+        condition_ids = self._get_checked_ids(
+            features, operation_conditions, condition_ids, "scaled"
+        )
+        for i in np.unique(condition_ids):
+            check_is_fitted(self.base_scalers[i])
+        affine = _StackedAffineScaling.from_scalers(self.base_scalers)
+        if affine is not None:
+            return affine.apply(features, condition_ids)
+        scaled = np.empty(features.shape, _get_out_dtype(features, None))
+        for i, base_scaler in enumerate(self.base_scalers):
+            idx = condition_ids == i
+            if np.any(idx):  # guard against empty array
+                scaled[idx] = base_scaler.transform(features[idx])
 
         return scaled
 
-    def _check_all_transformed(self, features, total, activity):
+    def _get_checked_ids(self, features, operation_conditions, condition_ids, activity):
+        if condition_ids is None:
+            if operation_conditions is None:
+                raise ValueError("Either operation conditions or ids are needed.")
+            condition_ids = self.get_condition_ids(operation_conditions)
+        self._check_all_transformed(features, condition_ids, activity)
+
+        return condition_ids
+
+    def _check_all_transformed(self, features, condition_ids, activity):
         """Guard against unknown conditions"""
-        if diff := (len(features) - total):
+        if diff := np.sum(condition_ids < 0):
             raise RuntimeError(
                 f"{diff} samples had an unknown condition and could not be {activity}."
                 "Please adjust the boundaries."
             )
 
-    def _between(self, inputs: np.ndarray, lower: float, upper: float) -> np.ndarray:
-        """Inclusive between."""
-        return (lower <= inputs) & (inputs <= upper)
-
 
 def fit_scaler(
     features: List[np.ndarray],
@@ -184,6 +243,8 @@ def fit_scaler(
 
 
 def _fit_scaler_naive(features: List[np.ndarray], scaler: Scaler) -> Scaler:
+    if isinstance(features, utils.RaggedArray):  # fit all runs in one call
+        features = [features.compact().values]
     for run in features:
         run = run.reshape(-1, run.shape[-1])
         scaler.partial_fit(run)
@@ -197,12 +258,230 @@ def _fit_scaler_operation_condition_aware(
     operation_conditions: List[np.ndarray],
 ) -> OperationConditionAwareScaler:
     assert len(features[0].shape) == 2, "Condition aware scaling can't fit window data"
-    for run, cond in zip(features, operation_conditions):
-        scaler.partial_fit(run, cond)
+    values = _to_ragged(features).values  # group all runs by condition at once
+    conditions = _to_ragged(operation_conditions).values
+    scaler.partial_fit(values, conditions)
 
     return scaler
 
 
+class RunStatistics:
+    """Sufficient statistics of the channels of one or more runs.
+
+    The statistics are the number of samples, and the mean, sum of squared
+    deviations from the mean (M2), minimum and maximum of each channel. Statistics of
+    different runs can be merged exactly, so that a scaler for any combination of runs
+    can be assembled without loading their features again."""
+
+    def __init__(
+        self,
+        count: int,
+        mean: np.ndarray,
+        m2: np.ndarray,
+        min_: np.ndarray,
+        max_: np.ndarray,
+    ) -> None:
+        """
+        Create new run statistics.
+
+        Args:
+            count: The number of samples.
+            mean: The mean of each channel.
+            m2: The sum of squared deviations from the mean of each channel.
+            min_: The minimum of each channel.
+            max_: The maximum of each channel.
+        """
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = min_
+        self.max = max_
+
+    @classmethod
+    def from_run(cls, run: np.ndarray) -> "RunStatistics":
+        """
+        Compute the statistics of a run.
+
+        The last axis of the run is assumed to be the channels, so that windowed runs
+        are supported, too.
+
+        Args:
+            run: The features of the run.
+
+        Returns:
+            The statistics of the run.
+        """
+        run = np.asarray(run).reshape(-1, run.shape[-1])
+        count = len(run)
+        if count == 0:
+            zeros = np.zeros(run.shape[-1])
+            return cls(0, zeros, zeros.copy(), zeros + np.inf, zeros - np.inf)
+        mean = run.mean(axis=0, dtype=np.float64)
+        m2 = np.square(run - mean).sum(axis=0)
+        min_ = run.min(axis=0).astype(np.float64)
+        max_ = run.max(axis=0).astype(np.float64)
+
+        return cls(count, mean, m2, min_, max_)
+
+    def merge(self, other: "RunStatistics") -> "RunStatistics":
+        """
+        Merge these statistics with the ones of other runs.
+
+        The mean and M2 are combined with the parallel algorithm of Chan et al.
+
+        Args:
+            other: The statistics to merge with.
+
+        Returns:
+            The statistics of the runs of both.
+        """
+        count = self.count + other.count
+        if count == 0:
+            return self
+        delta = other.mean - self.mean
+        mean = self.mean + delta * (other.count / count)
+        m2 = self.m2 + other.m2 + delta**2 * (self.count * other.count / count)
+        min_ = np.minimum(self.min, other.min)
+        max_ = np.maximum(self.max, other.max)
+
+        return RunStatistics(count, mean, m2, min_, max_)
+
+
+def compute_statistics(features: List[np.ndarray]) -> List[RunStatistics]:
+    """
+    Compute the statistics of each run of the RUL features.
+
+    Args:
+        features: The RUL features.
+
+    Returns:
+        The statistics of each run.
+    """
+    return [RunStatistics.from_run(run) for run in features]
+
+
+def fit_scaler_from_statistics(
+    statistics: List[RunStatistics], scaler: Optional[Scaler] = None
+) -> Scaler:
+    """
+    Assemble a fitted scaler from the statistics of runs. If the scaler is omitted,
+    a StandardScaler will be created.
+
+    The result is the same as fitting the scaler to the features of the runs up to
+    floating point precision. Only the StandardScaler, MinMaxScaler and MaxAbsScaler
+    can be assembled this way because the RobustScaler needs quantiles.
+
+    Args:
+        statistics: The statistics of the runs to fit the scaler on.
+        scaler: The scaler to be fit. Defaults to a StandardScaler.
+
+    Returns:
+        The fitted scaler.
+    """
+    scaler = scaler or scalers.StandardScaler()
+    if not statistics:
+        raise ValueError("Cannot fit a scaler without any run statistics.")
+    merged = statistics[0]
+    for stats in statistics[1:]:
+        merged = merged.merge(stats)
+    if merged.count == 0:
+        raise ValueError("Cannot fit a scaler on runs without samples.")
+    if type(scaler) is scalers.StandardScaler:
+        _assemble_standard_scaler(scaler, merged)
+    elif type(scaler) is scalers.MinMaxScaler:
+        _assemble_min_max_scaler(scaler, merged)
+    elif type(scaler) is scalers.MaxAbsScaler:
+        _assemble_max_abs_scaler(scaler, merged)
+    else:
+        raise ValueError(f"Cannot fit a {type(scaler).__name__} from run statistics.")
+    scaler.n_features_in_ = len(merged.mean)
+    scaler.n_samples_seen_ = merged.count
+
+    return scaler
+
+
+def _assemble_standard_scaler(
+    scaler: scalers.StandardScaler, stats: RunStatistics
+) -> None:
+    with_any = scaler.with_mean or scaler.with_std
+    scaler.mean_ = stats.mean.copy() if with_any else None
+    scaler.var_ = stats.m2 / stats.count if scaler.with_std else None
+    if scaler.with_std:
+        # same detection of near constant channels as sklearn's partial_fit
+        eps = np.finfo(np.float64).eps
+        upper_bound = (
+            stats.count * eps * scaler.var_ + (stats.count * stats.mean * eps) ** 2
+        )
+        scaler.scale_ = np.sqrt(scaler.var_)
+        scaler.scale_[scaler.var_ <= upper_bound] = 1.0
+    else:
+        scaler.scale_ = None
+
+
+def _assemble_min_max_scaler(
+    scaler: scalers.MinMaxScaler, stats: RunStatistics
+) -> None:
+    lower, upper = scaler.feature_range
+    scaler.data_min_ = stats.min.copy()
+    scaler.data_max_ = stats.max.copy()
+    scaler.data_range_ = stats.max - stats.min
+    scaler.scale_ = (upper - lower) / _handle_zeros(scaler.data_range_)
+    scaler.min_ = lower - stats.min * scaler.scale_
+
+
+def _assemble_max_abs_scaler(
+    scaler: scalers.MaxAbsScaler, stats: RunStatistics
+) -> None:
+    scaler.max_abs_ = np.maximum(np.abs(stats.min), np.abs(stats.max))
+    scaler.scale_ = _handle_zeros(scaler.max_abs_)
+
+
+def _handle_zeros(scale: np.ndarray) -> np.ndarray:
+    scale = scale.copy()
+    scale[scale < 10 * np.finfo(scale.dtype).eps] = 1.0
+
+    return scale
+
+
+def save_statistics(statistics: List[RunStatistics], save_path: str) -> None:
+    """
+    Save the statistics of runs to disk as a .npz file.
+
+    Args:
+        statistics: The run statistics to be saved.
+        save_path: The path to save the statistics to.
+    """
+    with open(save_path, mode="wb") as f:
+        np.savez(
+            f,
+            count=np.array([s.count for s in statistics]),
+            mean=np.array([s.mean for s in statistics]),
+            m2=np.array([s.m2 for s in statistics]),
+            min=np.array([s.min for s in statistics]),
+            max=np.array([s.max for s in statistics]),
+        )
+
+
+def load_statistics(save_path: str) -> List[RunStatistics]:
+    """
+    Load the statistics of runs from disk.
+
+    Args:
+        save_path: The path the statistics were saved to.
+
+    Returns:
+        The loaded run statistics.
+    """
+    with np.load(save_path, allow_pickle=False) as f:
+        arrays = [f[k] for k in ["count", "mean", "m2", "min", "max"]]
+    statistics = [
+        RunStatistics(int(count), mean, m2, min_, max_)
+        for count, mean, m2, min_, max_ in zip(*arrays)
+    ]
+
+    return statistics
+
+
 def save_scaler(scaler: Scaler, save_path: str) -> None:
     """
     Save a scaler to disk.
@@ -235,6 +514,8 @@ def scale_features(
     features: List[np.ndarray],
     scaler: Union[Scaler, OperationConditionAwareScaler],
     operation_conditions: Optional[List[np.ndarray]] = None,
+    inplace: bool = False,
+    dtype: Optional[np.dtype] = None,
 ) -> List[np.ndarray]:
     """
     Scale the RUL features with a given scaler.
@@ -246,67 +527,296 @@ def scale_features(
     If the scaler is operation condition aware, the `operation_conditions` argument
     needs to be passed. Windowed data cannot be fit this way.
 
+    The supported scalers are affine transformations per channel. Their fitted
+    parameters are applied to all runs directly with numpy instead of calling the
+    `transform` function of the scaler. The result is the same as from `transform`.
+    Other scalers are called once with all runs concatenated.
+
+    By default, the scaled features are written to a new buffer with the `dtype`
+    of the features, or `float64` for integer features. The `dtype` argument
+    overrides it, e.g. `np.float32` halves the memory of the result. If `inplace` is
+    set, the features are overwritten with the scaled values instead, so that large
+    windowed features are not duplicated. This needs writeable features whose
+    dtype matches the output `dtype`.
+
+    If the features are a [RaggedArray][rul_datasets.utils.RaggedArray], a ragged
+    array is returned. Otherwise, a list of runs is returned.
+
     Args:
         features: The RUL features to be scaled.
         scaler: The already fitted scaler.
         operation_conditions: The operation conditions for condition aware scaling.
+        inplace: Overwrite the features with the scaled values.
+        dtype: The dtype of the scaled features.
 
     Returns:
         The scaled features.
     """
+    if len(features) == 0:
+        return copy.copy(features)
+    if inplace:
+        _check_inplace(features, dtype)
     if operation_conditions is None:
-        features = _scale_features_naive(features, scaler)
+        features = _scale_features_naive(features, scaler, inplace, dtype)
     else:
         features = _scale_features_condition_aware(
-            features, scaler, operation_conditions
+            features, scaler, operation_conditions, inplace, dtype
         )
 
     return features
 
 
 def _scale_features_naive(
-    features: List[np.ndarray], scaler: Scaler
+    features: List[np.ndarray], scaler: Scaler, inplace: bool, dtype
 ) -> List[np.ndarray]:
-    features = copy.copy(features)
-    for i, run in enumerate(features):
-        _check_channels(run, scaler)
-        if len(run.shape) == 3:
-            features[i] = _scale_windowed_features(run, scaler)
-        else:
-            features[i] = scaler.transform(run)
+    affine = _AffineScaling.from_scaler(scaler)
+    if affine is None:
+        return _scale_features_transform(
+            features, scaler, scaler.transform, inplace, dtype
+        )
+    _check_channels(features[0], scaler)
+    if inplace:
+        for run in _runs_of(features):
+            affine.apply(run, out=run)
+        return features
+    ragged = _to_ragged(features)
+    values = ragged.values
+    out_dtype = _get_out_dtype(values, dtype)
+    is_copy = not _is_ragged(features) or features.index is not None  # type: ignore
+    if is_copy and values.dtype == out_dtype:
+        out = values  # overwrite the concatenated copy instead of allocating again
+    else:
+        out = np.empty(values.shape, out_dtype)
+    affine.apply(values, out=out)
 
-    return features
+    return _like_input(ragged.with_values(out), features)
 
 
 def _scale_features_condition_aware(
     features: List[np.ndarray],
     scaler: OperationConditionAwareScaler,
     operation_conditions: List[np.ndarray],
+    inplace: bool,
+    dtype,
 ) -> List[np.ndarray]:
     assert len(features[0].shape) == 2, "No condition aware scaling for window data"
-    features = copy.copy(features)
-    for i, (run, cond) in enumerate(zip(features, operation_conditions)):
-        _check_channels(run, scaler)
-        features[i] = scaler.transform(run, cond)
+    conditions = _to_ragged(operation_conditions).values
+
+    def transform(values: np.ndarray) -> np.ndarray:
+        return scaler.transform(values, conditions)
+
+    return _scale_features_transform(features, scaler, transform, inplace, dtype)
+
+
+def _scale_features_transform(
+    features: List[np.ndarray],
+    scaler: Union[Scaler, OperationConditionAwareScaler],
+    transform: Callable[[np.ndarray], np.ndarray],
+    inplace: bool,
+    dtype,
+) -> List[np.ndarray]:
+    """Scale all runs with a single call to the transform function of the scaler."""
+    ragged = _to_ragged(features)
+    values = ragged.values
+    _check_channels(values, scaler)
+    scaled = transform(values.reshape(-1, values.shape[-1])).reshape(values.shape)
+    if inplace:
+        scaled_runs = [scaled] if _is_ragged(features) else ragged.with_values(scaled)
+        for run, scaled_run in zip(_runs_of(features), scaled_runs):
+            run[...] = scaled_run
+        return features
+    scaled = scaled.astype(_get_out_dtype(values, dtype), copy=False)
+
+    return _like_input(ragged.with_values(scaled), features)
+
+
+class _AffineScaling:
+    """The fitted parameters of a scaler that transforms each channel affinely.
+
+    The parameters are applied in the same order as by the scaler, i.e. subtract,
+    divide, multiply and add, so that the results are the same. Each operation is
+    a single pass over the features that writes into the output buffer. Like the
+    `transform` of the scaler, infinite features are rejected and NaNs are kept."""
+
+    def __init__(
+        self,
+        subtrahend: Optional[np.ndarray] = None,
+        divisor: Optional[np.ndarray] = None,
+        factor: Optional[np.ndarray] = None,
+        addend: Optional[np.ndarray] = None,
+        clip: Optional[Tuple[float, float]] = None,
+    ) -> None:
+        self.subtrahend = subtrahend
+        self.divisor = divisor
+        self.factor = factor
+        self.addend = addend
+        self.clip = clip
+
+    @classmethod
+    def from_scaler(cls, scaler) -> Optional["_AffineScaling"]:
+        if type(scaler) is scalers.StandardScaler:
+            mean = scaler.mean_ if scaler.with_mean else None
+            return cls(subtrahend=mean, divisor=scaler.scale_)
+        elif type(scaler) is scalers.RobustScaler:
+            center = scaler.center_ if scaler.with_centering else None
+            scale = scaler.scale_ if scaler.with_scaling else None
+            return cls(subtrahend=center, divisor=scale)
+        elif type(scaler) is scalers.MaxAbsScaler:
+            return cls(divisor=scaler.scale_)
+        elif type(scaler) is scalers.MinMaxScaler:
+            clip = scaler.feature_range if scaler.clip else None
+            return cls(factor=scaler.scale_, addend=scaler.min_, clip=clip)
+
+        return None  # unknown scalers are not necessarily affine
+
+    def apply(self, features: np.ndarray, out: Optional[np.ndarray] = None):
+        """Scale the features along the last axis and return the output buffer."""
+        assert_all_finite(features, allow_nan=True)
+        if out is None:
+            out = np.empty(features.shape, _get_out_dtype(features, None))
+        src = features
+        for op, param in [
+            (np.subtract, self.subtrahend),
+            (np.divide, self.divisor),
+            (np.multiply, self.factor),
+            (np.add, self.addend),
+        ]:
+            if param is not None:
+                op(src, param, out=out)
+                src = out
+        if src is not out:  # no parameters, e.g. with_mean=False and with_std=False
+            np.copyto(out, src)
+        if self.clip is not None:
+            np.clip(out, *self.clip, out=out)
+
+        return out
+
+
+class _StackedAffineScaling:
+    """The affine parameters of multiple scalers stacked along the first axis.
+
+    Each sample gathers the parameters of its scaler by id, so that the samples of
+    all scalers are transformed by the same passes as in `_AffineScaling`. Missing
+    parameters, including the ones of scalers that were not fitted, are filled with
+    neutral values which leaves the results unchanged."""
+
+    _NEUTRAL = {"subtrahend": 0.0, "divisor": 1.0, "factor": 1.0, "addend": 0.0}
+
+    def __init__(self, params: Dict[str, np.ndarray], clip: Optional[np.ndarray]):
+        self.params = params
+        self.clip = clip
+
+    @classmethod
+    def from_scalers(cls, scalers_: List[Scaler]) -> Optional["_StackedAffineScaling"]:
+        affines = [
+            _AffineScaling.from_scaler(s) if _is_fitted(s) else _AffineScaling()
+            for s in scalers_
+        ]
+        if any(a is None for a in affines):
+            return None  # unknown scalers are not necessarily affine
+        params = {}
+        for name, neutral in cls._NEUTRAL.items():
+            values = [getattr(a, name) for a in affines]
+            if any(v is not None for v in values):
+                fitted = next(v for v in values if v is not None)
+                values = [
+                    np.full_like(fitted, neutral) if v is None else v for v in values
+                ]
+                params[name] = np.stack(values)
+        clip = None
+        if any(a.clip is not None for a in affines):
+            no_clip = (-np.inf, np.inf)
+            clip = np.array([no_clip if a.clip is None else a.clip for a in affines])
+
+        return cls(params, clip)
+
+    def apply(self, features: np.ndarray, condition_ids: np.ndarray) -> np.ndarray:
+        """Scale each sample with the parameters of its condition."""
+        assert_all_finite(features, allow_nan=True)
+        out = np.empty(features.shape, _get_out_dtype(features, None))
+        src = features
+        for name, op in [
+            ("subtrahend", np.subtract),
+            ("divisor", np.divide),
+            ("factor", np.multiply),
+            ("addend", np.add),
+        ]:
+            if name in self.params:
+                op(src, self.params[name][condition_ids], out=out)
+                src = out
+        if src is not out:
+            np.copyto(out, src)
+        if self.clip is not None:
+            clip = self.clip[condition_ids]
+            np.clip(out, clip[:, :1], clip[:, 1:], out=out)
+
+        return out
+
+
+def _is_fitted(scaler: Scaler) -> bool:
+    try:
+        check_is_fitted(scaler)
+    except NotFittedError:
+        return False
+
+    return True
+
+
+def _get_out_dtype(values: np.ndarray, dtype: Optional[np.dtype]) -> np.dtype:
+    if dtype is not None:
+        return np.dtype(dtype)
+    elif np.issubdtype(values.dtype, np.floating):
+        return values.dtype
+
+    return np.dtype(np.float64)
+
+
+def _check_inplace(features: List[np.ndarray], dtype: Optional[np.dtype]) -> None:
+    if _is_ragged(features) and features.index is not None:  # type: ignore
+        raise ValueError("Index views of ragged arrays cannot be scaled in-place.")
+    for run in _runs_of(features):
+        if not isinstance(run, np.ndarray) or not run.flags.writeable:
+            raise ValueError("Only writeable arrays can be scaled in-place.")
+        if not run.dtype == _get_out_dtype(run, dtype):
+            raise ValueError(
+                f"Features of dtype {run.dtype} cannot be scaled in-place "
+                f"to {_get_out_dtype(run, dtype)}."
+            )
+
+
+def _is_ragged(features: List[np.ndarray]) -> bool:
+    return isinstance(features, utils.RaggedArray)
+
+
+def _runs_of(features: List[np.ndarray]) -> List[np.ndarray]:
+    """The buffers that hold the samples of the features."""
+    if _is_ragged(features):
+        return [features.values]  # type: ignore
 
     return features
 
 
+def _to_ragged(runs: List[np.ndarray]) -> utils.RaggedArray:
+    if isinstance(runs, utils.RaggedArray):
+        return runs.compact()  # scale only the selected samples
+
+    return utils.RaggedArray.from_list(runs)
+
+
+def _like_input(
+    scaled: utils.RaggedArray, features: List[np.ndarray]
+) -> List[np.ndarray]:
+    if isinstance(features, utils.RaggedArray):
+        return scaled
+
+    return scaled.tolist()
+
+
 def _check_channels(
     run: np.ndarray, scaler: Union[Scaler, OperationConditionAwareScaler]
 ) -> None:
     if not run.shape[-1] == scaler.n_features_in_:
         raise ValueError(
             f"The scaler was fit on {scaler.n_features_in_} "
-            f"channels but the features have {run.shape[1]} channels."
+            f"channels but the features have {run.shape[-1]} channels."
         )
-
-
-def _scale_windowed_features(features: np.ndarray, scaler: Scaler) -> np.ndarray:
-    num_channels = features.shape[2]
-    window_size = features.shape[1]
-    features = features.reshape(-1, num_channels)
-    features = scaler.transform(features)
-    features = features.reshape(-1, window_size, num_channels)
-
-    return features
@@ -0,0 +1,263 @@
+"""A module for caching fully processed splits on disk.
+
+Loading a split with [load_split]
+[rul_datasets.reader.abstract.AbstractReader.load_split] parses the raw files, scales,
+windows and truncates the data each time it is called.
+When the split cache is enabled, the result of `load_split` is saved to the `splits`
+folder of the data root instead. Subsequent calls with an identically configured
+reader open the cached runs as read-only memory maps.
+
+The cache is disabled by default. It can be enabled by calling
+[enable_split_cache][rul_datasets.reader.split_cache.enable_split_cache] or by
+setting the environment variable `RUL_DATASETS_SPLIT_CACHE` to `1`.
+
+A cache entry is identified by the class of the reader, its hyperparameters and other
+public attributes, the loaded split and alias, and the size and modification time of
+the files the split is loaded from. Re-preparing a dataset or refitting a scaler
+therefore invalidates the affected cache entries. Readers declare these files by
+overriding `_get_artifact_paths`. Cache entries are never deleted automatically.
+
+Examples:
+    >>> import rul_datasets
+    >>> from rul_datasets.reader import split_cache
+    >>> split_cache.enable_split_cache()
+    >>> fd1 = rul_datasets.reader.CmapssReader(fd=1)
+    >>> features, targets = fd1.load_split("dev")  # processed and saved to cache
+    >>> features, targets = fd1.load_split("dev")  # opened from cache
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import re
+import shutil
+import tempfile
+from typing import TYPE_CHECKING, List, Optional, Tuple, Dict, Any, Iterable
+
+import numpy as np
+
+from rul_datasets.reader import saving
+from rul_datasets.reader.data_root import get_data_root
+
+if TYPE_CHECKING:
+    from rul_datasets.reader.abstract import AbstractReader
+
+_CACHE_DIR = "splits"
+_CACHE_VERSION = 1
+_META_FILE = "meta.json"
+_ENABLED = os.environ.get("RUL_DATASETS_SPLIT_CACHE", "0") == "1"
+_MEMORY_ADDRESS = re.compile(r" at 0x[0-9a-fA-F]+")
+
+
+def enable_split_cache() -> None:
+    """Enable caching processed splits on disk."""
+    global _ENABLED
+    _ENABLED = True
+
+
+def disable_split_cache() -> None:
+    """Disable caching processed splits on disk. Existing entries are kept."""
+    global _ENABLED
+    _ENABLED = False
+
+
+def is_split_cache_enabled() -> bool:
+    """
+    Return if processed splits are cached on disk.
+
+    Returns:
+        Whether the split cache is enabled.
+    """
+    return _ENABLED
+
+
+def load_split(
+    reader: "AbstractReader", split: str, alias: str
+) -> Optional[Tuple[List[np.ndarray], List[np.ndarray]]]:
+    """
+    Load a processed split from the cache.
+
+    Args:
+        reader: The reader the split was processed with.
+        split: The loaded split.
+        alias: The split as which the loaded split was treated.
+
+    Returns:
+        The features and targets as read-only memory maps or `None` if the split is
+        not cached.
+    """
+    return load_runs(_get_cache_path(reader, split, alias))
+
+
+def save_split(
+    reader: "AbstractReader",
+    split: str,
+    alias: str,
+    features: List[np.ndarray],
+    targets: List[np.ndarray],
+) -> None:
+    """
+    Save a processed split to the cache.
+
+    Args:
+        reader: The reader the split was processed with.
+        split: The loaded split.
+        alias: The split as which the loaded split was treated.
+        features: The processed features of the split.
+        targets: The processed targets of the split.
+    """
+    save_runs(_get_cache_path(reader, split, alias), features, targets)
+
+
+def load_runs(
+    cache_path: str,
+) -> Optional[Tuple[List[np.ndarray], List[np.ndarray]]]:
+    """
+    Load runs saved with [save_runs][rul_datasets.reader.split_cache.save_runs].
+
+    Args:
+        cache_path: The folder the runs were saved to.
+
+    Returns:
+        The features and targets as read-only memory maps or `None` if the folder
+        does not contain completely saved runs.
+    """
+    meta_path = os.path.join(cache_path, _META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path, mode="rt") as f:
+        num_runs = json.load(f)["num_runs"]
+    run_paths = [_get_run_path(cache_path, i) for i in range(num_runs)]
+    features, targets = saving.load_multiple(run_paths, memmap=True)
+
+    return features, targets
+
+
+def save_runs(
+    cache_path: str, features: List[np.ndarray], targets: List[np.ndarray]
+) -> None:
+    """
+    Save runs to a folder as memory-mappable .npy files.
+
+    The runs are written to a temporary folder first that is renamed afterward.
+    This way, no other process can read partially written runs. If the folder
+    already exists, nothing is written.
+
+    Args:
+        cache_path: The folder to save the runs to.
+        features: The features of the runs.
+        targets: The targets of the runs.
+    """
+    if os.path.exists(cache_path):
+        return
+    cache_dir = os.path.dirname(cache_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = tempfile.mkdtemp(dir=cache_dir)
+    try:
+        for i, (feat, targ) in enumerate(zip(features, targets)):
+            saving.save(_get_run_path(tmp_path, i), np.asarray(feat), targ)
+        with open(os.path.join(tmp_path, _META_FILE), mode="wt") as f:
+            json.dump({"num_runs": len(features)}, f)
+        os.rename(tmp_path, cache_path)
+    except OSError:
+        if not os.path.exists(cache_path):
+            raise  # only ignore entries written concurrently by another process
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+def get_cache_key(
+    reader: "AbstractReader",
+    split: str,
+    alias: str,
+    exclude: Optional[Iterable[str]] = None,
+) -> str:
+    """
+    Return the key of a processed split in the cache.
+
+    Hyperparameters and attributes named in `exclude` are not part of the key. This
+    way, readers that differ only in these settings get the same key.
+
+    Numpy arrays are identified by a hash of their content, functions and classes
+    by their qualified name and other objects by their `repr`. Objects whose
+    `repr` contains a memory address cannot be identified across processes and
+    are rejected.
+
+    Args:
+        reader: The reader the split is processed with.
+        split: The loaded split.
+        alias: The split as which the loaded split is treated.
+        exclude: Names of hyperparameters and attributes to ignore.
+
+    Returns:
+        A hex digest identifying the processed split.
+
+    Raises:
+        ValueError: If a hyperparameter or attribute cannot be identified.
+    """
+    exclude = set(exclude or [])
+    reader_cls = type(reader)
+    hparams = {k: v for k, v in reader.hparams.items() if k not in exclude}
+    attributes = _get_public_attributes(reader)
+    attributes = {k: v for k, v in attributes.items() if k not in exclude}
+    key_content = {
+        "version": _CACHE_VERSION,
+        "reader": f"{reader_cls.__module__}.{reader_cls.__qualname__}",
+        "hparams": hparams,
+        "attributes": attributes,
+        "split": split,
+        "alias": alias,
+        "artifacts": [_fingerprint(p) for p in reader._get_artifact_paths(split)],
+    }
+    key_json = json.dumps(key_content, sort_keys=True, default=_to_key_content)
+    key = hashlib.sha256(key_json.encode()).hexdigest()
+
+    return key
+
+
+def _get_public_attributes(reader: "AbstractReader") -> Dict[str, Any]:
+    return {k: v for k, v in vars(reader).items() if not k.startswith("_")}
+
+
+def _to_key_content(value: Any) -> Any:
+    """Convert a value that is not JSON serializable to a stable key content."""
+    if isinstance(value, np.ndarray):
+        digest = hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()
+        return {"dtype": str(value.dtype), "shape": value.shape, "sha256": digest}
+    elif isinstance(value, np.generic):
+        return value.item()
+    elif isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    elif inspect.isroutine(value) or inspect.isclass(value):
+        return f"{value.__module__}.{value.__qualname__}"
+    value_repr = repr(value)
+    if _MEMORY_ADDRESS.search(value_repr):
+        raise ValueError(
+            f"The representation of {value_repr} contains a memory address and "
+            "cannot identify a reader across processes. Please implement "
+            "'__repr__' for it or make the attribute private."
+        )
+
+    return value_repr
+
+
+def _fingerprint(file_path: str) -> Tuple[str, Optional[int], Optional[int]]:
+    if os.path.exists(file_path):
+        stat = os.stat(file_path)
+        fingerprint = (file_path, stat.st_size, stat.st_mtime_ns)
+    else:
+        fingerprint = (file_path, None, None)
+
+    return fingerprint
+
+
+def _get_cache_path(reader: "AbstractReader", split: str, alias: str) -> str:
+    key = get_cache_key(reader, split, alias)
+    cache_path = os.path.join(get_data_root(), _CACHE_DIR, key)
+
+    return cache_path
+
+
+def _get_run_path(cache_path: str, run_idx: int) -> str:
+    return os.path.join(cache_path, f"run_{run_idx}.npy")
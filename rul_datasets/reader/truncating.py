@@ -4,6 +4,8 @@ from typing import List, Tuple, Iterable, Union, Optional
 
 import numpy as np
 
+from rul_datasets import utils
+
 
 def truncate_runs(
     features: List[np.ndarray],
@@ -36,6 +38,10 @@ def truncate_runs(
         ((80, 5), (80,))
         >>> np.min(targets[0])  # runs contain no failures
         20
+
+    If the features and targets are [RaggedArrays][rul_datasets.utils.RaggedArray],
+    the truncated runs are index views of the original ones that share their
+    buffer.
     """
     # Truncate the number of runs
     if included_runs is not None:
@@ -72,6 +78,8 @@ def _truncate_broken(
     percent_broken: float,
     degraded_only: bool,
 ) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+    if isinstance(features, utils.RaggedArray):
+        return _truncate_broken_ragged(features, targets, percent_broken, degraded_only)
     features = features.copy()  # avoid mutating original list
     targets = targets.copy()  # avoid mutating original list
     for i, (run, target) in enumerate(zip(features, targets)):
@@ -87,9 +95,31 @@ def _truncate_broken(
     return features, targets
 
 
+def _truncate_broken_ragged(
+    features: utils.RaggedArray,
+    targets: utils.RaggedArray,
+    percent_broken: float,
+    degraded_only: bool,
+) -> Tuple[utils.RaggedArray, utils.RaggedArray]:
+    if degraded_only:
+        num_healthy = np.array([np.sum(t == np.max(t)) for t in targets], dtype=int)
+        num_degraded = features.lengths - num_healthy
+        num_cycles = num_healthy + (percent_broken * num_degraded).astype(int)
+    else:
+        num_cycles = (percent_broken * features.lengths).astype(int)
+    is_included = features.positions() < np.repeat(num_cycles, features.lengths)
+
+    return features.compress(is_included), targets.compress(is_included)
+
+
 def _truncate_included_by_index(
     features: List[np.ndarray], targets: List[np.ndarray], included_idx: Iterable[int]
 ) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+    if isinstance(features, utils.RaggedArray):
+        included_idx = list(included_idx)
+        features = features.select_runs(included_idx)
+        targets = targets.select_runs(included_idx)
+        return features, targets
     features = [features[i] for i in included_idx]
     targets = [targets[i] for i in included_idx]
 
@@ -74,6 +74,7 @@ class XjtuSyReader(AbstractReader):
         first_time_to_predict: Optional[List[int]] = None,
         norm_rul: bool = False,
         truncate_degraded_only: bool = False,
+        dtype: Optional[str] = None,
     ) -> None:
         """
         Create a new XJTU-SY reader for one of the sub-datasets. By default, the RUL
@@ -85,6 +86,10 @@ class XjtuSyReader(AbstractReader):
         constant. The `norm_rul` argument can then be used to scale the RUL of each
         run between zero and one.
 
+        The features are scaled in-place after loading them. Set `dtype` to
+        `"float32"` to halve the memory of the features compared to the default
+        `float64`.
+
         For more information about using readers, refer to the [reader]
         [rul_datasets.reader] module page.
 
@@ -101,6 +106,7 @@ class XjtuSyReader(AbstractReader):
             norm_rul: Normalize RUL between zero and one.
             truncate_degraded_only: Only truncate the degraded part of the data
                                     (< max RUL).
+            dtype: Data type of the features. Defaults to the one of the raw data.
         """
         super().__init__(
             fd,
@@ -121,6 +127,7 @@ class XjtuSyReader(AbstractReader):
         self.run_split_dist = run_split_dist
         self.first_time_to_predict = first_time_to_predict
         self.norm_rul = norm_rul
+        self.dtype = dtype
 
         self._preparator = XjtuSyPreparator(
             self.fd, self._XJTU_SY_ROOT, self.run_split_dist
@@ -134,6 +141,7 @@ class XjtuSyReader(AbstractReader):
                 "first_time_to_predict": self.first_time_to_predict,
                 "norm_rul": self.norm_rul,
                 "run_split_dist": self.run_split_dist,
+                "dtype": self.dtype,
             }
         )
 
@@ -157,6 +165,9 @@ class XjtuSyReader(AbstractReader):
         root directory. The whole dataset is converted com CSV files to NPY files to
         speed up loading it from disk. Afterwards, a scaler is fit on the development
         features. Previously completed steps are skipped.
+
+        The scaler is assembled from statistics that are computed once for each run.
+        Preparing a custom split therefore does not load the features again.
         """
         if not os.path.exists(self._XJTU_SY_ROOT):
             _download_xjtu_sy(get_data_root())
@@ -167,7 +178,12 @@ class XjtuSyReader(AbstractReader):
     ) -> Tuple[List[np.ndarray], List[np.ndarray]]:
         features, targets = self._preparator.load_runs(split)
         features = [f[:, -self.window_size :, :] for f in features]  # crop to window
-        features = scaling.scale_features(features, self._preparator.load_scaler())
+        if self.dtype is not None:
+            features = [f.astype(self.dtype, copy=False) for f in features]
+        # the loaded runs are owned by this reader, so they are not copied for scaling
+        features = scaling.scale_features(
+            features, self._preparator.load_scaler(), inplace=True
+        )
         if self.max_rul is not None:
             targets = [np.minimum(t, self.max_rul) for t in targets]
         elif self.first_time_to_predict is not None:
@@ -178,6 +194,9 @@ class XjtuSyReader(AbstractReader):
 
         return features, targets
 
+    def _get_artifact_paths(self, split: str) -> List[str]:
+        return self._preparator.get_artifact_paths(split)
+
     def _clip_first_time_to_predict(self, targets, split):
         fttp = [
             self.first_time_to_predict[i - 1]
@@ -217,8 +236,8 @@ class XjtuSyPreparator:
             runs = self._sort_runs(runs)
             self._save_efficient(runs)
         if not os.path.exists(self._get_scaler_path()):
-            features, _ = self.load_runs("dev")
-            scaler = scaling.fit_scaler(features)
+            statistics = self.load_statistics("dev")
+            scaler = scaling.fit_scaler_from_statistics(statistics)
             scaling.save_scaler(scaler, self._get_scaler_path())
 
     def load_runs(self, split: str) -> Tuple[List[np.ndarray], List[np.ndarray]]:
@@ -229,6 +248,26 @@ class XjtuSyPreparator:
 
         return features, targets
 
+    def load_statistics(self, split: str) -> List[scaling.RunStatistics]:
+        self._validate_split(split)
+        statistics = []
+        for run_idx in self.run_split_dist[split]:
+            stats_path = self._get_stats_path(run_idx)
+            if not os.path.exists(stats_path):  # runs prepared by older versions
+                features, _ = saving.load(self._get_run_file_path(run_idx), True)
+                self._save_statistics(run_idx, features)
+            statistics.extend(scaling.load_statistics(stats_path))
+
+        return statistics
+
+    def get_artifact_paths(self, split: str) -> List[str]:
+        self._validate_split(split)
+        paths = [self._get_scaler_path()]
+        for run_idx in self.run_split_dist[split]:
+            paths.extend(saving.get_file_paths(self._get_run_file_path(run_idx)))
+
+        return paths
+
     def load_scaler(self) -> scalers.StandardScaler:
         return scaling.load_scaler(self._get_scaler_path())
 
@@ -286,6 +325,11 @@ class XjtuSyPreparator:
     def _save_efficient(self, runs) -> None:
         for run_idx, (features, targets) in runs.items():
             saving.save(self._get_run_file_path(run_idx), features, targets)
+            self._save_statistics(run_idx, features)
+
+    def _save_statistics(self, run_idx: int, features: np.ndarray) -> None:
+        statistics = [scaling.RunStatistics.from_run(features)]
+        scaling.save_statistics(statistics, self._get_stats_path(run_idx))
 
     def _validate_split(self, split: str) -> None:
         if split not in ["dev", "val", "test"]:
@@ -303,6 +347,9 @@ class XjtuSyPreparator:
     def _get_run_file_path(self, run_idx: int) -> str:
         return os.path.join(self._get_fd_folder_path(), f"run_{run_idx}.npy")
 
+    def _get_stats_path(self, run_idx: int) -> str:
+        return os.path.join(self._get_fd_folder_path(), f"run_{run_idx}_stats.npz")
+
     def _get_fd_folder_path(self) -> str:
         return os.path.join(self.data_root, self._FD_FOLDERS[self.fd])
 
@@ -111,6 +111,7 @@ class SemiSupervisedDataModule(pl.LightningDataModule):
 
         The data loader is configured to shuffle the data. The `pin_memory` option is
         activated to achieve maximum transfer speed to the GPU.
+        The worker processes are configured like the ones of the labeled data module.
 
         Args:
             *args: Ignored. Only for adhering to parent class interface.
@@ -124,6 +125,7 @@ class SemiSupervisedDataModule(pl.LightningDataModule):
             batch_size=self.batch_size,
             shuffle=True,
             pin_memory=True,
+            **self.labeled.dataloader_kwargs,
         )
 
     def val_dataloader(self, *args: Any, **kwargs: Any) -> DataLoader:
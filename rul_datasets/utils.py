@@ -1,6 +1,18 @@
+import hashlib
 import os
 import tempfile
-from typing import List, Optional, Callable, Dict, Tuple, Literal
+from typing import (
+    Any,
+    List,
+    Optional,
+    Callable,
+    Dict,
+    Tuple,
+    Literal,
+    Union,
+    Iterator,
+    Sequence,
+)
 
 import numpy as np
 import requests  # type: ignore
@@ -9,6 +21,9 @@ from tqdm import tqdm  # type: ignore
 
 GDRIVE_URL_BASE = "https://docs.google.com/uc?export=download"
 
+_WINDOWS_CACHE_DIR = "windows"
+_WINDOWS_CHUNK_BYTES = 64 * 1024**2
+
 
 def get_files_in_path(path: str, condition: Optional[Callable] = None) -> List[str]:
     """
@@ -65,8 +80,8 @@ def extract_windows(
     seq: np.ndarray,
     window_size: int,
     dilation: int = 1,
-    mode: Literal["memory", "memmap"] = "memory",
-) -> np.ndarray:
+    mode: Literal["memory", "memmap", "view", "lazy"] = "memory",
+) -> Union[np.ndarray, "LazyWindows"]:
     """
     Extract sliding windows from a sequence.
 
@@ -79,11 +94,25 @@ def extract_windows(
     In this case, the number of extracted windows is `len(seq) - (window_size - 1) *
     dilation`.
 
+    In `memmap` mode, the windows are written to a file in the `windows` folder of
+    the data root and returned as a read-only memory map. The file name is derived
+    from the content of the sequence, the window size and the dilation. Extracting
+    the same windows again, even from another process, reuses the existing file.
+    These files are not deleted automatically.
+
+    In `view` mode, the windows are a read-only, strided view of the sequence that
+    shares its memory. No data is copied until the windows are indexed with an
+    index array or converted to a tensor.
+
+    In `lazy` mode, the windows are not extracted at all. Instead, a [LazyWindows]
+    [rul_datasets.utils.LazyWindows] object is returned that cuts the windows from
+    the sequence when they are accessed.
+
     Args:
         seq: sequence to extract windows from
         window_size: length of the sliding window
         dilation: dilation of the sliding window
-        mode: create windows either in memory or on disk
+        mode: create windows either in memory, on disk, as a view or lazily on access
 
     Returns:
         array of sliding windows
@@ -97,6 +126,10 @@ def extract_windows(
         windows = _extract_windows_in_memory(seq, window_size, dilation)
     elif mode == "memmap":
         windows = _extract_windows_memmap(seq, window_size, dilation)
+    elif mode == "view":
+        windows = _extract_windows_view(seq, window_size, dilation)
+    elif mode == "lazy":
+        windows = LazyWindows(seq, window_size, dilation)
     else:
         raise ValueError(f"Unknown mode {mode}.")
 
@@ -112,21 +145,452 @@ def _extract_windows_in_memory(seq, window_size, dilation):
     return windows
 
 
+def _extract_windows_view(seq, window_size, dilation):
+    window_span = (window_size - 1) * dilation + 1
+    windows = np.lib.stride_tricks.sliding_window_view(seq, window_span, axis=0)
+    windows = np.moveaxis(windows[..., ::dilation], -1, 1)  # window dim after frames
+
+    return windows
+
+
 def _extract_windows_memmap(seq, window_size, dilation):
+    cache_path = _get_windows_cache_path(seq, window_size, dilation)
+    if not os.path.exists(cache_path):
+        _write_windows_memmap(seq, window_size, dilation, cache_path)
+    windows = np.lib.format.open_memmap(cache_path, mode="r")
+
+    return windows
+
+
+def _get_windows_cache_path(seq, window_size, dilation):
+    # imported here to avoid a circular import with the reader package
+    from rul_datasets.reader.data_root import get_data_root
+
+    fingerprint = hashlib.sha256(np.ascontiguousarray(seq).data)
+    fingerprint.update(f"{seq.shape}{seq.dtype}{window_size}{dilation}".encode())
+    cache_dir = os.path.join(get_data_root(), _WINDOWS_CACHE_DIR)
+    cache_path = os.path.join(cache_dir, f"{fingerprint.hexdigest()}.npy")
+
+    return cache_path
+
+
+def _write_windows_memmap(seq, window_size, dilation, cache_path):
     num_frames = seq.shape[0] - (window_size - 1) * dilation
     window_idx = np.arange(window_size)[None, :] * dilation
-    with tempfile.NamedTemporaryFile() as tmp_file:
-        windows = np.memmap(
-            tmp_file.name,
-            dtype=np.float32,
+    window_bytes = window_size * seq[:1].nbytes
+    chunk_size = max(1, _WINDOWS_CHUNK_BYTES // max(1, window_bytes))
+    cache_dir = os.path.dirname(cache_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    # write to a temporary file first so that no process reads a partial cache
+    tmp_fd, tmp_path = tempfile.mkstemp(suffix=".npy", dir=cache_dir)
+    os.close(tmp_fd)
+    try:
+        windows = np.lib.format.open_memmap(
+            tmp_path,
             mode="w+",
+            dtype=seq.dtype,
             shape=(num_frames, window_size, *seq.shape[1:]),
         )
-    for i in range(num_frames):
-        windows[i] = seq[window_idx + i]
-    windows.flush()
+        for start in range(0, num_frames, chunk_size):
+            stop = min(start + chunk_size, num_frames)
+            windows[start:stop] = seq[window_idx + np.arange(start, stop)[:, None]]
+        windows.flush()
+        del windows
+        os.replace(tmp_path, cache_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class LazyWindows:
+    """
+    Sliding windows of a sequence that are only cut from it when accessed.
+
+    This object stores the original sequence and the start index of each window
+    instead of the windows themselves. It mimics the array returned by
+    [extract_windows][rul_datasets.utils.extract_windows] well enough to be used in
+    its place: it has a `shape`, `dtype` and length. Indexing it with an integer
+    returns a single window as a view of the sequence. Indexing it with a slice,
+    an index array or a boolean mask returns a new `LazyWindows` object over the
+    selected windows without copying any data. Converting it with `np.asarray`
+    materializes the selected windows.
+
+    Examples:
+        >>> import numpy as np
+        >>> from rul_datasets.utils import extract_windows
+        >>> windows = extract_windows(np.random.randn(100, 14), 30, mode="lazy")
+        >>> windows.shape
+        (71, 30, 14)
+        >>> windows[:10].shape
+        (10, 30, 14)
+        >>> np.asarray(windows[[1, 5]]).shape
+        (2, 30, 14)
+    """
 
-    return windows
+    def __init__(
+        self,
+        seq: np.ndarray,
+        window_size: int,
+        dilation: int = 1,
+        start_idx: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        Create lazy windows over a sequence.
+
+        Args:
+            seq: sequence to extract windows from
+            window_size: length of the sliding window
+            dilation: dilation of the sliding window
+            start_idx: start index of each window, defaults to all possible windows
+        """
+        self.seq = seq
+        self.window_size = window_size
+        self.dilation = dilation
+        if start_idx is None:
+            num_frames = seq.shape[0] - (window_size - 1) * dilation
+            start_idx = np.arange(num_frames)
+        self.start_idx = start_idx
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        """Shape of the materialized windows."""
+        return len(self.start_idx), self.window_size, *self.seq.shape[1:]
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Data type of the underlying sequence."""
+        return self.seq.dtype
+
+    @property
+    def ndim(self) -> int:
+        """Number of dimensions of the materialized windows."""
+        return self.seq.ndim + 1
+
+    def __len__(self) -> int:
+        return len(self.start_idx)
+
+    def __getitem__(self, key) -> Union[np.ndarray, "LazyWindows"]:
+        if isinstance(key, (int, np.integer)):
+            start = self.start_idx[key]
+            stop = start + (self.window_size - 1) * self.dilation + 1
+            return self.seq[start : stop : self.dilation]
+        elif isinstance(key, tuple):
+            raise NotImplementedError(
+                "LazyWindows only supports indexing the window dimension."
+            )
+        start_idx = self.start_idx[key]
+
+        return LazyWindows(self.seq, self.window_size, self.dilation, start_idx)
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        window_idx = np.arange(self.window_size) * self.dilation
+        windows = self.seq[self.start_idx[:, None] + window_idx]
+        if dtype is not None:
+            windows = windows.astype(dtype, copy=False)
+
+        return windows
+
+
+class RaggedArray:
+    """
+    Runs of different lengths stored in one contiguous buffer.
+
+    The samples of all runs are concatenated along the first axis into `values`.
+    The run `i` spans the samples from `offsets[i]` to `offsets[i + 1]`. This way,
+    operations that treat each sample independently, e.g. scaling, filtering or
+    gathering samples by their global index, are a single vectorized operation
+    across all runs.
+
+    Selecting a subset of samples or runs, e.g. with [compress]
+    [rul_datasets.utils.RaggedArray.compress], does not copy the buffer. Instead,
+    the new ragged array holds an `index` array into the shared buffer, and the
+    selected samples are only gathered when they are accessed.
+
+    For backward compatibility, the object behaves like a list of runs: it has a
+    length, can be iterated, and indexing it with an integer returns a run. Without
+    an index array, the run is a view of the buffer. Indexing it with a slice
+    returns a new `RaggedArray` that shares the buffer. The buffer may be a memory
+    map, e.g. when loaded with `memmap=True`.
+
+    Examples:
+        >>> import numpy as np
+        >>> from rul_datasets.utils import RaggedArray
+        >>> runs = RaggedArray.from_list([np.zeros((3, 2)), np.ones((5, 2))])
+        >>> len(runs), runs[1].shape, runs.values.shape
+        (2, (5, 2), (8, 2))
+        >>> runs.offsets
+        array([0, 3, 8])
+        >>> selected = runs.compress(np.arange(8) % 2 == 0)
+        >>> selected.offsets, selected.index
+        (array([0, 2, 4]), array([0, 2, 4, 6]))
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        offsets: np.ndarray,
+        index: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        Create a ragged array from a buffer and run offsets.
+
+        Args:
+            values: the concatenated samples of all runs
+            offsets: the start index of each run followed by the number of samples
+            index: the position of each sample in the buffer, defaults to all samples
+                   of the buffer in order
+        """
+        offsets = np.asarray(offsets, dtype=np.int64)
+        num_samples = len(values) if index is None else len(index)
+        if len(offsets) == 0 or offsets[0] != 0 or offsets[-1] != num_samples:
+            raise ValueError(
+                "The offsets need to start at zero and end at the number of samples."
+            )
+        if np.any(np.diff(offsets) < 0):
+            raise ValueError("The offsets need to be non-decreasing.")
+        self.values = values
+        self.offsets = offsets
+        self.index = index
+        self._shared_values: Optional[torch.Tensor] = None
+
+    @classmethod
+    def from_list(cls, runs: Sequence[np.ndarray]) -> "RaggedArray":
+        """
+        Concatenate a list of runs into a ragged array.
+
+        Args:
+            runs: the runs to concatenate, which have to agree in all but the first
+                  dimension
+
+        Returns:
+            the ragged array containing a copy of the runs
+        """
+        if not runs:
+            raise ValueError("Cannot create a ragged array from zero runs.")
+        offsets = np.zeros(len(runs) + 1, dtype=np.int64)
+        np.cumsum([len(run) for run in runs], out=offsets[1:])
+        values = np.concatenate(runs)
+
+        return cls(values, offsets)
+
+    @classmethod
+    def load(cls, save_path: str, memmap: bool = False) -> "RaggedArray":
+        """
+        Load a ragged array saved with [save][rul_datasets.utils.RaggedArray.save].
+
+        Args:
+            save_path: the folder the ragged array was saved to
+            memmap: whether to open the buffer as a read-only memory map
+
+        Returns:
+            the loaded ragged array
+        """
+        mmap_mode = "r" if memmap else None
+        values = np.load(os.path.join(save_path, "values.npy"), mmap_mode=mmap_mode)
+        offsets = np.load(os.path.join(save_path, "offsets.npy"))
+        index_path = os.path.join(save_path, "index.npy")
+        index = np.load(index_path) if os.path.exists(index_path) else None
+
+        return cls(values, offsets, index)
+
+    def save(self, save_path: str) -> None:
+        """
+        Save the ragged array to a folder as memory-mappable .npy files.
+
+        Args:
+            save_path: the folder to save the ragged array to
+        """
+        os.makedirs(save_path, exist_ok=True)
+        np.save(os.path.join(save_path, "values.npy"), self.values)
+        np.save(os.path.join(save_path, "offsets.npy"), self.offsets)
+        if self.index is not None:
+            np.save(os.path.join(save_path, "index.npy"), self.index)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Number of samples in each run."""
+        return np.diff(self.offsets)
+
+    @property
+    def num_samples(self) -> int:
+        """Number of samples in all runs."""
+        return int(self.offsets[-1])
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Data type of the buffer."""
+        return self.values.dtype
+
+    def take(self, indices: np.ndarray) -> np.ndarray:
+        """
+        Gather samples by their global index across all runs.
+
+        Args:
+            indices: the global indices of the samples
+
+        Returns:
+            the gathered samples
+        """
+        if self.index is not None:
+            indices = self.index[indices]
+
+        return self.values[indices]
+
+    def with_values(self, values: np.ndarray) -> "RaggedArray":
+        """
+        Return a ragged array with the same runs but a new buffer.
+
+        This is useful to apply vectorized operations to all runs at once, e.g.
+        `runs.with_values(runs.values * 2)`.
+
+        Args:
+            values: the new buffer with the same number of samples
+
+        Returns:
+            the ragged array over the new buffer
+        """
+        return RaggedArray(values, self.offsets, self.index)
+
+    def compress(self, mask: np.ndarray) -> "RaggedArray":
+        """
+        Select samples of all runs with a boolean mask without copying them.
+
+        Args:
+            mask: a boolean mask with one entry per sample
+
+        Returns:
+            the ragged array of selected samples with the same number of runs
+        """
+        num_selected = np.zeros(len(mask) + 1, dtype=np.int64)
+        np.cumsum(mask, out=num_selected[1:])
+        index = self._get_index()[mask]
+
+        return self._view(num_selected[self.offsets], index)
+
+    def select_runs(self, run_idx: Sequence[int]) -> "RaggedArray":
+        """
+        Select runs by their index without copying them.
+
+        Args:
+            run_idx: the indices of the selected runs in the desired order
+
+        Returns:
+            the ragged array of the selected runs
+        """
+        run_idx = np.asarray(run_idx, dtype=np.int64).reshape(-1)
+        lengths = self.lengths[run_idx]
+        offsets = np.zeros(len(run_idx) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        starts = np.repeat(self.offsets[run_idx] - offsets[:-1], lengths)
+        index = self._get_index()[starts + np.arange(offsets[-1])]
+
+        return self._view(offsets, index)
+
+    def share_memory(self) -> "RaggedArray":
+        """
+        Move the buffer to shared memory in-place.
+
+        Afterward, the buffer is not copied when the ragged array is sent to another
+        process, e.g. a spawned worker of a data loader. Instead, the other process
+        opens the same shared memory. Ragged arrays selecting samples or runs of this
+        one, e.g. with [compress][rul_datasets.utils.RaggedArray.compress], share it,
+        too. Memory maps are already shared by the operating system and stay as they
+        are.
+
+        Returns:
+            the ragged array itself
+        """
+        if self._shared_values is None and not isinstance(self.values, np.memmap):
+            buffer = np.require(self.values, requirements=["C", "W"])
+            self._shared_values = torch.from_numpy(buffer).share_memory_()
+            self.values = self._shared_values.numpy()
+
+        return self
+
+    def compact(self) -> "RaggedArray":
+        """
+        Return a ragged array whose buffer holds exactly its samples in order.
+
+        Returns:
+            the ragged array itself if it has no index array, otherwise a copy of
+            the selected samples
+        """
+        if self.index is None:
+            return self
+
+        return RaggedArray(self.values[self.index], self.offsets)
+
+    def positions(self) -> np.ndarray:
+        """Return the position of each sample inside its run."""
+        run_starts = np.repeat(self.offsets[:-1], self.lengths)
+
+        return np.arange(self.num_samples) - run_starts
+
+    def tolist(self) -> List[np.ndarray]:
+        """Return the runs as a list of arrays."""
+        return [self[i] for i in range(len(self))]
+
+    def _view(self, offsets: np.ndarray, index: np.ndarray) -> "RaggedArray":
+        view = RaggedArray(self.values, offsets, index)
+        view._shared_values = self._shared_values
+
+        return view
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        if self._shared_values is not None:
+            state["values"] = None  # pickle the shared tensor instead of a copy
+
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        if self._shared_values is not None:
+            self.values = self._shared_values.numpy()
+
+    def _get_index(self) -> np.ndarray:
+        if self.index is None:
+            return np.arange(len(self.values))
+
+        return self.index
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, key) -> Union[np.ndarray, "RaggedArray"]:
+        if isinstance(key, (int, np.integer)):
+            if key < 0:
+                key += len(self)
+            if not 0 <= key < len(self):
+                raise IndexError(f"Run {key} out of range for {len(self)} runs.")
+            run = slice(self.offsets[key], self.offsets[key + 1])
+            if self.index is None:
+                return self.values[run]  # a view of the buffer
+            return self.values[self.index[run]]
+        elif isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                raise NotImplementedError(
+                    "RaggedArray only supports contiguous slices."
+                )
+            stop = max(start, stop)
+            offsets = self.offsets[start : stop + 1]
+            samples = slice(offsets[0], offsets[-1])
+            if self.index is None:
+                view = RaggedArray(self.values[samples], offsets - offsets[0])
+                if self._shared_values is not None:
+                    view._shared_values = self._shared_values[samples]
+                return view
+            return self._view(offsets - offsets[0], self.index[samples])
+        raise TypeError(f"RaggedArray cannot be indexed with {type(key)}.")
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for i in range(len(self)):
+            yield self[i]
 
 
 def download_file(url: str, save_path: str) -> None:
@@ -192,7 +656,8 @@ def feature_to_tensor(
         dtype: dtype of the resulting tensor
         copy: whether to copy the array before converting it
     """
-    if copy:
+    read_only = isinstance(features, np.ndarray) and not features.flags.writeable
+    if copy or read_only:  # torch cannot share read-only memory
         features = np.copy(features)
     tensor = torch.transpose(torch.as_tensor(features, dtype=dtype), -1, -2)
 
@@ -1,3 +1,4 @@
+import os
 from unittest import mock
 
 import numpy as np
@@ -7,13 +8,14 @@ import pytest
 from rul_datasets import reader
 
 
-@pytest.fixture(scope="module", autouse=True)
+@pytest.fixture(scope="module")
 def prepare_cmapss():
     for fd in range(1, 5):
         reader.CmapssReader(fd).prepare_data()
 
 
 @pytest.mark.needs_data
+@pytest.mark.usefixtures("prepare_cmapss")
 class TestCMAPSSLoader:
     NUM_CHANNELS = len(reader.CmapssReader._DEFAULT_CHANNELS)
 
@@ -132,3 +134,136 @@ class TestCMAPSSLoader:
         # zero-padding of targets should have been removed via windowing or cropping
         for t in targets:
             assert not t[0] == 0
+
+
+def _write_fake_runs(file_path, run_lengths, offset=0.0):
+    runs = []
+    for unit, length in enumerate(run_lengths, start=1):
+        run = np.random.randn(length, 26) + offset
+        run[:, 0] = unit
+        run[:, 1] = np.arange(1, length + 1)
+        run[:, 2] = 0.0  # operation condition
+        runs.append(run)
+    np.savetxt(file_path, np.concatenate(runs), fmt="%.4f")
+
+
+@pytest.fixture()
+def fake_cmapss(tmp_path, monkeypatch):
+    cmapss_root = tmp_path / "CMAPSS"
+    cmapss_root.mkdir()
+    _write_fake_runs(cmapss_root / "train_FD001.txt", [20, 15, 25, 12, 18])
+    _write_fake_runs(cmapss_root / "test_FD001.txt", [10, 8])
+    np.savetxt(cmapss_root / "RUL_FD001.txt", [30, 50], fmt="%d")
+    monkeypatch.setattr(reader.CmapssReader, "_CMAPSS_ROOT", str(cmapss_root))
+
+    return cmapss_root
+
+
+@pytest.fixture()
+def fake_fd1(fake_cmapss):
+    fd1 = reader.CmapssReader(1, window_size=5)
+    fd1.prepare_data()
+
+    return fd1
+
+
+class TestBinaryParseCache:
+    def test_binary_files_created(self, fake_cmapss, fake_fd1):
+        binary_root = fake_cmapss / "binary"
+        for name in ["train", "test", "RUL"]:
+            for suffix in [".npy", "_runs.npy", ".json"]:
+                assert (binary_root / f"{name}_FD001{suffix}").exists()
+        run_offsets = np.load(binary_root / "train_FD001_runs.npy")
+        npt.assert_equal(run_offsets, [0, 20, 35, 60, 72, 90])
+
+    def test_load_skips_text_parsing(self, fake_fd1):
+        splits = ["dev", "val", "test"]
+        expected = {split: fake_fd1.load_split(split) for split in splits}
+        with mock.patch("numpy.loadtxt", side_effect=AssertionError):
+            for split, (exp_features, exp_targets) in expected.items():
+                features, targets = fake_fd1.load_split(split)
+                for exp, actual in zip(exp_features + exp_targets, features + targets):
+                    npt.assert_equal(exp, actual)
+
+    def test_loaded_like_text(self, fake_cmapss, fake_fd1):
+        features, targets = fake_fd1.load_split("test")
+        assert len(features) == 2
+        npt.assert_equal(targets, [[30], [50]])
+        raw = np.loadtxt(fake_cmapss / "train_FD001.txt")
+        _, time_steps = fake_fd1._split_time_steps_from_features(
+            fake_fd1._load_features("dev")[0] + fake_fd1._load_features("val")[0]
+        )
+        npt.assert_equal(np.concatenate(time_steps), raw[:, 1])
+
+    def test_text_file_is_source_of_truth(self, fake_cmapss, fake_fd1):
+        test_path = fake_cmapss / "test_FD001.txt"
+        before, _ = fake_fd1._load_parsed(str(test_path))
+        _write_fake_runs(test_path, [10, 8, 9], offset=100.0)
+        stat = os.stat(test_path)
+        os.utime(test_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        after, run_offsets = fake_fd1._load_parsed(str(test_path))
+
+        assert len(after) == 27
+        npt.assert_equal(run_offsets, [0, 10, 18, 27])
+        assert np.all(after[:, 3:] > 50) and not np.all(before[:, 3:] > 50)
+
+
+class TestRunSplitDist:
+    def test_default_split_is_index_only(self, fake_cmapss, fake_fd1):
+        assert not (fake_cmapss / "dev_FD001.txt").exists()
+        assert not (fake_cmapss / "val_FD001.txt").exists()
+        dev_features, _ = fake_fd1.load_split("dev")
+        val_features, _ = fake_fd1.load_split("val")
+        assert [len(f) for f in dev_features] == [16, 11, 21, 8]
+        assert [len(f) for f in val_features] == [14]
+
+    def test_custom_split(self, fake_fd1):
+        custom = reader.CmapssReader(
+            1, window_size=5, run_split_dist={"dev": [4, 0], "val": [2]}
+        )
+        with mock.patch("numpy.loadtxt", side_effect=AssertionError):
+            custom.prepare_data()
+        dev_features, _ = custom.load_split("dev")
+        val_features, _ = custom.load_split("val")
+
+        assert [len(f) for f in dev_features] == [14, 16]
+        assert [len(f) for f in val_features] == [21]
+        assert custom._get_scaler_path() != fake_fd1._get_scaler_path()
+        assert custom.get_compatible(percent_fail_runs=[0])._get_complement_idx() == [1]
+
+    def test_invalid_split_keys(self):
+        with pytest.raises(ValueError):
+            reader.CmapssReader(1, run_split_dist={"dev": [0], "test": [1]})
+
+    @pytest.mark.parametrize(
+        "run_split_dist",
+        [
+            {"dev": [0, 100], "val": [1]},
+            {"dev": [-1], "val": [1]},
+            {"dev": [0], "val": [100]},
+        ],
+    )
+    def test_split_out_of_range(self, run_split_dist):
+        with pytest.raises(ValueError):
+            reader.CmapssReader(1, run_split_dist=run_split_dist)
+        reader.CmapssReader(1, run_split_dist={"dev": [99], "val": [0]})
+
+    @pytest.mark.parametrize(
+        "run_split_dist",
+        [{"dev": [0, 1], "val": [1]}, {"dev": [0, 0], "val": [1]}],
+    )
+    def test_split_not_disjoint(self, run_split_dist):
+        with pytest.raises(ValueError):
+            reader.CmapssReader(1, run_split_dist=run_split_dist)
+
+    def test_split_in_hparams(self):
+        run_split_dist = {"dev": [0, 1], "val": [2]}
+        custom = reader.CmapssReader(1, run_split_dist=run_split_dist)
+
+        assert custom.hparams["run_split_dist"] == run_split_dist
+        assert reader.CmapssReader(1).hparams["run_split_dist"] is None
+        assert "_NUM_TRAIN_RUNS" not in vars(custom)
+
+    def test_split_missing(self, fake_cmapss):
+        with pytest.raises(RuntimeError):
+            reader.CmapssReader(1)._get_run_split_dist()
@@ -54,3 +54,20 @@ def test_normalization_min_max(fd):
     trunc_dev, _ = trunc_dataset.load_split("dev")
     assert np.round(max(np.max(r).item() for r in trunc_dev), decimals=7) <= 1.0
     assert np.round(min(np.min(r).item() for r in trunc_dev), decimals=7) >= -1.0
+
+
+@pytest.mark.parametrize("fd", [1, 2])
+@pytest.mark.parametrize("split", ["dev", "val", "test"])
+@pytest.mark.parametrize("window_mode", ["view", "lazy"])
+def test_window_mode(fd, split, window_mode):
+    eager_reader = reader.DummyReader(fd, percent_broken=0.8)
+    lazy_reader = reader.DummyReader(fd, percent_broken=0.8, window_mode=window_mode)
+
+    eager_features, eager_targets = eager_reader.load_split(split)
+    lazy_features, lazy_targets = lazy_reader.load_split(split)
+
+    for eager, lazy in zip(eager_features, lazy_features):
+        assert eager.shape == lazy.shape
+        npt.assert_equal(eager, np.asarray(lazy))
+    for eager, lazy in zip(eager_targets, lazy_targets):
+        npt.assert_equal(eager, lazy)
@@ -1,8 +1,11 @@
 import numpy as np
 import numpy.testing as npt
 import pytest
+from sklearn.preprocessing import StandardScaler
 
 from rul_datasets import reader
+from rul_datasets.reader import saving
+from rul_datasets.reader.femto import FemtoPreparator
 
 
 def test_additional_hparams():
@@ -12,6 +15,54 @@ def test_additional_hparams():
     assert femto.hparams["run_split_dist"] is None
 
 
+@pytest.mark.parametrize("dtype", [None, "float32"])
+def test_features_scaled_in_place(mocker, dtype):
+    reader_ = reader.FemtoReader(1, window_size=10, dtype=dtype)
+    features = [np.random.randn(n, 20, 2) * 2 + 1 for n in [5, 8]]
+    targets = [np.arange(n, 0, -1, dtype=float) for n in [5, 8]]
+    scaler = StandardScaler().fit(np.concatenate(features).reshape(-1, 2))
+    mocker.patch.object(
+        reader_._preparator, "load_runs", return_value=(features, targets)
+    )
+    mocker.patch.object(reader_._preparator, "load_scaler", return_value=scaler)
+    expected = [scaler.transform(f[:, -10:].reshape(-1, 2)) for f in features]
+
+    scaled, _ = reader_.load_complete_split("dev", "dev")
+
+    assert reader_.hparams["dtype"] == dtype
+    for feat, scaled_feat, exp_feat in zip(features, scaled, expected):
+        assert scaled_feat.shape == (len(feat), 10, 2)
+        assert scaled_feat.dtype == np.dtype(dtype or np.float64)
+        assert np.shares_memory(feat, scaled_feat) == (dtype is None)
+        npt.assert_almost_equal(exp_feat, scaled_feat.reshape(-1, 2), decimal=5)
+
+
+def test_scaler_from_run_statistics(tmp_path, mocker):
+    runs = {i: (np.random.randn(10 * i, 20, 2), np.arange(10 * i)) for i in [1, 2, 3]}
+    preparator = FemtoPreparator(1, str(tmp_path), {"dev": [1, 3], "val": [2]})
+    preparator._save_efficient("dev", runs)
+    mocker.patch.object(preparator, "_split_already_prepared", return_value=True)
+    mock_load = mocker.patch("rul_datasets.reader.femto.saving.load")
+
+    preparator.prepare_split("dev")
+
+    mock_load.assert_not_called()  # assembled from statistics only
+    features = np.concatenate([runs[1][0], runs[3][0]]).reshape(-1, 2)
+    npt.assert_almost_equal(preparator.load_scaler().mean_, features.mean(0))
+    npt.assert_almost_equal(preparator.load_scaler().var_, features.var(0))
+
+
+def test_run_statistics_of_old_runs(tmp_path):
+    features = np.random.randn(10, 20, 2)
+    preparator = FemtoPreparator(1, str(tmp_path), {"dev": [1], "val": [2]})
+    saving.save(preparator._get_run_file_path("dev", 1), features, np.arange(10))
+
+    statistics = preparator.load_statistics("dev")
+
+    assert len(statistics) == 1
+    npt.assert_almost_equal(statistics[0].mean, features.reshape(-1, 2).mean(0))
+
+
 @pytest.mark.needs_data
 class TestFemtoReader:
     NUM_CHANNELS = 2
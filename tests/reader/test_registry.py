@@ -0,0 +1,147 @@
+import importlib
+
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from rul_datasets.reader import registry, DummyReader
+
+
+@pytest.fixture()
+def budget():
+    registry.set_memory_budget(1024**3)
+    yield
+    registry.set_memory_budget(0)
+    registry.clear_registry()
+
+
+def test_disabled_by_default(mocker):
+    assert registry.get_memory_budget() == 0
+    spy_load_complete = mocker.spy(DummyReader, "load_complete_split")
+
+    DummyReader(1).load_split("dev")
+    DummyReader(1).load_split("dev")
+
+    assert spy_load_complete.call_count == 2
+    assert registry.get_memory_usage() == 0
+
+
+def test_env_var_sets_budget(monkeypatch):
+    monkeypatch.setenv("RUL_DATASETS_MEMORY_BUDGET", "1000")
+    importlib.reload(registry)
+    assert registry.get_memory_budget() == 1000
+
+    monkeypatch.delenv("RUL_DATASETS_MEMORY_BUDGET")
+    importlib.reload(registry)
+    assert registry.get_memory_budget() == 0
+
+
+def test_negative_budget():
+    with pytest.raises(ValueError):
+        registry.set_memory_budget(-1)
+
+
+@pytest.mark.parametrize(
+    "truncation",
+    [
+        {"percent_broken": 0.5},
+        {"percent_fail_runs": 0.5},
+        {"percent_fail_runs": [0, 4]},
+        {"truncate_degraded_only": True, "percent_broken": 0.2},
+    ],
+)
+def test_shared_between_truncated_readers(budget, mocker, truncation):
+    spy_load_complete = mocker.spy(DummyReader, "load_complete_split")
+    reader = DummyReader(1)
+    truncated_reader = DummyReader(1, **truncation)
+
+    features, targets = reader.load_split("dev")
+    trunc_features, trunc_targets = truncated_reader.load_split("dev")
+
+    spy_load_complete.assert_called_once()
+    expected = DummyReader(1, **truncation)
+    registry.set_memory_budget(0)
+    exp_features, exp_targets = expected.load_split("dev")
+    for feat, exp_feat in zip(trunc_features, exp_features):
+        npt.assert_equal(feat, exp_feat)
+    for targ, exp_targ in zip(trunc_targets, exp_targets):
+        npt.assert_equal(targ, exp_targ)
+    for feat in trunc_features:
+        assert any(np.shares_memory(feat, f) for f in features)
+
+
+def test_not_shared_between_different_configs(budget, mocker):
+    spy_load_complete = mocker.spy(DummyReader, "load_complete_split")
+
+    DummyReader(1).load_split("dev")
+    DummyReader(1).load_split("val")
+    DummyReader(1).load_split("dev", alias="test")
+    DummyReader(2).load_split("dev")
+    DummyReader(1, window_size=5).load_split("dev")
+
+    assert spy_load_complete.call_count == 5
+
+
+def test_shared_arrays_read_only(budget):
+    features, targets = DummyReader(1).load_split("dev")
+
+    assert not features[0].flags.writeable
+    assert not targets[0].flags.writeable
+    features.pop()  # returned lists are copies
+    assert len(DummyReader(1).load_split("dev")[0]) == 10
+
+
+def test_lazy_windows_read_only(budget):
+    features, _ = DummyReader(1, window_mode="lazy").load_split("dev")
+
+    assert not features[0].seq.flags.writeable
+    assert not features[0].start_idx.flags.writeable
+
+
+def test_views_charged_by_owning_buffer():
+    seq = np.zeros((100, 3))
+    windows = np.lib.stride_tricks.sliding_window_view(seq, 10, axis=0)
+    runs = [windows[:50], windows[50:], seq]
+
+    assert windows.nbytes > 5 * seq.nbytes
+    assert registry._get_num_bytes(runs) == seq.nbytes
+
+
+def test_memmaps_not_charged(tmp_path):
+    mmap = np.lib.format.open_memmap(tmp_path / "run.npy", "w+", np.float32, (10,))
+
+    assert registry._get_num_bytes([mmap, mmap[2:5], np.zeros(4)]) == 32
+
+
+def test_lru_eviction(budget, mocker):
+    DummyReader(1).load_split("dev")
+    split_bytes = registry.get_memory_usage()
+    registry.set_memory_budget(int(2.5 * split_bytes))
+
+    DummyReader(2).load_split("dev")
+    DummyReader(1).load_split("dev")  # hit, FD1 is now most recently used
+    DummyReader(1, window_size=5).load_split("dev")  # evicts FD2
+
+    assert registry.get_memory_usage() <= 2.5 * split_bytes
+    spy_load_complete = mocker.spy(DummyReader, "load_complete_split")
+    DummyReader(1).load_split("dev")
+    spy_load_complete.assert_not_called()
+    DummyReader(2).load_split("dev")
+    spy_load_complete.assert_called_once()
+
+
+def test_split_larger_than_budget_not_registered(budget):
+    registry.set_memory_budget(10)
+
+    DummyReader(1).load_split("dev")
+
+    assert registry.get_memory_usage() == 0
+
+
+def test_lowering_budget_evicts(budget):
+    DummyReader(1).load_split("dev")
+    assert registry.get_memory_usage() > 0
+
+    registry.set_memory_budget(1)
+
+    assert registry.get_memory_usage() == 0
@@ -74,3 +74,16 @@ def test_load_raw_features(file_name, columns):
     assert len(features) == 1
     run = features[0]
     assert run.shape == (1, window_size, len(columns))
+
+
+@pytest.mark.parametrize("file_name", ["run", "run.npy"])
+def test_get_file_paths(tmp_path, file_name):
+    save_path = os.path.join(tmp_path, file_name)
+    saving.save(save_path, np.empty((10, 2, 5)), np.empty((10,)))
+
+    feature_path, target_path = saving.get_file_paths(save_path)
+
+    assert os.path.exists(feature_path)
+    assert os.path.exists(target_path)
+    assert feature_path.endswith("run_features.npy")
+    assert target_path.endswith("run_targets.npy")
@@ -7,11 +7,17 @@ import numpy.testing as npt
 import pytest
 
 import sklearn.preprocessing as scalers
+from sklearn.exceptions import NotFittedError
 from sklearn.utils.validation import check_is_fitted
 
+from rul_datasets import utils
 from rul_datasets.reader import scaling
 
 
+class _CustomScaler(scalers.StandardScaler):
+    pass
+
+
 @pytest.fixture
 def fitted_scaler():
     scaler = scalers.StandardScaler()
@@ -85,6 +91,74 @@ class TestOperationConditionAwareScaler:
         scaled = fitted_conditioned_scaler.transform(features, conditions)
         npt.assert_almost_equal(scaled, 1)
 
+    def test_get_condition_ids(self):
+        boundaries = [(2, 3), (-1, 0.5), (4, 4)]
+        scaler = scaling.OperationConditionAwareScaler(
+            scalers.MinMaxScaler(), boundaries
+        )
+        conditions = np.array([-1, 0.5, 0.7, 2, 2.5, 3, 3.5, 4, 5, -2, np.nan])
+
+        condition_ids = scaler.get_condition_ids(conditions)
+
+        npt.assert_equal(condition_ids, [1, 1, -1, 0, 0, 0, -1, 2, -1, -1, -1])
+
+    @pytest.mark.parametrize(
+        "base_scaler",
+        [
+            scalers.StandardScaler(),
+            scalers.MinMaxScaler(feature_range=(-1, 1), clip=True),
+            scalers.MaxAbsScaler(),
+            _CustomScaler(),
+        ],
+    )
+    def test_transform_like_base_scalers(self, conditioned_inputs, base_scaler):
+        features, conditions, boundaries = conditioned_inputs
+        features = [f + np.random.randn(*f.shape) for f in features]
+        scaler = scaling.OperationConditionAwareScaler(base_scaler, boundaries)
+        for f, c in zip(features, conditions):
+            scaler.partial_fit(f, c)
+        order = np.random.permutation(30)
+        mixed_features = np.concatenate(features)[order]
+        mixed_conditions = np.concatenate(conditions)[order]
+
+        scaled = scaler.transform(mixed_features, mixed_conditions)
+
+        expected = np.concatenate(
+            [s.transform(f) for s, f in zip(scaler.base_scalers, features)]
+        )
+        npt.assert_almost_equal(scaled, expected[order])
+
+    def test_condition_ids_instead_of_conditions(self, conditioned_inputs):
+        features, conditions, boundaries = conditioned_inputs
+        features, conditions = np.concatenate(features), np.concatenate(conditions)
+        scaler = scaling.OperationConditionAwareScaler(
+            scalers.StandardScaler(), boundaries
+        )
+        condition_ids = scaler.get_condition_ids(conditions)
+
+        scaler.partial_fit(features, condition_ids=condition_ids)
+        scaled = scaler.transform(features, condition_ids=condition_ids)
+
+        npt.assert_equal(scaled, scaler.transform(features, conditions))
+        with pytest.raises(ValueError):
+            scaler.transform(features)
+
+    @pytest.mark.parametrize(
+        "base_scaler",
+        [scalers.StandardScaler(), scalers.MinMaxScaler(), _CustomScaler()],
+    )
+    def test_transform_single_fitted_condition(self, conditioned_inputs, base_scaler):
+        features, conditions, boundaries = conditioned_inputs
+        scaler = scaling.OperationConditionAwareScaler(base_scaler, boundaries)
+        scaler.partial_fit(features[1], conditions[1])
+
+        scaled = scaler.transform(features[1], conditions[1])
+
+        assert scaler.n_features_in_ == 5
+        npt.assert_almost_equal(scaled, scaler.base_scalers[1].transform(features[1]))
+        with pytest.raises(NotFittedError):
+            scaler.transform(features[0], conditions[0])
+
     def test_transform_unknown_condition(self, fitted_conditioned_scaler):
         num_conditions = len(fitted_conditioned_scaler.boundaries)
         conditions = np.random.choice(range(1, num_conditions + 1), 100)
@@ -120,9 +194,88 @@ def test_fit_condition_aware_scaler():
     out_scaler = scaling.fit_scaler(features, scaler, operation_conditions)
 
     assert scaler is out_scaler
-    scaler.partial_fit.assert_has_calls(
-        [mock.call(f, c) for f, c in zip(features, operation_conditions)]
-    )
+    scaler.partial_fit.assert_called_once()
+    values, conditions = scaler.partial_fit.call_args.args
+    npt.assert_equal(values, np.concatenate(features))
+    npt.assert_equal(conditions, np.concatenate(operation_conditions))
+
+
+@pytest.fixture()
+def runs_with_statistics():
+    runs = [np.random.randn(n, 4, 3) * 3 + 2 for n in [10, 0, 50, 7]]
+    runs[2][:, :, 1] = 5.0  # constant channel in one run
+    statistics = scaling.compute_statistics(runs)
+
+    return runs, statistics
+
+
+def test_run_statistics(runs_with_statistics):
+    runs, statistics = runs_with_statistics
+    merged = statistics[0]
+    for stats in statistics[1:]:
+        merged = merged.merge(stats)
+
+    all_values = np.concatenate(runs).reshape(-1, 3)
+    assert merged.count == len(all_values)
+    npt.assert_almost_equal(merged.mean, all_values.mean(0))
+    npt.assert_almost_equal(merged.m2, all_values.var(0) * len(all_values))
+    npt.assert_equal(merged.min, all_values.min(0))
+    npt.assert_equal(merged.max, all_values.max(0))
+
+
+@pytest.mark.parametrize(
+    "scaler_factory",
+    [
+        scalers.StandardScaler,
+        lambda: scalers.StandardScaler(with_mean=False),
+        lambda: scalers.StandardScaler(with_std=False),
+        lambda: scalers.MinMaxScaler(feature_range=(-1, 1)),
+        scalers.MaxAbsScaler,
+    ],
+)
+def test_fit_scaler_from_statistics(runs_with_statistics, scaler_factory):
+    runs, statistics = runs_with_statistics
+    expected = scaling.fit_scaler([r for r in runs if len(r)], scaler_factory())
+
+    scaler = scaling.fit_scaler_from_statistics(statistics, scaler_factory())
+
+    check_is_fitted(scaler)
+    assert scaler.n_features_in_ == expected.n_features_in_
+    assert scaler.n_samples_seen_ == expected.n_samples_seen_
+    features = np.random.randn(100, 3) * 3 + 2
+    npt.assert_almost_equal(scaler.transform(features), expected.transform(features))
+
+
+def test_fit_scaler_from_statistics_default(runs_with_statistics):
+    _, statistics = runs_with_statistics
+
+    scaler = scaling.fit_scaler_from_statistics(statistics)
+
+    assert isinstance(scaler, scalers.StandardScaler)
+
+
+def test_fit_scaler_from_statistics_invalid(runs_with_statistics):
+    _, statistics = runs_with_statistics
+    with pytest.raises(ValueError):
+        scaling.fit_scaler_from_statistics(statistics, scalers.RobustScaler())
+    with pytest.raises(ValueError):
+        scaling.fit_scaler_from_statistics([])
+    with pytest.raises(ValueError):
+        scaling.fit_scaler_from_statistics(statistics[1:2])
+
+
+def test_save_load_statistics(tmp_path, runs_with_statistics):
+    _, statistics = runs_with_statistics
+    save_path = os.path.join(tmp_path, "stats.npz")
+
+    scaling.save_statistics(statistics, save_path)
+    loaded = scaling.load_statistics(save_path)
+
+    assert len(loaded) == len(statistics)
+    for loaded_stats, stats in zip(loaded, statistics):
+        assert loaded_stats.count == stats.count
+        for attr in ["mean", "m2", "min", "max"]:
+            npt.assert_equal(getattr(loaded_stats, attr), getattr(stats, attr))
 
 
 def test_save_load_scaler(tmp_path, fitted_scaler):
@@ -165,7 +318,9 @@ def test_scale_features(feature_shape, fitted_scaler):
     ],
 )
 def test_scale_features_condition_aware(feature_shape, fitted_conditioned_scaler):
-    fitted_conditioned_scaler.transform = mock.MagicMock(name="transform")
+    fitted_conditioned_scaler.transform = mock.MagicMock(
+        name="transform", side_effect=lambda f, c: f * 2
+    )
     features = [np.random.randn(*feature_shape)]
     operation_condition = [np.ones(feature_shape[0])]
 
@@ -173,8 +328,133 @@ def test_scale_features_condition_aware(feature_shape, fitted_conditioned_scaler
         features, fitted_conditioned_scaler, operation_condition
     )
 
-    fitted_conditioned_scaler.transform.assert_called_with(
-        features[0], operation_condition[0]
-    )
+    fitted_conditioned_scaler.transform.assert_called_once()
+    called_features, called_conditions = fitted_conditioned_scaler.transform.call_args[
+        0
+    ]
+    npt.assert_equal(features[0], called_features)
+    npt.assert_equal(operation_condition[0], called_conditions)
     assert isinstance(scaled, list)
-    assert scaled[0] is fitted_conditioned_scaler.transform()
+    npt.assert_equal(features[0] * 2, scaled[0])
+
+
+@pytest.mark.parametrize("feature_shape", [(5,), (2, 5)])
+@pytest.mark.parametrize(
+    "scaler_factory",
+    [
+        scalers.StandardScaler,
+        lambda: scalers.StandardScaler(with_mean=False),
+        lambda: scalers.StandardScaler(with_mean=False, with_std=False),
+        lambda: scalers.MinMaxScaler(feature_range=(-1, 1), clip=True),
+        scalers.MaxAbsScaler,
+        scalers.RobustScaler,
+        lambda: scalers.RobustScaler(with_centering=False),
+    ],
+)
+def test_scale_features_like_transform(feature_shape, scaler_factory):
+    scaler = scaler_factory().fit(np.random.randn(1000, 5) * 2 + 1)
+    features = [np.random.randn(length, *feature_shape) * 3 for length in [10, 0, 20]]
+    expected = [
+        scaler.transform(f.reshape(-1, 5)).reshape(f.shape) if len(f) else f
+        for f in features
+    ]
+    scaler.transform = mock.MagicMock(side_effect=AssertionError)
+
+    scaled = scaling.scale_features(features, scaler)
+
+    assert isinstance(scaled, list)
+    for expected_run, scaled_run in zip(expected, scaled):
+        npt.assert_equal(expected_run, scaled_run)
+
+
+@pytest.mark.parametrize("feature_shape", [(5,), (2, 5)])
+def test_scale_features_unknown_scaler_single_call(feature_shape):
+    scaler = _CustomScaler().fit(np.random.randn(1000, 5))
+    features = [np.random.randn(length, *feature_shape) for length in [10, 0, 20]]
+    expected = [(f - scaler.mean_) / scaler.scale_ for f in features]
+    scaler.transform = mock.MagicMock(wraps=scaler.transform)
+
+    scaled = scaling.scale_features(features, scaler)
+
+    scaler.transform.assert_called_once()
+    for expected_run, scaled_run in zip(expected, scaled):
+        npt.assert_almost_equal(expected_run, scaled_run)
+
+
+@pytest.mark.parametrize("ragged", [True, False])
+def test_scale_features_inplace(fitted_scaler, ragged):
+    features = [np.random.randn(length, 2, 5) for length in [10, 20]]
+    expected = scaling.scale_features(features, fitted_scaler)
+    if ragged:
+        features = utils.RaggedArray.from_list(features)
+    buffers = [f.copy() for f in features]
+
+    scaled = scaling.scale_features(features, fitted_scaler, inplace=True)
+
+    assert scaled is features
+    for expected_run, scaled_run, buffer in zip(expected, scaled, buffers):
+        npt.assert_equal(expected_run, scaled_run)
+        assert not np.array_equal(buffer, scaled_run)
+
+
+@pytest.mark.parametrize("ragged", [True, False])
+def test_scale_features_dtype(fitted_scaler, ragged):
+    features = [np.random.randn(length, 5) for length in [10, 20]]
+    expected = scaling.scale_features(features, fitted_scaler)
+    if ragged:
+        features = utils.RaggedArray.from_list(features)
+
+    scaled = scaling.scale_features(features, fitted_scaler, dtype=np.float32)
+
+    for expected_run, scaled_run in zip(expected, scaled):
+        assert scaled_run.dtype == np.float32
+        npt.assert_almost_equal(expected_run, scaled_run, decimal=5)
+
+
+@pytest.mark.parametrize("inplace", [True, False])
+def test_scale_features_non_finite(fitted_scaler, fitted_conditioned_scaler, inplace):
+    features = np.random.randn(10, 5)
+    features[3, 2] = np.nan
+    scaled = scaling.scale_features([features.copy()], fitted_scaler, inplace=inplace)
+    npt.assert_equal(fitted_scaler.transform(features), scaled[0])  # NaNs are kept
+
+    features[5, 1] = np.inf
+    with pytest.raises(ValueError):
+        scaling.scale_features([features], fitted_scaler, inplace=inplace)
+    with pytest.raises(ValueError):
+        fitted_conditioned_scaler.transform(features, np.ones(10))
+
+
+def test_scale_features_inplace_invalid(fitted_scaler):
+    read_only = np.random.randn(10, 5)
+    read_only.flags.writeable = False
+    ragged = utils.RaggedArray.from_list([np.random.randn(10, 5)])
+    index_view = ragged.compress(np.arange(10) % 2 == 0)
+    with pytest.raises(ValueError):
+        scaling.scale_features([read_only], fitted_scaler, inplace=True)
+    with pytest.raises(ValueError):
+        scaling.scale_features(ragged, fitted_scaler, inplace=True, dtype=np.float32)
+    with pytest.raises(ValueError):
+        scaling.scale_features(index_view, fitted_scaler, inplace=True)
+
+
+def test_scale_features_ragged(fitted_scaler):
+    features = [np.random.randn(length, 5) for length in [10, 20]]
+    ragged = utils.RaggedArray.from_list(features)
+
+    scaled = scaling.scale_features(ragged, fitted_scaler)
+
+    assert isinstance(scaled, utils.RaggedArray)
+    npt.assert_equal(ragged.offsets, scaled.offsets)
+    for run, scaled_run in zip(scaling.scale_features(features, fitted_scaler), scaled):
+        npt.assert_almost_equal(run, scaled_run)
+
+
+def test_fit_scaler_ragged():
+    features = [np.random.randn(length, 5) for length in [10, 20]]
+    ragged = utils.RaggedArray.from_list(features)
+
+    scaler = scaling.fit_scaler(ragged)
+
+    npt.assert_almost_equal(np.concatenate(features).mean(0), scaler.mean_)
+    npt.assert_almost_equal(np.concatenate(features).var(0), scaler.var_)
@@ -0,0 +1,126 @@
+import importlib
+import os
+
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from rul_datasets.reader import split_cache, DummyReader
+from rul_datasets.reader.data_root import get_data_root, set_data_root
+
+
+@pytest.fixture()
+def tmp_data_root(tmp_path):
+    old_data_root = get_data_root()
+    set_data_root(str(tmp_path))
+    yield tmp_path
+    set_data_root(old_data_root)
+
+
+@pytest.fixture()
+def enabled_cache(tmp_data_root):
+    split_cache.enable_split_cache()
+    yield tmp_data_root / "splits"
+    split_cache.disable_split_cache()
+
+
+def test_disabled_by_default(tmp_data_root):
+    assert not split_cache.is_split_cache_enabled()
+
+    DummyReader(1).load_split("dev")
+
+    assert not os.path.exists(tmp_data_root / "splits")
+
+
+def test_env_var_enables_cache(monkeypatch):
+    monkeypatch.setenv("RUL_DATASETS_SPLIT_CACHE", "1")
+    importlib.reload(split_cache)
+    assert split_cache.is_split_cache_enabled()
+
+    monkeypatch.delenv("RUL_DATASETS_SPLIT_CACHE")
+    importlib.reload(split_cache)
+    assert not split_cache.is_split_cache_enabled()
+
+
+@pytest.mark.parametrize("split", ["dev", "val", "test"])
+def test_cached_split_identical(enabled_cache, mocker, split):
+    reader = DummyReader(1, percent_broken=0.5)
+    features, targets = reader.load_split(split)
+    assert len(os.listdir(enabled_cache)) == 1
+
+    spy_load_complete = mocker.spy(DummyReader, "load_complete_split")
+    cached_features, cached_targets = reader.load_split(split)
+
+    spy_load_complete.assert_not_called()
+    assert len(cached_features) == len(features)
+    for feat, cached_feat in zip(features, cached_features):
+        assert isinstance(cached_feat, np.memmap)
+        npt.assert_equal(feat, cached_feat)
+    for targ, cached_targ in zip(targets, cached_targets):
+        npt.assert_equal(targ, cached_targ)
+
+
+def test_cache_keyed_by_config(enabled_cache):
+    DummyReader(1).load_split("dev")
+    DummyReader(1).load_split("dev")  # hit
+    DummyReader(1).load_split("dev", alias="test")
+    DummyReader(1).load_split("val")
+    DummyReader(2).load_split("dev")
+    DummyReader(1, percent_broken=0.5).load_split("dev")
+    DummyReader(1, window_size=5).load_split("dev")
+
+    assert len(os.listdir(enabled_cache)) == 6
+
+
+def test_cache_keyed_by_artifacts(enabled_cache, tmp_data_root, mocker):
+    artifact = tmp_data_root / "artifact.txt"
+    artifact.write_text("foo")
+    reader = DummyReader(1)
+    mocker.patch.object(reader, "_get_artifact_paths", return_value=[str(artifact)])
+    key = split_cache.get_cache_key(reader, "dev", "dev")
+
+    os.utime(artifact, ns=(0, 0))
+
+    assert not key == split_cache.get_cache_key(reader, "dev", "dev")
+
+
+def test_cache_keyed_by_array_content():
+    reader, other_reader = DummyReader(1), DummyReader(1)
+    reader.weights = np.zeros(2000)
+    other_reader.weights = np.zeros(2000)
+    key = split_cache.get_cache_key(reader, "dev", "dev")
+    assert key == split_cache.get_cache_key(other_reader, "dev", "dev")
+
+    other_reader.weights[1000] = 1.0  # not part of the truncated repr
+
+    assert repr(reader.weights) == repr(other_reader.weights)
+    assert not key == split_cache.get_cache_key(other_reader, "dev", "dev")
+
+
+def test_cache_key_of_functions():
+    reader = DummyReader(1)
+    reader.transform = np.log
+    key = split_cache.get_cache_key(reader, "dev", "dev")
+
+    reader.transform = test_cache_key_of_functions
+
+    assert not key == split_cache.get_cache_key(reader, "dev", "dev")
+    content = split_cache._to_key_content(test_cache_key_of_functions)
+    assert content == f"{__name__}.test_cache_key_of_functions"
+
+
+def test_cache_key_rejects_memory_addresses():
+    reader = DummyReader(1)
+    reader.transform = object()
+
+    with pytest.raises(ValueError):
+        split_cache.get_cache_key(reader, "dev", "dev")
+
+
+def test_ignores_concurrently_written_entry(enabled_cache):
+    reader = DummyReader(1)
+    features, targets = reader.load_split("dev")
+
+    split_cache.save_split(reader, "dev", "dev", features, targets)
+
+    assert len(os.listdir(enabled_cache)) == 1
@@ -2,6 +2,7 @@ import numpy as np
 import numpy.testing as npt
 import pytest
 
+from rul_datasets import utils
 from rul_datasets.reader import truncating
 
 
@@ -70,3 +71,33 @@ def test_percent_broken_degraded_only():
 
     assert len(trunc_features[0]) == 75
     assert len(trunc_targets[0]) == 75
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"percent_broken": 0.5},
+        {"percent_broken": 0.5, "degraded_only": True},
+        {"included_runs": 0.5},
+        {"included_runs": [5, 1, 8]},
+        {"percent_broken": 0.3, "included_runs": [5, 1, 8]},
+    ],
+)
+def test_ragged_index_views(rul_data, kwargs):
+    features, targets = rul_data
+    ragged_features = utils.RaggedArray.from_list(features)
+    ragged_targets = utils.RaggedArray.from_list(targets)
+
+    expected = truncating.truncate_runs(features, targets, **kwargs)
+    truncated = truncating.truncate_runs(ragged_features, ragged_targets, **kwargs)
+
+    for ragged, runs, expected_runs in zip(
+        truncated, [ragged_features, ragged_targets], expected
+    ):
+        assert isinstance(ragged, utils.RaggedArray)
+        assert ragged.values is runs.values or np.shares_memory(
+            ragged.values, runs.values
+        )
+        assert len(expected_runs) == len(ragged)
+        for expected_run, run in zip(expected_runs, ragged):
+            npt.assert_equal(expected_run, run)
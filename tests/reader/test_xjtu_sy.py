@@ -2,6 +2,7 @@ import numpy as np
 import pytest
 import torch
 from numpy import testing as npt
+from sklearn.preprocessing import StandardScaler
 
 from rul_datasets import reader
 from rul_datasets.reader.xjtu_sy import _download_xjtu_sy
@@ -14,6 +15,28 @@ def test_additional_hparams():
     assert femto.hparams["run_split_dist"] is None
 
 
+@pytest.mark.parametrize("dtype", [None, "float32"])
+def test_features_scaled_in_place(mocker, dtype):
+    reader_ = reader.XjtuSyReader(1, window_size=10, dtype=dtype)
+    features = [np.random.randn(n, 20, 2) * 2 + 1 for n in [5, 8]]
+    targets = [np.arange(n, 0, -1, dtype=float) for n in [5, 8]]
+    scaler = StandardScaler().fit(np.concatenate(features).reshape(-1, 2))
+    mocker.patch.object(
+        reader_._preparator, "load_runs", return_value=(features, targets)
+    )
+    mocker.patch.object(reader_._preparator, "load_scaler", return_value=scaler)
+    expected = [scaler.transform(f[:, -10:].reshape(-1, 2)) for f in features]
+
+    scaled, _ = reader_.load_complete_split("dev", "dev")
+
+    assert reader_.hparams["dtype"] == dtype
+    for feat, scaled_feat, exp_feat in zip(features, scaled, expected):
+        assert scaled_feat.shape == (len(feat), 10, 2)
+        assert scaled_feat.dtype == np.dtype(dtype or np.float64)
+        assert np.shares_memory(feat, scaled_feat) == (dtype is None)
+        npt.assert_almost_equal(exp_feat, scaled_feat.reshape(-1, 2), decimal=5)
+
+
 @pytest.mark.needs_data
 class TestXjtuSyLoader:
     NUM_CHANNELS = 2
@@ -34,10 +34,13 @@ class PretrainingDataModuleTemplate:
 
     def _check_paired_shapes(self, data):
         for anchors, queries, distances, domain_labels in data:
-            self.assertEqual(torch.Size((14, self.window_size)), anchors.shape)
-            self.assertEqual(torch.Size((14, self.window_size)), queries.shape)
-            self.assertEqual(torch.Size(()), distances.shape)
-            self.assertEqual(torch.Size(()), domain_labels.shape)
+            batch_size = anchors.shape[0]
+            self.assertLessEqual(batch_size, data.batch_size)
+            expected_shape = torch.Size((batch_size, 14, self.window_size))
+            self.assertEqual(expected_shape, anchors.shape)
+            self.assertEqual(expected_shape, queries.shape)
+            self.assertEqual(torch.Size((batch_size,)), distances.shape)
+            self.assertEqual(torch.Size((batch_size,)), domain_labels.shape)
 
     def _check_tensor_dataset(self, data):
         self.assertIsInstance(data, RulDataset)
@@ -76,20 +79,21 @@ class PretrainingDataModuleTemplate:
                 self.assertEqual(0.0, torch.dist(one, another))
 
     def _run_epoch(self, loader):
-        anchors = torch.empty((len(loader.dataset), 14, self.window_size))
-        queries = torch.empty((len(loader.dataset), 14, self.window_size))
-        distances = torch.empty(len(loader.dataset))
-        domain_labels = torch.empty(len(loader.dataset))
+        num_samples = loader.dataset.num_samples
+        anchors = torch.empty((num_samples, 14, self.window_size))
+        queries = torch.empty((num_samples, 14, self.window_size))
+        distances = torch.empty(num_samples)
+        domain_labels = torch.empty(num_samples)
 
         start = 0
-        end = loader.batch_size
         for anchor, query, dist, domain in loader:
+            end = start + anchor.shape[0]
             anchors[start:end] = anchor
             queries[start:end] = query
             distances[start:end] = dist
             domain_labels[start:end] = domain
             start = end
-            end += anchor.shape[0]
+        self.assertEqual(num_samples, start)
 
         return anchors, queries, distances, domain_labels
 
@@ -107,10 +111,21 @@ class PretrainingDataModuleTemplate:
         train_loader = self.dataset.train_dataloader()
 
         mock_get_paired_dataset.assert_called_with("dev")
-        self.assertEqual(self.dataset.batch_size, train_loader.batch_size)
+        self.assertIsNone(train_loader.batch_size)  # batched by the dataset
+        self.assertEqual(self.dataset.batch_size, train_loader.dataset.batch_size)
         self.assertFalse(train_loader.dataset.deterministic)
         self.assertTrue(train_loader.pin_memory)
 
+    def test_val_pairs_reused(self):
+        paired_val = self.dataset.val_dataloader()[0].dataset
+        self.assertIs(paired_val, self.dataset.val_dataloader()[0].dataset)
+        self.assertIsNot(
+            self.dataset.train_dataloader().dataset,
+            self.dataset.train_dataloader().dataset,
+        )
+        self.dataset.setup()
+        self.assertIsNot(paired_val, self.dataset.val_dataloader()[0].dataset)
+
     def test_val_dataloader(self):
         mock_get_paired_dataset = mock.MagicMock(
             name="_get_paired_dataset", wraps=self.dataset._get_paired_dataset
@@ -120,6 +135,9 @@ class PretrainingDataModuleTemplate:
 
         mock_get_paired_dataset.assert_called_with("val")
         self.assertTrue(val_loaders[0].dataset.deterministic)
-        for val_loader in val_loaders:
+        self.assertIsNone(val_loaders[0].batch_size)  # batched by the dataset
+        self.assertEqual(self.dataset.batch_size, val_loaders[0].dataset.batch_size)
+        for val_loader in val_loaders[1:]:
             self.assertEqual(self.dataset.batch_size, val_loader.batch_size)
+        for val_loader in val_loaders:
             self.assertTrue(val_loader.pin_memory)
@@ -3,12 +3,13 @@ import warnings
 from unittest import mock
 
 import numpy as np
+import numpy.testing as npt
 import pytest
 import torch
-from torch.utils.data import RandomSampler, TensorDataset
+from torch.utils.data import ConcatDataset, DataLoader, RandomSampler, TensorDataset
 
 import rul_datasets
-from rul_datasets import adaption, core, CmapssReader
+from rul_datasets import adaption, core, utils, CmapssReader
 from rul_datasets.reader import DummyReader
 from tests.templates import PretrainingDataModuleTemplate
 
@@ -365,6 +366,75 @@ class TestAdaptionDataset:
             assert i == source.item()
             assert i == labels.item()
 
+    def test_seed_reproducible(self, labeled, unlabeled):
+        one = adaption.AdaptionDataset(labeled, *unlabeled, seed=7)
+        another = adaption.AdaptionDataset(labeled, *unlabeled, seed=7)
+        for i in range(len(one)):
+            assert one[i] == another[i]
+
+    def test_workers_draw_different_targets(self, labeled, unlabeled):
+        dataset = adaption.AdaptionDataset(labeled, *unlabeled)
+        loader = DataLoader(dataset, batch_size=50, num_workers=2)
+        (_, _, *targets_one), (_, _, *targets_another) = list(loader)
+        for one, another in zip(targets_one, targets_another):
+            assert not torch.equal(one, another)
+
+    @pytest.mark.parametrize("seed", [None, 7])
+    def test_workers_reproducible(self, seed, labeled, unlabeled):
+        dataset = adaption.AdaptionDataset(labeled, *unlabeled, seed=seed)
+        loader = DataLoader(dataset, batch_size=10, num_workers=2)
+        torch.manual_seed(42)
+        one = list(loader)
+        torch.manual_seed(42)
+        another = list(loader)
+        for batch_one, batch_another in zip(one, another):
+            for tensor_one, tensor_another in zip(batch_one, batch_another):
+                assert torch.equal(tensor_one, tensor_another)
+
+    def test_getitems_like_getitem(self, labeled, unlabeled):
+        dataset = adaption.AdaptionDataset(labeled, *unlabeled, deterministic=True)
+        indices = [5, 0, 99, 5, 42]
+        batch = dataset.__getitems__(indices)
+        assert len(batch) == len(indices)
+        for idx, sample in zip(indices, batch):
+            assert len(sample) == len(dataset[idx])
+            for actual, expected in zip(sample, dataset[idx]):
+                assert actual == expected
+
+    def test_getitems_draws_in_range(self, dataset, unlabeled):
+        batch = dataset.__getitems__(list(range(len(dataset))))
+        for source, labels, *targets in batch:
+            assert source == labels
+            for target, ul in zip(targets, unlabeled):
+                assert 0 <= target.item() < len(ul)
+
+    def test_getitems_rul_datasets(self):
+        labeled = core.RulDataset(
+            [np.random.randn(10, 5, 3), np.random.randn(5, 5, 3)],
+            [np.arange(10.0), np.arange(5.0)],
+        )
+        unlabeled = ConcatDataset(
+            [
+                core.RulDataset([np.random.randn(4, 5, 3)], [np.zeros(4)]),
+                TensorDataset(torch.randn(3, 3, 5), torch.zeros(3)),
+            ]
+        )
+        dataset = adaption.AdaptionDataset(labeled, unlabeled, deterministic=True)
+        indices = list(range(len(dataset)))
+        for sample, idx in zip(dataset.__getitems__(indices), indices):
+            for actual, expected in zip(sample, dataset[idx]):
+                assert torch.equal(actual, expected)
+
+    def test_dataloader_uses_getitems(self, dataset):
+        loader = DataLoader(dataset, batch_size=16)
+        with mock.patch.object(
+            adaption.AdaptionDataset, "__getitem__", side_effect=AssertionError
+        ) as mock_getitem:
+            source, labels, *targets = next(iter(loader))
+        mock_getitem.assert_not_called()
+        assert source.shape == (16,)
+        assert len(targets) == len(dataset.unlabeled)
+
 
 @mock.patch(
     "rul_datasets.adaption.split_healthy",
@@ -375,9 +445,9 @@ def test_latent_align_data_module(mock_split_healthy, by_max_rul, by_steps):
     source = mock.MagicMock(core.RulDataModule)
     source.batch_size = 32
     source.reader.window_size = 30
-    source.data = {"dev": ([torch.zeros(1)],) * 2}
+    source._data = {"dev": ([torch.zeros(1)],) * 2}
     target = mock.MagicMock(core.RulDataModule)
-    target.data = {"dev": ([torch.ones(1)],) * 2}
+    target._data = {"dev": ([torch.ones(1)],) * 2}
 
     dm = adaption.LatentAlignDataModule(
         source, target, split_by_max_rul=by_max_rul, split_by_steps=by_steps
@@ -388,13 +458,13 @@ def test_latent_align_data_module(mock_split_healthy, by_max_rul, by_steps):
     mock_split_healthy.assert_has_calls(
         [
             mock.call(
-                source.data["dev"][0],
-                source.data["dev"][1],
+                source._data["dev"][0],
+                source._data["dev"][1],
                 by_max_rul=True,
             ),
             mock.call(
-                target.data["dev"][0],
-                target.data["dev"][1],
+                target._data["dev"][0],
+                target._data["dev"][1],
                 by_max_rul,
                 by_steps,
             ),
@@ -411,16 +481,18 @@ def test_latent_align_data_module_inductive(_, inductive, mocker):
     source = mocker.MagicMock(core.RulDataModule)
     source.batch_size = 32
     source.reader.window_size = 30
-    source.data.__getitem__.return_value = (
+    source._data = mocker.MagicMock()
+    source._data.__getitem__.return_value = (
         mock.sentinel.source_features,
         mocker.sentinel.source_targets,
     )
     target = mocker.MagicMock(core.RulDataModule)
-    target.load_split.return_value = (
+    target._load_split.return_value = (
         mock.sentinel.target_features,
         mocker.sentinel.target_targets,
     )
-    target.data.__getitem__.return_value = (
+    target._data = mocker.MagicMock()
+    target._data.__getitem__.return_value = (
         mock.sentinel.target_features,
         mocker.sentinel.target_targets,
     )
@@ -431,12 +503,12 @@ def test_latent_align_data_module_inductive(_, inductive, mocker):
 
     dm.train_dataloader()
 
-    source.data.__getitem__.assert_called_once_with("dev")
+    source._data.__getitem__.assert_called_once_with("dev")
     if inductive:
         # data should only be reloaded if necessary
-        target.load_split.assert_called_once_with("test", alias="dev")
+        target._load_split.assert_called_once_with("test", alias="dev")
     else:
-        target.data.__getitem__.assert_called_once_with("dev")
+        target._data.__getitem__.assert_called_once_with("dev")
 
 
 def test_latent_align_with_dummy():
@@ -453,6 +525,23 @@ def test_latent_align_with_dummy():
         assert len(batch) == 6
 
 
+def test_latent_align_splits_ragged_runs(mocker):
+    spy_split_ragged = mocker.spy(adaption, "_split_healthy_ragged")
+    source = DummyReader(1)
+    target = source.get_compatible(2, percent_broken=0.8)
+    dm = adaption.LatentAlignDataModule(
+        core.RulDataModule(source, 32),
+        core.RulDataModule(target, 32),
+        split_by_max_rul=True,
+    )
+    dm.setup()
+
+    dataset = dm.train_dataloader().dataset
+
+    assert spy_split_ragged.call_count == 2
+    assert isinstance(dataset.labeled.features, utils.RaggedArray)
+
+
 @pytest.mark.parametrize(["by_max_rul", "by_steps"], [(True, None), (False, 6)])
 def test_split_healthy(by_max_rul, by_steps):
     features = [np.random.randn(11, 100, 2)]
@@ -480,3 +569,23 @@ def test_split_healthy_no_degraded(by_steps, by_max_rul):
 
     assert len(healthy) == 11
     assert len(degraded) == 0
+
+
+@pytest.mark.parametrize(["by_max_rul", "by_steps"], [(True, None), (False, 6)])
+def test_split_healthy_ragged(by_max_rul, by_steps):
+    features = [np.random.randn(n, 100, 2) for n in [11, 4, 20]]
+    targets = [np.minimum(np.arange(n)[::-1], 5) for n in [11, 4, 20]]
+    ragged_features = utils.RaggedArray.from_list(features)
+    ragged_targets = utils.RaggedArray.from_list(targets)
+
+    expected = adaption.split_healthy(features, targets, by_max_rul, by_steps)
+    split = adaption.split_healthy(
+        ragged_features, ragged_targets, by_max_rul, by_steps
+    )
+
+    for expected_dataset, dataset in zip(expected, split):
+        assert dataset.features.values is ragged_features.values  # no copy
+        assert len(expected_dataset) == len(dataset)
+        indices = np.arange(len(dataset))
+        for expected_tensor, tensor in zip(expected_dataset[indices], dataset[indices]):
+            npt.assert_equal(expected_tensor.numpy(), tensor.numpy())
@@ -45,6 +45,15 @@ class TestBaselineDataModule:
                 assert dataset.subsets[fd].reader.percent_fail_runs is None
                 assert dataset.subsets[fd].reader.percent_broken is None
 
+    def test_subsets_inherit_workers(self, mock_reader):
+        base_module = rul_datasets.RulDataModule(
+            mock_reader, batch_size=16, num_workers=2, prefetch_factor=4
+        )
+        dataset = rul_datasets.BaselineDataModule(base_module)
+
+        for subset in dataset.subsets.values():
+            assert subset.dataloader_kwargs == base_module.dataloader_kwargs
+
     def test_selected_source_on_train(self, dataset, mocker):
         mocker.patch.object(
             dataset.data_module, "train_dataloader", return_value=mocker.sentinel.dl
@@ -1,4 +1,9 @@
 import copy
+import functools
+import gc
+import os
+import subprocess
+import sys
 import unittest
 from dataclasses import dataclass
 from unittest import mock
@@ -7,9 +12,20 @@ import numpy as np
 import numpy.testing as npt
 import pytest
 import torch
-from torch.utils.data import DataLoader, RandomSampler, SequentialSampler, TensorDataset
+from pytorch_lightning.utilities.data import _update_dataloader
+from torch.utils.data import (
+    DataLoader,
+    DistributedSampler,
+    RandomSampler,
+    SequentialSampler,
+    Subset,
+    TensorDataset,
+)
+from torch.utils.data.dataloader import default_collate
 
 from rul_datasets import core, reader, RulDataModule, utils
+from rul_datasets.reader.data_root import get_data_root, set_data_root
+from rul_datasets.reader import registry
 
 
 @pytest.fixture()
@@ -17,6 +33,14 @@ def mock_runs():
     return [np.zeros((1, 1, 1))], [np.zeros(1)]
 
 
+@pytest.fixture()
+def tmp_data_root(tmp_path):
+    old_data_root = get_data_root()
+    set_data_root(str(tmp_path))
+    yield tmp_path
+    set_data_root(old_data_root)
+
+
 @pytest.fixture()
 def mock_loader(mock_runs):
     mock_reader = mock.MagicMock(reader.AbstractReader)
@@ -79,7 +103,12 @@ class TestRulDataModule:
         mock_loader.load_split.assert_has_calls(
             [mock.call("dev", None), mock.call("val", None), mock.call("test", None)]
         )
-        assert dataset._data == {"dev": mock_runs, "val": mock_runs, "test": mock_runs}
+        assert {"dev", "val", "test"} == set(dataset._data)
+        for features, targets in dataset._data.values():
+            for run, expected_run in zip(features, mock_runs[0]):
+                npt.assert_equal(expected_run, run)
+            for run, expected_run in zip(targets, mock_runs[1]):
+                npt.assert_equal(expected_run, run)
 
     @pytest.mark.parametrize("split", ["dev", "val", "test"])
     def test_load_split_degraded_only(self, mock_loader, mocker, split):
@@ -162,6 +191,121 @@ class TestRulDataModule:
         assert isinstance(dataloader.sampler, SequentialSampler)
         assert dataloader.pin_memory
 
+    def test_dataloader_fetches_whole_batches(self, mock_loader, mocker):
+        dm = core.RulDataModule(mock_loader, batch_size=4)
+        dm.setup()
+        dataset = dm.to_dataset("val")
+        spy_default_collate = mocker.spy(core, "default_collate")
+
+        batches = list(dm.val_dataloader())
+
+        spy_default_collate.assert_not_called()  # no per-sample collation
+        features = torch.cat([features for features, _ in batches])
+        targets = torch.cat([targets for _, targets in batches])
+        assert len(batches) == -(-len(dataset) // 4)
+        for i in range(len(dataset)):
+            assert torch.equal(dataset[i][0], features[i])
+            assert torch.equal(dataset[i][1], targets[i])
+
+    @pytest.mark.parametrize("resident", [True, False])
+    def test_dataloader_distributed_sampler(self, resident):
+        dm = core.RulDataModule(reader.DummyReader(1), 16, resident=resident)
+        dm.setup()
+        dataset = dm.to_dataset("val")
+
+        for rank in range(2):
+            sampler = DistributedSampler(dataset, 2, rank, shuffle=False)
+            loader = _update_dataloader(dm.val_dataloader(), sampler)
+            features, targets = (torch.cat(b) for b in zip(*loader))
+
+            assert loader.batch_size == 16
+            assert loader.sampler is sampler
+            expected = dataset[list(sampler)]
+            assert torch.equal(expected[0], features)
+            assert torch.equal(expected[1], targets)
+
+    @pytest.mark.parametrize(
+        "loader_func", ["train_dataloader", "val_dataloader", "test_dataloader"]
+    )
+    def test_dataloader_workers(self, mock_loader, loader_func):
+        dataset = core.RulDataModule(
+            mock_loader,
+            batch_size=16,
+            num_workers=2,
+            persistent_workers=True,
+            prefetch_factor=4,
+        )
+        dataset.setup()
+        dataloader = getattr(dataset, loader_func)()
+
+        assert 2 == dataloader.num_workers
+        assert dataloader.persistent_workers
+        assert 4 == dataloader.prefetch_factor
+
+    def test_dataloader_kwargs_default_prefetch(self, mock_loader):
+        dataset = core.RulDataModule(mock_loader, batch_size=16, num_workers=2)
+
+        kwargs = dataset.dataloader_kwargs
+
+        assert kwargs == {"num_workers": 2, "persistent_workers": False}
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"num_workers": -1},
+            {"persistent_workers": True},
+            {"prefetch_factor": 2},
+        ],
+    )
+    def test_invalid_worker_config(self, mock_loader, kwargs):
+        with pytest.raises(ValueError):
+            core.RulDataModule(mock_loader, batch_size=16, **kwargs)
+
+    def test_setup_shares_memory_with_workers(self, mock_loader):
+        mock_loader.load_split.return_value = (
+            [np.random.randn(8, 30, 14) for _ in range(4)],
+            [np.arange(8.0) for _ in range(4)],
+        )
+        single = core.RulDataModule(mock_loader, batch_size=4)
+        single.setup()
+        multi = core.RulDataModule(mock_loader, batch_size=4, num_workers=2)
+        multi.setup()
+
+        for features, targets in multi._data.values():
+            assert features._shared_values is not None
+            assert targets._shared_values is not None
+        for single_batch, multi_batch in zip(
+            single.val_dataloader(), multi.val_dataloader()
+        ):
+            for single_tensor, multi_tensor in zip(single_batch, multi_batch):
+                assert torch.equal(single_tensor, multi_tensor)
+
+    @pytest.mark.parametrize(
+        "loader_func", ["train_dataloader", "val_dataloader", "test_dataloader"]
+    )
+    def test_resident_dataloader(self, mock_loader, loader_func):
+        mock_loader.load_split.return_value = (
+            [np.random.randn(8, 30, 14) for _ in range(4)],
+            np.split(np.arange(32.0), 4),
+        )
+        default = core.RulDataModule(mock_loader, batch_size=5)
+        default.setup()
+        resident = core.RulDataModule(mock_loader, batch_size=5, resident=True)
+        resident.setup()
+        default_batches = list(getattr(default, loader_func)())
+        resident_batches = list(getattr(resident, loader_func)())
+
+        assert len(default_batches) == len(resident_batches)
+        default_feat, default_targ = (torch.cat(b) for b in zip(*default_batches))
+        resident_feat, resident_targ = (torch.cat(b) for b in zip(*resident_batches))
+        order, resident_order = default_targ.argsort(), resident_targ.argsort()
+        assert torch.equal(default_feat[order], resident_feat[resident_order])
+        assert torch.equal(default_targ[order], resident_targ[resident_order])
+
+    def test_resident_with_workers(self, mock_loader):
+        with pytest.raises(ValueError):
+            core.RulDataModule(mock_loader, batch_size=16, num_workers=2, resident=True)
+
     def test_train_batch_structure(self, mock_loader):
         mock_loader.load_split.return_value = (
             [np.zeros((8, 30, 14))] * 4,
@@ -246,13 +390,16 @@ class TestRulDataModule:
         dataset.is_mutually_exclusive(dataset)
         mock_loader.is_mutually_exclusive.assert_called_once_with(dataset.reader)
 
-    def test_feature_extractor(self, mock_loader):
+    @pytest.mark.parametrize("window_mode", ["memory", "view", "lazy"])
+    def test_feature_extractor(self, mock_loader, window_mode):
         mock_loader.load_split.return_value = (
             [np.zeros((8, 30, 14)) + np.arange(8)[:, None, None]],
             [np.arange(8)],
         )
         fe = lambda x, y: (np.mean(x, axis=1), y)
-        dataset = core.RulDataModule(mock_loader, 16, fe, window_size=2)
+        dataset = core.RulDataModule(
+            mock_loader, 16, fe, window_size=2, window_mode=window_mode
+        )
         dataset.setup()
 
         dev_data = dataset.to_dataset("dev")
@@ -262,6 +409,330 @@ class TestRulDataModule:
             assert torch.dist(torch.arange(i, i + 2)[None, :].repeat(14, 1), feat) == 0
             assert targ == i + 1  # targets start window_size + 1 steps later
 
+    @pytest.mark.parametrize("degraded_only", [True, False])
+    @pytest.mark.parametrize("window_size", [None, 3])
+    def test_load_split_ragged(self, mock_loader, degraded_only, window_size):
+        features = [np.random.randn(n, 30, 14) for n in [8, 20, 3, 11]]
+        targets = [np.arange(n, dtype=float)[::-1] for n in [8, 20, 3, 11]]
+        mock_loader.load_split.return_value = (features, targets)
+        mock_loader.max_rul = 5
+        fe = lambda x, y: (np.mean(x, axis=1), y)
+        ragged_dm = core.RulDataModule(mock_loader, 16, fe, window_size=window_size)
+        list_dm = core.RulDataModule(
+            mock_loader, 16, fe, window_size=window_size, window_mode="view"
+        )
+
+        ragged = ragged_dm._load_split("dev", degraded_only=degraded_only)
+        expected = list_dm.load_split("dev", degraded_only=degraded_only)
+        public = ragged_dm.load_split("dev", degraded_only=degraded_only)
+
+        assert all(isinstance(r, utils.RaggedArray) for r in ragged)
+        assert all(isinstance(p, list) for p in public)
+        assert all(isinstance(e, list) for e in expected)
+        assert all((r.index is not None) == degraded_only for r in ragged)
+        for ragged_runs, expected_runs in zip(ragged, expected):
+            assert len(expected_runs) == len(ragged_runs)
+            for ragged_run, expected_run in zip(ragged_runs, expected_runs):
+                npt.assert_equal(expected_run, ragged_run)
+
+    def test_data_list_compatible(self, mock_loader):
+        features = [np.random.randn(n, 30, 14) for n in [8, 20, 3]]
+        targets = [np.arange(n, dtype=float)[::-1] for n in [8, 20, 3]]
+        mock_loader.load_split.return_value = (features, targets)
+        dm = core.RulDataModule(mock_loader, 16)
+        dm.setup()
+
+        dev_features, dev_targets = dm.data["dev"]
+
+        assert isinstance(dev_features, list) and isinstance(dev_targets, list)
+        assert isinstance(dm._data["dev"][0], utils.RaggedArray)
+        assert np.shares_memory(dev_features[0], dm._data["dev"][0].values)
+        assert len(dev_features + []) == 3
+        assert len(dev_features.copy()) == 3
+        assert list(dm.data) == ["dev", "val", "test"]
+
+    def test_data_in_sync_with_loaders(self, mock_loader):
+        features = [np.random.randn(n, 30, 14) for n in [8, 20, 3]]
+        targets = [np.arange(n, dtype=float)[::-1] for n in [8, 20, 3]]
+        mock_loader.load_split.return_value = (features, targets)
+        dm = core.RulDataModule(mock_loader, 16)
+        dm.setup()
+
+        dm.data["dev"][0][0][:] = 1.0
+        assert torch.all(dm.to_dataset("dev")[0][0] == 1.0)
+        dm.data["dev"] = ([f[:2] for f in features], [t[:2] for t in targets])
+        assert len(dm.to_dataset("dev")) == 6
+        assert len(dm.train_dataloader().dataset) == 6
+
+    def test_load_split_ragged_too_short(self, mock_loader):
+        mock_loader.load_split.return_value = ([np.zeros((2, 4, 5))], [np.zeros(2)])
+        fe = lambda x, y: (np.mean(x, axis=1), y)
+        dataset = core.RulDataModule(mock_loader, 16, fe, window_size=3)
+        with pytest.raises(ValueError):
+            dataset.load_split("dev")
+
+    def test_load_split_memmap_not_packed(self, mock_loader, tmp_path):
+        features = np.lib.format.open_memmap(
+            tmp_path / "run.npy", mode="w+", shape=(10, 5)
+        )
+        mock_loader.load_split.return_value = ([features], [np.zeros(10)])
+        dataset = core.RulDataModule(mock_loader, 16)
+
+        loaded_features, _ = dataset.load_split("dev")
+
+        assert isinstance(loaded_features, list)
+        assert loaded_features[0] is features
+
+    def test_registry_shared_runs_not_packed(self):
+        registry.set_memory_budget(1024**3)
+        try:
+            full_dm = core.RulDataModule(reader.DummyReader(1), 16)
+            truncated_dm = core.RulDataModule(
+                reader.DummyReader(1, percent_broken=0.5), 16
+            )
+            full_dm.setup()
+            truncated_dm.setup()
+            registered = reader.DummyReader(1).load_split("dev")
+        finally:
+            registry.set_memory_budget(0)
+            registry.clear_registry()
+
+        for split_features in [truncated_dm.data["dev"][0], registered[0]]:
+            for feat, full_feat in zip(split_features, full_dm.data["dev"][0]):
+                assert np.shares_memory(feat, full_feat)
+
+    @pytest.mark.parametrize("backend", ["thread", "process"])
+    @pytest.mark.parametrize("workers", [0, 1, 3])
+    def test_parallel_feature_extraction(self, mock_loader, backend, workers):
+        features = [np.random.randn(n, 30, 14) for n in [8, 20, 3, 11, 5]]
+        targets = [np.arange(n) for n in [8, 20, 3, 11, 5]]
+        mock_loader.load_split.return_value = (features, targets)
+        dataset = core.RulDataModule(
+            mock_loader,
+            16,
+            _mean_extractor,
+            window_size=2,
+            extractor_workers=workers,
+            extractor_backend=backend,
+            extractor_chunksize=2,
+        )
+
+        extracted_features, extracted_targets = dataset.load_split("dev")
+
+        assert len(extracted_features) == len(features)
+        for feat, extracted_feat in zip(features, extracted_features):
+            expected = utils.extract_windows(np.mean(feat, axis=1), 2)
+            npt.assert_almost_equal(expected, extracted_feat)
+        for targ, extracted_targ in zip(targets, extracted_targets):
+            npt.assert_equal(targ[1:], extracted_targ)
+
+    def test_process_extraction_shares_runs_per_chunk(self):
+        features = [np.random.randn(n, 30, 14) for n in range(5, 17)]
+        targets = [np.arange(len(f)) for f in features]
+        live_runs, max_live_runs = set(), []
+
+        def _share(array):
+            shm = to_shared_memory(array)
+            live_runs.add(shm.name)
+            max_live_runs.append(len(live_runs))
+            return shm
+
+        def _release(shared_runs):
+            live_runs.difference_update(shm.name for shm in shared_runs)
+            release_shared_memory(shared_runs)
+
+        to_shared_memory = core._to_shared_memory
+        release_shared_memory = core._release_shared_memory
+        with mock.patch("rul_datasets.core._to_shared_memory", side_effect=_share):
+            with mock.patch(
+                "rul_datasets.core._release_shared_memory", side_effect=_release
+            ):
+                extracted = core._extract_in_processes(
+                    _mean_extractor, features, targets, 2, 2
+                )
+
+        assert not live_runs
+        assert max(max_live_runs) <= (2 + 1) * 2  # one chunk ahead of the workers
+        assert len(extracted) == len(features)
+        for feat, targ, (extracted_feat, extracted_targ) in zip(
+            features, targets, extracted
+        ):
+            npt.assert_almost_equal(np.mean(feat, axis=1), extracted_feat)
+            npt.assert_equal(targ, extracted_targ)
+
+    @pytest.mark.parametrize("memmap", [True, False])
+    @pytest.mark.parametrize("batch_size", [1, 4, 100])
+    def test_batched_feature_extraction(
+        self, mock_loader, memmap, batch_size, tmp_data_root
+    ):
+        features = [np.random.randn(n, 30, 14) for n in [8, 20, 3]]
+        targets = [np.arange(n) for n in [8, 20, 3]]
+        mock_loader.load_split.return_value = (features, targets)
+        fe = mock.Mock(wraps=_mean_extractor)
+        dataset = core.RulDataModule(
+            mock_loader,
+            16,
+            fe,
+            extractor_batch_size=batch_size,
+            extractor_memmap=memmap,
+        )
+
+        extracted_features, extracted_targets = dataset.load_split("dev")
+
+        assert all(len(call.args[0]) <= batch_size for call in fe.call_args_list)
+        for feat, extracted_feat in zip(features, extracted_features):
+            npt.assert_almost_equal(np.mean(feat, axis=1), extracted_feat)
+            assert isinstance(extracted_feat, np.memmap) == memmap
+        for targ, extracted_targ in zip(targets, extracted_targets):
+            npt.assert_equal(targ, extracted_targ)
+
+    def test_extractor_memmap_needs_batch_size(self, mock_loader):
+        with pytest.raises(ValueError):
+            core.RulDataModule(mock_loader, 16, _mean_extractor, extractor_memmap=True)
+
+    def test_extractor_memmap_file_lifetime(self, tmp_data_root):
+        memmap_dir = tmp_data_root / "extracting"
+        array = core._allocate(10, np.zeros((1, 5), dtype=np.float32), memmap=True)
+        view = array[2:4]
+        del array
+        gc.collect()
+
+        assert len(os.listdir(memmap_dir)) == 1  # kept alive by the view
+        view[:] = 1.0
+        del view
+        gc.collect()
+        assert len(os.listdir(memmap_dir)) == 0
+
+    def test_batched_feature_extraction_lazy_windows(self, mock_loader):
+        seq = np.random.randn(50, 14)
+        mock_loader.load_split.return_value = (
+            [utils.extract_windows(seq, 30, mode="lazy")],
+            [np.arange(21)],
+        )
+        dataset = core.RulDataModule(
+            mock_loader, 16, _mean_extractor, extractor_batch_size=5
+        )
+
+        (extracted_features,), _ = dataset.load_split("dev")
+
+        expected = np.mean(utils.extract_windows(seq, 30), axis=1)
+        npt.assert_almost_equal(expected, extracted_features)
+
+    def test_extractor_cache_hit(self, tmp_data_root, mocker):
+        fd1 = reader.DummyReader(1)
+        dm = core.RulDataModule(fd1, 16, _mean_extractor, 5, extractor_cache=True)
+        features, targets = dm.load_split("dev")
+        assert len(os.listdir(tmp_data_root / "extracted")) == 1
+
+        spy_load_split = mocker.spy(reader.DummyReader, "load_split")
+        dm = core.RulDataModule(fd1, 16, _mean_extractor, 5, extractor_cache=True)
+        cached_features, cached_targets = dm.load_split("dev")
+
+        spy_load_split.assert_not_called()
+        for feat, cached_feat in zip(features, cached_features):
+            npt.assert_equal(feat, cached_feat)
+        for targ, cached_targ in zip(targets, cached_targets):
+            npt.assert_equal(targ, cached_targ)
+
+    def test_extractor_cache_keyed(self, tmp_data_root):
+        fd1 = reader.DummyReader(1)
+        trunc_fd1 = reader.DummyReader(1, percent_broken=0.5)
+        configs = [
+            (fd1, _mean_extractor, None, "dev"),
+            (fd1, _mean_extractor, None, "val"),
+            (trunc_fd1, _mean_extractor, None, "dev"),
+            (fd1, _max_extractor, None, "dev"),
+            (fd1, _max_extractor, "v1", "dev"),
+            (fd1, _max_extractor, "v2", "dev"),
+            (fd1, _max_extractor, "v2", "dev"),  # hit
+        ]
+        for fd, fe, version, split in configs:
+            dm = core.RulDataModule(
+                fd, 16, fe, extractor_cache=True, extractor_version=version
+            )
+            dm.load_split(split)
+
+        assert len(os.listdir(tmp_data_root / "extracted")) == 6
+
+    def test_extractor_fingerprint(self):
+        fingerprint = core._get_extractor_fingerprint(_mean_extractor, None)
+        assert fingerprint == core._get_extractor_fingerprint(_mean_extractor, None)
+        assert not fingerprint == core._get_extractor_fingerprint(_max_extractor, None)
+        assert "v1" in core._get_extractor_fingerprint(_mean_extractor, "v1")
+
+        obj_a = _ObjectExtractor(1)
+        obj_b = _ObjectExtractor(2)
+        assert core._get_extractor_fingerprint(
+            obj_a, None
+        ) == core._get_extractor_fingerprint(_ObjectExtractor(1), None)
+        assert not core._get_extractor_fingerprint(
+            obj_a, None
+        ) == core._get_extractor_fingerprint(obj_b, None)
+
+        with pytest.raises(ValueError):
+            core._get_extractor_fingerprint(len, None)  # no source available
+        assert "len" in core._get_extractor_fingerprint(len, "v1")
+
+    def test_extractor_fingerprint_partial(self):
+        partial_a = functools.partial(_scaled_mean_extractor, factor=1)
+        partial_b = functools.partial(_scaled_mean_extractor, factor=2)
+        fingerprint = core._get_extractor_fingerprint(partial_a, None)
+
+        assert "_scaled_mean_extractor" in fingerprint
+        assert "0x" not in fingerprint
+        assert not fingerprint == core._get_extractor_fingerprint(partial_b, None)
+        assert core._get_extractor_fingerprint(
+            partial_a, "v1"
+        ) == core._get_extractor_fingerprint(partial_b, "v1")
+
+    def test_extractor_fingerprint_memory_address(self):
+        with pytest.raises(ValueError):
+            core._get_extractor_fingerprint(_ReprlessExtractor(), None)
+        with pytest.raises(ValueError):
+            partial = functools.partial(_scaled_mean_extractor, factor=object())
+            core._get_extractor_fingerprint(partial, None)
+        fingerprint = core._get_extractor_fingerprint(_ReprlessExtractor(), "v1")
+        assert "0x" not in fingerprint
+
+    def test_extractor_fingerprint_across_processes(self):
+        code = (
+            "import functools\n"
+            "from rul_datasets import core\n"
+            "from tests.test_core import _scaled_mean_extractor, _ObjectExtractor\n"
+            "fe = functools.partial(_scaled_mean_extractor, factor=2)\n"
+            "print(core._get_extractor_fingerprint(fe, None))\n"
+            "print(core._get_extractor_fingerprint(_ObjectExtractor(2), None))\n"
+        )
+        root = os.path.dirname(os.path.dirname(__file__))
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=root,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.splitlines()
+
+        fe = functools.partial(_scaled_mean_extractor, factor=2)
+        assert output[0] == core._get_extractor_fingerprint(fe, None)
+        assert output[1] == core._get_extractor_fingerprint(_ObjectExtractor(2), None)
+
+    def test_batched_feature_extraction_not_window_wise(self, mock_loader):
+        mock_loader.load_split.return_value = (
+            [np.random.randn(8, 30, 14)],
+            [np.arange(8)],
+        )
+        fe = lambda x, y: (np.repeat(x, 2, axis=0), np.repeat(y, 2))
+        dataset = core.RulDataModule(mock_loader, 16, fe, extractor_batch_size=4)
+
+        with pytest.raises(ValueError):
+            dataset.load_split("dev")
+
+    def test_parallel_feature_extraction_unknown_backend(self, mock_loader):
+        with pytest.raises(ValueError):
+            core.RulDataModule(
+                mock_loader, 16, _mean_extractor, extractor_backend="bogus"
+            )
+
     def test_feature_extractor_no_rewindowing(self, mock_loader):
         mock_loader.load_split.return_value = (
             [np.zeros((8, 30, 14)) + np.arange(8)[:, None, None]],
@@ -285,6 +756,175 @@ class TestRulDataModule:
             assert t1 == i // 2
 
 
+class TestRulDataset:
+    @pytest.fixture()
+    def runs(self):
+        lengths = [5, 1, 0, 7]
+        features = [np.random.randn(n, 10, 2) for n in lengths]
+        targets = [np.arange(n, 0, -1) for n in lengths]
+
+        return features, targets
+
+    def test_len(self, runs):
+        dataset = core.RulDataset(*runs)
+        assert len(dataset) == 13
+
+    def test_getitem(self, runs):
+        features, targets = runs
+        dataset = core.RulDataset(features, targets)
+        expected_features = np.concatenate(features)
+        expected_targets = np.concatenate(targets)
+        for i in range(len(dataset)):
+            feat, targ = dataset[i]
+            npt.assert_almost_equal(feat.numpy(), expected_features[i].T)
+            assert targ == expected_targets[i]
+
+    @pytest.mark.parametrize("index", [-1, 13])
+    def test_getitem_out_of_range(self, runs, index):
+        dataset = core.RulDataset(*runs)
+        with pytest.raises(IndexError):
+            dataset[index]
+
+    def test_offsets_rebuilt_on_new_features(self, runs):
+        features, targets = runs
+        dataset = core.RulDataset(features, targets)
+        npt.assert_equal(dataset.run_offsets, [0, 5, 6, 6, 13])
+        dataset.features = features[:2]
+        npt.assert_equal(dataset.run_offsets, [0, 5, 6])
+        assert len(dataset) == 6
+
+    def test_offsets_rebuilt_on_changed_runs(self, runs):
+        features, targets = runs
+        dataset = core.RulDataset(list(features), list(targets))
+        npt.assert_equal(dataset.run_offsets, [0, 5, 6, 6, 13])
+        dataset.features.append(np.zeros((2, 10, 2)))
+        dataset.targets[0].append(np.arange(2))
+        npt.assert_equal(dataset.run_offsets, [0, 5, 6, 6, 13, 15])
+        dataset.features[0], dataset.targets[0][0] = features[0][:2], targets[0][:2]
+        npt.assert_equal(dataset.run_offsets, [0, 2, 3, 3, 10, 12])
+        assert len(dataset) == 12
+
+    def test_targets_reassignment_invalidates(self, runs):
+        features, targets = runs
+        dataset = core.RulDataset(features, targets).to_resident()
+        dataset.targets = ([t + 1 for t in targets],)
+
+        assert not dataset.is_resident
+        npt.assert_equal(dataset[0][1].numpy(), targets[0][0] + 1)
+
+    @pytest.mark.parametrize("indices", [[0, 12, 5, 6, 1], [3], []])
+    def test_getitem_batch(self, runs, indices):
+        dataset = core.RulDataset(*runs)
+        features, targets = dataset[indices]
+
+        assert features.shape == (len(indices), 2, 10)
+        assert targets.shape == (len(indices),)
+        for i, idx in enumerate(indices):
+            expected_feat, expected_targ = dataset[idx]
+            assert torch.dist(expected_feat, features[i]) == 0
+            assert expected_targ == targets[i]
+
+    def test_getitem_batch_out_of_range(self, runs):
+        dataset = core.RulDataset(*runs)
+        with pytest.raises(IndexError):
+            dataset[[0, 13]]
+
+    def test_getitems_collated_like_single_items(self, runs):
+        dataset = core.RulDataset(*runs)
+        batched = next(iter(DataLoader(dataset, batch_size=len(dataset))))
+        expected = default_collate([dataset[i] for i in range(len(dataset))])
+        for actual, exp in zip(batched, expected):
+            assert torch.dist(actual.double(), exp.double()) == 0
+
+    def test_collate_stacked(self, runs):
+        dataset = core.RulDataset(*runs)
+        indices = [3, 0, 7]
+        batch = dataset.__getitems__(indices)
+        samples = [dataset[i] for i in indices]
+
+        collated = core.collate_stacked(batch)
+
+        assert len(batch) == 3
+        for actual, stacked, exp in zip(
+            collated, batch.stacked, default_collate(samples)
+        ):
+            assert actual is stacked
+            assert torch.equal(actual, exp)
+        for actual, exp in zip(core.collate_stacked(samples), default_collate(samples)):
+            assert torch.equal(actual, exp)
+
+    @pytest.mark.parametrize("indices", [[0, 12, 5, 6, 1], [2, 3, 4], []])
+    def test_resident(self, runs, indices):
+        dataset = core.RulDataset(*runs)
+        expected = dataset[indices]
+        assert dataset.to_resident() is dataset
+        assert dataset.is_resident
+
+        for actual, exp in zip(dataset[indices], expected):
+            assert torch.equal(actual, exp)
+        for actual, exp in zip(dataset[12], core.RulDataset(*runs)[12]):
+            assert torch.equal(actual, exp)
+
+    def test_resident_reset_on_new_features(self, runs):
+        features, targets = runs
+        dataset = core.RulDataset(features, targets).to_resident()
+        dataset.features = features
+
+        assert not dataset.is_resident
+
+
+class TestRulBatchSampler:
+    @pytest.mark.parametrize("shuffle", [True, False])
+    @pytest.mark.parametrize("drop_last", [True, False])
+    def test_batches(self, shuffle, drop_last):
+        sampler = core.RulBatchSampler(range(10), 4, shuffle, drop_last)
+        batches = list(sampler)
+
+        assert len(batches) == len(sampler) == (2 if drop_last else 3)
+        assert all(len(b) == 4 for b in batches[:2])
+        assert all(np.all(np.diff(b) > 0) for b in batches)  # sorted by run
+        all_idx = np.concatenate(batches)
+        assert len(np.unique(all_idx)) == len(all_idx)
+        if not drop_last:
+            npt.assert_equal(np.sort(all_idx), np.arange(10))
+
+    def test_data_loader_yields_stacked_batches(self):
+        dataset = core.RulDataset([np.zeros((8, 30, 14))] * 4, [np.zeros(8)] * 4)
+        sampler = core.RulBatchSampler(dataset, 16, shuffle=True)
+        loader = DataLoader(dataset, batch_size=None, sampler=sampler)
+        batches = list(loader)
+
+        assert len(batches) == 2
+        for features, targets in batches:
+            assert features.shape == (16, 14, 30)
+            assert targets.shape == (16,)
+
+
+def _mean_extractor(features, targets):
+    return np.mean(features, axis=1), targets
+
+
+def _max_extractor(features, targets):
+    return np.max(features, axis=1), targets
+
+
+def _scaled_mean_extractor(features, targets, factor):
+    return np.mean(features, axis=1) * factor, targets
+
+
+class _ReprlessExtractor:
+    def __call__(self, features, targets):
+        return np.mean(features, axis=1), targets
+
+
+@dataclass
+class _ObjectExtractor:
+    factor: int
+
+    def __call__(self, features, targets):
+        return np.mean(features, axis=1) * self.factor, targets
+
+
 class DummyRul(reader.AbstractReader):
     fd: int = 1
     window_size: int = 30
@@ -554,14 +1194,125 @@ class TestPairedDataset:
             else:
                 assert 1 == domain_idx  # Second is not
 
-    def test_no_determinism_in_multiprocessing(self, cmapss_normal, cmapss_short):
+    @pytest.mark.parametrize("batch_size", [None, 16])
+    def test_determinism_in_multiprocessing(
+        self, cmapss_normal, cmapss_short, batch_size
+    ):
+        dataset = core.PairedRulDataset(
+            [cmapss_normal, cmapss_short],
+            "dev",
+            100,
+            1,
+            deterministic=True,
+            batch_size=batch_size,
+        )
+        loader_batch_size = None if batch_size else 1
+        single = list(DataLoader(dataset, batch_size=loader_batch_size))
+        multi = list(DataLoader(dataset, loader_batch_size, num_workers=2))
+
+        assert len(single) == len(multi)
+        for single_batch, multi_batch in zip(single, multi):
+            assert self._is_same_batch(single_batch, multi_batch)
+
+    @pytest.mark.parametrize("batch_size", [None, 16])
+    def test_non_deterministic_workers_share_epoch(self, cmapss_normal, batch_size):
+        dataset = core.PairedRulDataset(
+            [cmapss_normal], "dev", 100, 1, batch_size=batch_size
+        )
+        loader_batch_size = None if batch_size else 1
+        multi = list(DataLoader(dataset, loader_batch_size, num_workers=2))
+
+        assert len(dataset) == len(multi)
+
+    @pytest.mark.parametrize("batch_size", [None, 16])
+    def test_indexing_deterministic(self, cmapss_normal, batch_size):
+        dataset = core.PairedRulDataset(
+            [cmapss_normal], "dev", 100, 1, deterministic=True, batch_size=batch_size
+        )
+        samples = list(dataset)
+
+        for i in [0, 5, len(dataset) - 1, 3]:
+            assert self._is_same_batch(samples[i], dataset[i])
+        assert self._is_same_batch(samples[-1], dataset[-1])
+        with pytest.raises(IndexError):
+            dataset[len(dataset)]
+
+    def test_indexing_non_deterministic(self, cmapss_normal):
+        dataset = core.PairedRulDataset([cmapss_normal], "dev", 100, 1)
+        with pytest.raises(RuntimeError):
+            dataset[0]
+
+    def test_resume_with_subset(self, cmapss_normal):
+        dataset = core.PairedRulDataset(
+            [cmapss_normal], "dev", 100, 1, deterministic=True, batch_size=16
+        )
+        samples = list(dataset)
+        resumed = Subset(dataset, range(3, len(dataset)))
+
+        resumed_samples = list(DataLoader(resumed, batch_size=None))
+
+        assert len(samples) - 3 == len(resumed_samples)
+        for sample, resumed_sample in zip(samples[3:], resumed_samples):
+            assert self._is_same_batch(sample, resumed_sample)
+
+    def test_pair_table_drawn_once(self, cmapss_normal):
         dataset = core.PairedRulDataset(
-            [cmapss_normal, cmapss_short], "dev", 100, 1, deterministic=True
+            [cmapss_normal], "dev", 100, 1, deterministic=True, batch_size=16
         )
-        dataloader = DataLoader(dataset, num_workers=2)
+        spy_draw = mock.MagicMock(wraps=dataset._get_pair_batch_func)
+        dataset._get_pair_batch_func = spy_draw
+        first_epoch = list(dataset)
+        second_epoch = list(dataset)
+
+        spy_draw.assert_called_once_with(100)
+        for first, second in zip(first_epoch, second_epoch):
+            assert self._is_same_batch(first, second)
+        pair_table = dataset.get_pair_table()
+        assert 5 == len(pair_table)
+        assert all(100 == len(idx) for idx in pair_table)
+
+    def test_pair_table_non_deterministic(self, cmapss_normal):
+        dataset = core.PairedRulDataset([cmapss_normal], "dev", 100, 1)
         with pytest.raises(RuntimeError):
-            for _ in dataloader:
-                pass
+            dataset.get_pair_table()
+
+    @pytest.mark.parametrize("mode", ["linear", "labeled"])
+    def test_pair_table_cached(self, tmp_data_root, cmapss_normal, mode):
+        def _create():
+            return core.PairedRulDataset(
+                [cmapss_normal], "dev", 100, 1, True, mode, cache_pair_table=True
+            )
+
+        pair_table = _create().get_pair_table()
+        cached_files = os.listdir(tmp_data_root / "pairs")
+        assert 1 == len(cached_files)
+
+        dataset = _create()
+        dataset._draw_pair_table = mock.MagicMock(name="_draw_pair_table")
+        cached_pair_table = dataset.get_pair_table()
+        dataset._draw_pair_table.assert_not_called()
+        for idx, cached_idx in zip(pair_table, cached_pair_table):
+            npt.assert_equal(idx, cached_idx)
+
+        other = core.PairedRulDataset(
+            [cmapss_normal], "dev", 50, 1, True, mode, cache_pair_table=True
+        )
+        other.get_pair_table()
+        assert 2 == len(os.listdir(tmp_data_root / "pairs"))
+
+    @pytest.mark.parametrize("mode", ["linear", "piecewise", "labeled"])
+    def test_deterministic_batched_equals_single(self, cmapss_normal, mode):
+        single = core.PairedRulDataset(
+            [cmapss_normal], "dev", 50, 1, deterministic=True, mode=mode
+        )
+        batched = core.PairedRulDataset(
+            [cmapss_normal], "dev", 50, 1, deterministic=True, mode=mode, batch_size=8
+        )
+        single_samples = [torch.stack(s) for s in zip(*single)]
+        batched_samples = [torch.cat(s) for s in zip(*batched)]
+
+        for single_sample, batched_sample in zip(single_samples, batched_samples):
+            npt.assert_almost_equal(single_sample.numpy(), batched_sample.numpy())
 
     def test_no_duplicate_batches_in_multiprocessing(self, cmapss_normal, cmapss_short):
         dataset = core.PairedRulDataset([cmapss_normal, cmapss_short], "dev", 100, 1)
@@ -584,6 +1335,121 @@ class TestPairedDataset:
     def _is_same_batch(b0, b1):
         return all(torch.dist(a, b) == 0.0 for a, b in zip(b0, b1))
 
+    @pytest.mark.parametrize("mode", ["linear", "piecewise", "labeled"])
+    def test_batched_shapes(self, cmapss_normal, mode):
+        data = core.PairedRulDataset(
+            [cmapss_normal], "dev", 100, 1, mode=mode, batch_size=32
+        )
+        batches = list(data)
+
+        assert 4 == len(data) == len(batches)
+        window_size, num_channels = data._features[0].shape[1:]
+        for batch, expected_size in zip(batches, [32, 32, 32, 4]):
+            anchors, queries, distances, domain_labels = batch
+            expected_shape = (expected_size, num_channels, window_size)
+            assert expected_shape == anchors.shape == queries.shape
+            assert (expected_size,) == distances.shape == domain_labels.shape
+            assert torch.float == domain_labels.dtype
+            assert torch.all((0 <= distances) & (distances <= 1))
+
+    @pytest.mark.parametrize(
+        ["mode", "func"],
+        [
+            ("linear", "_get_pair_idx_batch"),
+            ("piecewise", "_get_pair_idx_piecewise_batch"),
+            ("labeled", "_get_labeled_pair_idx_batch"),
+        ],
+    )
+    def test_batched_pair_idx(self, cmapss_normal, cmapss_short, mode, func):
+        data = core.PairedRulDataset(
+            [cmapss_normal, cmapss_short], "dev", 512, 30, mode=mode, batch_size=512
+        )
+        assert getattr(data, func) == data._get_pair_batch_func
+        run_idx, anchor_idx, query_idx, distance, domain = data._get_pair_batch_func(
+            512
+        )
+
+        run_lengths = data._run_lengths[run_idx]
+        assert np.all(query_idx - anchor_idx >= 30)
+        assert np.all(query_idx < run_lengths)
+        npt.assert_equal(data._run_domain_idx[run_idx], domain)
+        if mode == "linear":
+            npt.assert_equal(query_idx - anchor_idx, distance)
+            assert np.all(distance <= 125)
+        elif mode == "piecewise":
+            middle_idx = run_lengths // 2
+            npt.assert_equal(0, distance[anchor_idx <= middle_idx])
+            after_middle = anchor_idx > middle_idx
+            npt.assert_equal(
+                (query_idx - anchor_idx)[after_middle], distance[after_middle]
+            )
+        else:
+            for i, run in enumerate(run_idx):
+                labels = data._labels[run]
+                assert labels[anchor_idx[i]] - labels[query_idx[i]] == distance[i]
+
+    def test_batched_equals_single_pairs(self, cmapss_normal, cmapss_short):
+        data = core.PairedRulDataset(
+            [cmapss_normal, cmapss_short], "dev", 64, 1, batch_size=64
+        )
+        pair_idx = data._get_pair_batch_func(64)
+        batch = data._build_pair_batch(*pair_idx)
+
+        for i, (run_idx, anchor_idx, query_idx, dist, domain) in enumerate(
+            zip(*pair_idx)
+        ):
+            run = data._features[run_idx]
+            pair = data._build_pair(run, anchor_idx, query_idx, dist, domain)
+            for batched, single in zip(batch, pair):
+                npt.assert_almost_equal(single.numpy(), batched[i].numpy())
+
+    @pytest.mark.parametrize("deterministic", [True, False])
+    def test_batched_determinism(self, cmapss_short, deterministic):
+        data = core.PairedRulDataset(
+            [cmapss_short], "dev", 512, 2, deterministic=deterministic, batch_size=64
+        )
+        assert deterministic != self._two_epochs_different(data)
+
+    def test_batched_in_dataloader(self, cmapss_normal):
+        data = core.PairedRulDataset([cmapss_normal], "dev", 100, 1, batch_size=32)
+        dataloader = DataLoader(data, batch_size=None)
+
+        batch_sizes = [anchors.shape[0] for anchors, *_ in dataloader]
+
+        assert [32, 32, 32, 4] == batch_sizes
+
+    def test_counter_rng_integers_in_range(self):
+        rng = core._CounterRng(42)
+        rng.seek(0, 1000)
+        low = np.arange(1000)
+        drawn = rng.integers(low, low + 3)
+
+        assert np.all(drawn >= low)
+        assert np.all(drawn < low + 3)
+
+    def test_counter_rng_size(self):
+        rng = core._CounterRng(42)
+        rng.seek(7)
+        drawn = rng.integers(0, 1000, (2, 3))
+        assert drawn.shape == (2, 3)
+        rng.seek(7)
+        expected = [rng.integers(0, 1000) for _ in range(6)]
+        npt.assert_equal(drawn.ravel(), expected)
+
+        rng.seek(0, 5)
+        assert rng.integers(0, 10, 5).shape == (5,)
+        with pytest.raises(ValueError):
+            rng.integers(0, 10, 4)
+
+    @pytest.mark.parametrize("num_pairs", [None, 3])
+    def test_counter_rng_empty_interval(self, num_pairs):
+        rng = core._CounterRng(42)
+        rng.seek(0, num_pairs)
+        with pytest.raises(ValueError):
+            rng.integers(5, 5)
+        with pytest.raises(ValueError):
+            rng.integers(np.array([0, 3, 0]), np.array([2, 2, 2]))
+
     def test_compatability_check(self):
         mock_check_compat = mock.MagicMock(name="check_compatibility")
         dms = [
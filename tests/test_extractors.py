@@ -0,0 +1,150 @@
+import numpy as np
+import numpy.testing as npt
+import pytest
+import scipy.stats
+import torch
+
+from rul_datasets import extractors, reader, RulDataModule
+
+
+@pytest.fixture()
+def windows():
+    return np.random.default_rng(42).normal(size=(20, 256, 2))
+
+
+def _reference_features(windows):
+    abs_windows = np.abs(windows)
+    rms = np.sqrt(np.mean(windows**2, axis=1))
+    peak = np.max(abs_windows, axis=1)
+    abs_mean = np.mean(abs_windows, axis=1)
+
+    return {
+        "mean": np.mean(windows, axis=1),
+        "std": np.std(windows, axis=1),
+        "rms": rms,
+        "peak": peak,
+        "peak_to_peak": np.ptp(windows, axis=1),
+        "skewness": scipy.stats.skew(windows, axis=1),
+        "kurtosis": scipy.stats.kurtosis(windows, axis=1),
+        "crest_factor": peak / rms,
+        "shape_factor": rms / abs_mean,
+        "impulse_factor": peak / abs_mean,
+        "clearance_factor": peak / np.mean(np.sqrt(abs_windows), axis=1) ** 2,
+    }
+
+
+@pytest.mark.parametrize("feature", extractors.DEFAULT_FEATURES)
+def test_builtin_features(windows, feature):
+    fe = extractors.VibrationFeatureExtractor([feature], dtype=torch.float64)
+
+    features, _ = fe(windows, np.arange(20))
+
+    npt.assert_almost_equal(features, _reference_features(windows)[feature])
+
+
+def test_default_features(windows):
+    fe = extractors.VibrationFeatureExtractor()
+
+    features, targets = fe(windows, np.arange(20))
+
+    assert features.shape == (20, len(extractors.DEFAULT_FEATURES) * 2)
+    assert features.dtype == np.float32
+    npt.assert_equal(targets, np.arange(20))
+    expected = np.stack(list(_reference_features(windows).values()), axis=1)
+    npt.assert_allclose(features, expected.reshape(20, -1), rtol=1e-4, atol=1e-5)
+
+
+@pytest.mark.parametrize("num_bands", [1, 3, 8])
+def test_spectral_bands(windows, num_bands):
+    fe = extractors.VibrationFeatureExtractor(
+        [], num_bands=num_bands, dtype=torch.float64
+    )
+
+    features, _ = fe(windows, np.arange(20))
+
+    power = np.abs(np.fft.rfft(windows, axis=1)) ** 2 / windows.shape[1]
+    bands = np.array_split(power, num_bands, axis=1)
+    expected = np.stack([b.mean(axis=1) for b in bands], axis=1).reshape(20, -1)
+    assert fe.num_features == num_bands
+    npt.assert_almost_equal(features, expected)
+
+
+def test_custom_feature(windows):
+    fe = extractors.VibrationFeatureExtractor(
+        ["rms", lambda x: x.median(dim=1).values], dtype=torch.float64
+    )
+
+    features, _ = fe(windows, np.arange(20))
+
+    features = features.reshape(20, 2, 2)
+    npt.assert_almost_equal(features[:, 0], _reference_features(windows)["rms"])
+    npt.assert_almost_equal(features[:, 1], torch.tensor(windows).median(1).values)
+
+
+def test_feature_order(windows):
+    fe = extractors.VibrationFeatureExtractor(["mean", "peak"], dtype=torch.float64)
+
+    features, _ = fe(windows, np.arange(20))
+
+    reference = _reference_features(windows)
+    npt.assert_almost_equal(features[:, 0], reference["mean"][:, 0])
+    npt.assert_almost_equal(features[:, 1], reference["mean"][:, 1])
+    npt.assert_almost_equal(features[:, 2], reference["peak"][:, 0])
+    npt.assert_almost_equal(features[:, 3], reference["peak"][:, 1])
+
+
+def test_constant_windows_are_finite():
+    fe = extractors.VibrationFeatureExtractor()
+
+    features, _ = fe(np.zeros((5, 64, 1)), np.arange(5))
+
+    assert np.all(np.isfinite(features))
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"features": ["bogus"]}, {"features": ["rms"], "num_bands": -1}]
+)
+def test_invalid_arguments(kwargs):
+    with pytest.raises(ValueError):
+        extractors.VibrationFeatureExtractor(**kwargs)
+
+
+def test_repr_stable():
+    fe = extractors.VibrationFeatureExtractor(["rms"], num_bands=2)
+    assert repr(fe) == repr(extractors.VibrationFeatureExtractor(["rms"], num_bands=2))
+    assert not repr(fe) == repr(extractors.VibrationFeatureExtractor(["rms"]))
+
+
+def test_repr_custom_features():
+    mean_fe = extractors.VibrationFeatureExtractor([lambda w: w.mean(1)])
+    max_fe = extractors.VibrationFeatureExtractor([lambda w: w.amax(1)])
+    same_mean_fe = extractors.VibrationFeatureExtractor([lambda w: w.mean(1)])
+    both_fe = extractors.VibrationFeatureExtractor(
+        [lambda w: w.mean(1), lambda w: w.amax(1)]
+    )
+
+    assert not repr(mean_fe) == repr(max_fe)
+    assert repr(mean_fe) == repr(same_mean_fe)
+    name_mean, name_max = [extractors._get_name(f) for f in both_fe.features]
+    assert not name_mean == name_max
+    assert name_mean in repr(mean_fe)
+
+
+def test_repr_custom_features_closure():
+    def scaled_rms(factor):
+        return lambda w: w.square().mean(1).sqrt() * factor
+
+    fe = extractors.VibrationFeatureExtractor([scaled_rms(1)])
+
+    assert not repr(fe) == repr(extractors.VibrationFeatureExtractor([scaled_rms(2)]))
+    assert repr(fe) == repr(extractors.VibrationFeatureExtractor([scaled_rms(1)]))
+
+
+def test_in_data_module():
+    fe = extractors.VibrationFeatureExtractor(["rms", "kurtosis"], num_bands=1)
+    dm = RulDataModule(reader.DummyReader(1), 16, fe, window_size=5)
+
+    features, targets = dm.load_split("dev")
+
+    assert all(f.shape[1:] == (5, 3) for f in features)
+    assert all(len(f) == len(t) for f, t in zip(features, targets))
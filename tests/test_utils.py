@@ -1,4 +1,5 @@
 import os
+import pickle
 import random
 import sys
 
@@ -6,8 +7,11 @@ import numpy as np
 import numpy.testing as npt
 import pytest
 import torch
+from torch.multiprocessing.reductions import ForkingPickler
 
 from rul_datasets import utils
+from rul_datasets.core import RulDataset
+from rul_datasets.reader.data_root import get_data_root, set_data_root
 
 
 def dummy_file_name_to_timestep(file_path):
@@ -66,16 +70,311 @@ def test_extract_windows(window_size, dilation):
         npt.assert_equal(windows[i], expected_window)
 
 
-def test_extract_windows_memmap_identical(tmp_path):
+@pytest.fixture()
+def tmp_data_root(tmp_path):
+    old_data_root = get_data_root()
+    set_data_root(str(tmp_path))
+    yield tmp_path
+    set_data_root(old_data_root)
+
+
+@pytest.mark.parametrize("dilation", [1, 2])
+def test_extract_windows_memmap_identical(tmp_data_root, dilation):
+    inputs = np.random.randn(100, 16)
+
+    windows = utils.extract_windows(inputs, 10, dilation)
+    windows_memmap = utils.extract_windows(inputs, 10, dilation, mode="memmap")
+
+    assert isinstance(windows_memmap, np.memmap)
+    assert not windows_memmap.flags.writeable
+    npt.assert_equal(windows, windows_memmap)
+
+
+def test_extract_windows_memmap_chunked(tmp_data_root, mocker):
+    mocker.patch("rul_datasets.utils._WINDOWS_CHUNK_BYTES", 1000)
     inputs = np.random.randn(100, 16)
 
-    windows = utils.extract_windows(inputs, 10, 1)
     windows_memmap = utils.extract_windows(inputs, 10, 1, mode="memmap")
 
-    npt.assert_almost_equal(windows, windows_memmap)
+    npt.assert_equal(utils.extract_windows(inputs, 10, 1), windows_memmap)
+
+
+def test_extract_windows_memmap_persistent(tmp_data_root):
+    inputs = np.random.randn(100, 16)
+
+    windows = utils.extract_windows(inputs, 10, 1, mode="memmap")
+    cache_files = os.listdir(tmp_data_root / "windows")
+    del windows
+
+    assert len(cache_files) == 1
+    cache_file = tmp_data_root / "windows" / cache_files[0]
+    mtime = os.path.getmtime(cache_file)
+    windows = utils.extract_windows(inputs.copy(), 10, 1, mode="memmap")
+    assert windows.filename == str(cache_file)  # reused the existing file
+    assert os.path.getmtime(cache_file) == mtime
+
+
+def test_extract_windows_memmap_keyed(tmp_data_root):
+    inputs = np.random.randn(100, 16)
+
+    utils.extract_windows(inputs, 10, 1, mode="memmap")
+    utils.extract_windows(inputs, 5, 1, mode="memmap")
+    utils.extract_windows(inputs, 10, 2, mode="memmap")
+    utils.extract_windows(inputs + 1, 10, 1, mode="memmap")
+    utils.extract_windows(inputs.astype(np.float32), 10, 1, mode="memmap")
+
+    assert len(os.listdir(tmp_data_root / "windows")) == 5
+
+
+@pytest.mark.parametrize("window_size", [1, 5, 10])
+@pytest.mark.parametrize("dilation", [1, 2, 3])
+def test_extract_windows_view_identical(window_size, dilation):
+    inputs = np.random.randn(30, 4)
+
+    windows = utils.extract_windows(inputs, window_size, dilation)
+    windows_view = utils.extract_windows(inputs, window_size, dilation, mode="view")
+
+    assert windows.shape == windows_view.shape
+    npt.assert_equal(windows, windows_view)
+    assert np.shares_memory(windows_view, inputs)
+    assert not windows_view.flags.writeable
+
+
+def test_feature_to_tensor_read_only():
+    inputs = np.random.randn(30, 4).astype(np.float32)
+    windows_view = utils.extract_windows(inputs, 10, mode="view")
+
+    tensor = utils.feature_to_tensor(windows_view[0])
+
+    npt.assert_equal(tensor.numpy(), windows_view[0].T)
+    assert not np.shares_memory(tensor.numpy(), inputs)
+
+
+class TestLazyWindows:
+    @pytest.fixture()
+    def inputs(self):
+        return np.random.randn(30, 4)
+
+    @pytest.mark.parametrize("window_size", [1, 5, 10])
+    @pytest.mark.parametrize("dilation", [1, 2, 3])
+    def test_identical_to_memory(self, inputs, window_size, dilation):
+        windows = utils.extract_windows(inputs, window_size, dilation)
+        lazy_windows = utils.extract_windows(inputs, window_size, dilation, "lazy")
+
+        assert isinstance(lazy_windows, utils.LazyWindows)
+        assert windows.shape == lazy_windows.shape
+        assert len(windows) == len(lazy_windows)
+        assert windows.dtype == lazy_windows.dtype
+        npt.assert_equal(windows, np.asarray(lazy_windows))
+        for window, lazy_window in zip(windows, lazy_windows):
+            npt.assert_equal(window, lazy_window)
+
+    @pytest.mark.parametrize(
+        "key",
+        [
+            slice(None, 10),
+            slice(5, None, 2),
+            [0, 17, 3],
+            np.array([], dtype=int),
+            np.arange(21) % 3 == 0,
+        ],
+    )
+    def test_indexing(self, inputs, key):
+        windows = utils.extract_windows(inputs, 10, 1)
+        lazy_windows = utils.extract_windows(inputs, 10, 1, "lazy")
+
+        selected = lazy_windows[key]
+
+        assert isinstance(selected, utils.LazyWindows)
+        assert selected.seq is inputs  # no copy of the sequence
+        npt.assert_equal(windows[key], np.asarray(selected))
+
+    def test_int_indexing_returns_view(self, inputs):
+        lazy_windows = utils.extract_windows(inputs, 10, 2, "lazy")
+
+        window = lazy_windows[-1]
+
+        assert np.shares_memory(window, inputs)
+        npt.assert_equal(inputs[-19::2], window)
+
+    def test_multi_dim_indexing_unsupported(self, inputs):
+        lazy_windows = utils.extract_windows(inputs, 10, 1, "lazy")
+        with pytest.raises(NotImplementedError):
+            lazy_windows[0, :5]
+
+    def test_array_dtype(self, inputs):
+        lazy_windows = utils.extract_windows(inputs, 10, 1, "lazy")
+
+        assert np.asarray(lazy_windows, dtype=np.float32).dtype == np.float32
+
+    def test_in_rul_dataset(self, inputs):
+        windows = [utils.extract_windows(inputs, 10, 1, "lazy")]
+        targets = [np.arange(21, dtype=float)]
+        dataset = RulDataset(windows, targets)
+
+        features, batch_targets = dataset[[3, 0, 20]]
+
+        expected = utils.extract_windows(inputs, 10, 1)[[3, 0, 20]]
+        npt.assert_almost_equal(
+            features.numpy(), utils.feature_to_tensor(expected).numpy()
+        )
+        npt.assert_equal(batch_targets.numpy(), [3.0, 0.0, 20.0])
+        npt.assert_almost_equal(
+            dataset[3][0].numpy(), utils.feature_to_tensor(expected[0]).numpy()
+        )
+
+
+class TestRaggedArray:
+    @pytest.fixture()
+    def runs(self):
+        return [np.random.randn(length, 4) for length in [10, 0, 25, 5]]
+
+    def test_from_list(self, runs):
+        ragged = utils.RaggedArray.from_list(runs)
+
+        assert len(runs) == len(ragged)
+        npt.assert_equal([0, 10, 10, 35, 40], ragged.offsets)
+        npt.assert_equal([10, 0, 25, 5], ragged.lengths)
+        npt.assert_equal(np.concatenate(runs), ragged.values)
+        for run, ragged_run in zip(runs, ragged):
+            npt.assert_equal(run, ragged_run)
+            assert np.shares_memory(ragged_run, ragged.values) or not len(run)
+        npt.assert_equal(runs[-1], ragged[-1])
+        assert isinstance(ragged.tolist(), list)
+
+    def test_from_empty_list(self):
+        with pytest.raises(ValueError):
+            utils.RaggedArray.from_list([])
+
+    @pytest.mark.parametrize("offsets", [[1, 10], [0, 5], [0, 12, 10], []])
+    def test_invalid_offsets(self, offsets):
+        with pytest.raises(ValueError):
+            utils.RaggedArray(np.zeros((10, 4)), offsets)
+
+    @pytest.mark.parametrize("key", [slice(1, 3), slice(None, -1), slice(3, 1)])
+    def test_slicing(self, runs, key):
+        ragged = utils.RaggedArray.from_list(runs)
+
+        sliced = ragged[key]
+
+        assert isinstance(sliced, utils.RaggedArray)
+        assert len(runs[key]) == len(sliced)
+        for run, sliced_run in zip(runs[key], sliced):
+            npt.assert_equal(run, sliced_run)
+
+    def test_indexing_out_of_range(self, runs):
+        ragged = utils.RaggedArray.from_list(runs)
+        with pytest.raises(IndexError):
+            ragged[4]
+        with pytest.raises(NotImplementedError):
+            ragged[::2]
+
+    def test_compress(self, runs):
+        ragged = utils.RaggedArray.from_list(runs)
+        mask = ragged.values[:, 0] > 0
+
+        compressed = ragged.compress(mask)
+
+        assert len(runs) == len(compressed)
+        assert compressed.values is ragged.values  # an index view, not a copy
+        for run, compressed_run in zip(runs, compressed):
+            npt.assert_equal(run[run[:, 0] > 0], compressed_run)
+        compressed_twice = compressed.compress(compressed.take(slice(None))[:, 1] > 0)
+        for run, compressed_run in zip(runs, compressed_twice):
+            npt.assert_equal(run[(run[:, 0] > 0) & (run[:, 1] > 0)], compressed_run)
+
+    def test_select_runs(self, runs):
+        ragged = utils.RaggedArray.from_list(runs)
+
+        selected = ragged.select_runs([3, 0, 1, 0])
+
+        assert selected.values is ragged.values
+        for run_idx, selected_run in zip([3, 0, 1, 0], selected):
+            npt.assert_equal(runs[run_idx], selected_run)
+        npt.assert_equal(runs[0], selected[1:][-1])  # slicing keeps the index
+
+    def test_take(self, runs):
+        ragged = utils.RaggedArray.from_list(runs)
+        selected = ragged.select_runs([2, 0])
+        expected = np.concatenate([runs[2], runs[0]])
+
+        npt.assert_equal(expected[[0, 30, 12]], selected.take(np.array([0, 30, 12])))
+        npt.assert_equal(expected, selected.compact().values)
+        assert selected.compact().index is None
+        assert ragged.compact() is ragged
+
+    def test_positions(self, runs):
+        ragged = utils.RaggedArray.from_list(runs)
+
+        positions = ragged.positions()
+
+        npt.assert_equal(np.concatenate([np.arange(len(r)) for r in runs]), positions)
+
+    def test_with_values(self, runs):
+        ragged = utils.RaggedArray.from_list(runs)
+
+        doubled = ragged.with_values(ragged.values * 2)
+
+        for run, doubled_run in zip(runs, doubled):
+            npt.assert_equal(run * 2, doubled_run)
+
+    @pytest.mark.parametrize("memmap", [True, False])
+    def test_save_load(self, tmp_path, runs, memmap):
+        ragged = utils.RaggedArray.from_list(runs)
+
+        ragged.save(str(tmp_path / "ragged"))
+        loaded = utils.RaggedArray.load(str(tmp_path / "ragged"), memmap=memmap)
+
+        assert memmap == isinstance(loaded.values, np.memmap)
+        npt.assert_equal(ragged.offsets, loaded.offsets)
+        npt.assert_equal(ragged.values, loaded.values)
+
+    def test_save_load_index_view(self, tmp_path, runs):
+        selected = utils.RaggedArray.from_list(runs).select_runs([2, 0])
+
+        selected.save(str(tmp_path / "ragged"))
+        loaded = utils.RaggedArray.load(str(tmp_path / "ragged"), memmap=True)
+
+        npt.assert_equal(selected.index, loaded.index)
+        for selected_run, loaded_run in zip(selected, loaded):
+            npt.assert_equal(selected_run, loaded_run)
+
+    def test_share_memory(self, runs):
+        ragged = utils.RaggedArray.from_list(runs)
+        values = ragged.values.copy()
+        assert ragged.share_memory() is ragged
+
+        npt.assert_equal(values, ragged.values)
+        for view in [ragged[1:], ragged.compress(values[:, 0] > 0)]:
+            buffer = ForkingPickler.dumps(view)
+            assert len(buffer) < view.values.nbytes  # buffer is not copied
+            unpickled = pickle.loads(buffer)
+            for run, unpickled_run in zip(view, unpickled):
+                npt.assert_equal(run, unpickled_run)
+
+    def test_share_memory_memmap(self, tmp_path, runs):
+        utils.RaggedArray.from_list(runs).save(str(tmp_path))
+        ragged = utils.RaggedArray.load(str(tmp_path), memmap=True).share_memory()
+
+        assert isinstance(ragged.values, np.memmap)
+
+    def test_in_rul_dataset(self):
+        runs = [np.random.randn(length, 3, 4) for length in [10, 0, 25, 5]]
+        targets = [np.arange(len(run), dtype=float) for run in runs]
+        ragged_dataset = RulDataset(
+            utils.RaggedArray.from_list(runs), utils.RaggedArray.from_list(targets)
+        )
+        list_dataset = RulDataset(runs, targets)
+        indices = [39, 0, 12, 9, 10]
+
+        npt.assert_equal(list_dataset.run_offsets, ragged_dataset.run_offsets)
+        for expected, actual in zip(list_dataset[indices], ragged_dataset[indices]):
+            npt.assert_equal(expected.numpy(), actual.numpy())
+        for expected, actual in zip(list_dataset[12], ragged_dataset[12]):
+            npt.assert_equal(expected.numpy(), actual.numpy())
 
 
-def test_extract_windows_memmap_auto_deletes():
+def test_extract_windows_memmap_auto_deletes(tmp_data_root):
     tmp_file_name = None
 
     def _extract_tmp_file_name(event_name, args):
@@ -91,7 +390,7 @@ def test_extract_windows_memmap_auto_deletes():
 
     windows.max()  # check if memmap is accessible
     del windows
-    assert not os.path.exists(tmp_file_name)  # check if memmap is deleted
+    assert not os.path.exists(tmp_file_name)  # check if temporary file is deleted
 
 
 @pytest.mark.parametrize("num_targets", [0, 1, 2])